@@ -1,9 +1,11 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
-import uuid
+from typing import List, Dict, Any, Optional, Set, Tuple
 import numpy as np
 from enum import Enum
 from .brain import AgentBrain
+from .store import AgentStore, StoreField
+from ..env.rng import legacy_stream, random_id
+from ..env.profiler import clock
 
 # --- Enums & Constants ---
 
@@ -41,6 +43,27 @@ PERSONALITY_TRAITS = [
     "Conscientiousness"
 ]
 
+# Vision cutoff. Sighting odds are 1 / (1 + (dist - 20) * 0.05), which drops
+# below 1 in 4 here; targets at dist >= VISION_RANGE are never seen. (Vision
+# used to be unbounded, every item and agent in the world rolled the falloff;
+# the cap keeps scans local to the spatial indexes.)
+VISION_RANGE = 80
+
+# Item categories agents memorize (see item_category), and the spatial_memory
+# list a category goes to when it is not its own: materials and everything
+# else share 'item', as in the original per-cell scan
+RESOURCE_CATEGORIES = ['food', 'wood', 'stone', 'material', 'item']
+MEMORY_KEYS = {'material': 'item'}
+
+# Steps before navigate_to retries a path search that failed for the same target
+PATH_RETRY_STEPS = 20
+
+# Decision scheduler (see Agent.should_think): plans that may be carried
+# forward between thinks, and the hunger levels whose crossing forces a re-plan
+# (the ones propose_action and the Nafs checks branch on)
+CARRY_ACTIONS = {'find_resource', 'wander', 'flee'}
+HUNGER_THRESHOLDS = (0.4, 0.6, 0.8, 0.9)
+
 RECIPES = {
     "Hammer": {"Wood": 1, "Stone": 1},
     "Spear": {"Wood": 2, "Stone": 1},
@@ -112,8 +135,7 @@ class AgentAttributes:
 
 @dataclass
 class AgentState:
-    health: float = 1.0
-    happiness: float = 0.5
+    # health and happiness live in the agent's AgentStore slot (see below)
     experience: float = 0.0
     busy_until: int = 0
     last_interaction: Dict[str, Any] = field(default_factory=dict)
@@ -124,6 +146,10 @@ class AgentState:
     
     age_steps: int = 0
     momentum_dir: tuple = (0, 0) # (dx, dy) for smoother wandering
+    agent: Any = field(default=None, repr=False, compare=False)
+
+    health = StoreField()    # 1.0 Healthy -> 0.0 Dead
+    happiness = StoreField()
 
 # --- THE TRI-PARTITE PROTOCOL ---
 
@@ -132,6 +158,11 @@ class Nafs:
     The Base Layer (The Reptile).
     Responsible for Biological Survival, Hunger, Pain, and Reactive Defense.
     """
+    hunger = StoreField()
+    energy = StoreField()
+    pain = StoreField()
+    lust = StoreField()
+
     def __init__(self, agent):
         self.agent = agent
         self.hunger: float = 0.0 # 0.0 Full -> 1.0 Starving
@@ -156,7 +187,7 @@ class Nafs:
         # 1. Starvation Damage
         if self.hunger >= 1.0:
             self.agent.state.health -= 0.02 # Fast death
-            if np.random.random() < 0.1: self.agent.log_diary("I am starving to death...")
+            if self.agent.rng.random() < 0.1: self.agent.log_diary("I am starving to death...")
             
         # 2. Regeneration (Well-fed & Rested)
         if self.hunger < 0.3 and self.energy > 0.5:
@@ -182,13 +213,17 @@ class Nafs:
                 return True
         return False
 
+    def nearby_threats(self, world) -> List:
+        """Carnivores within 15 tiles, nearest first."""
+        return [a for _, a in world.query_radius(self.agent.x, self.agent.y, 15, kind='animal') if a.type == 'carnivore']
+
     def check_survival_instinct(self, world) -> Optional[Dict]:
         """
         Overrides higher functions if immediate survival is threatened.
         Returns an Action Plan if override is necessary.
         """
         # 1. Flee Predators (Immediate)
-        nearby_threats = [a for a in world.animals if a.type == 'carnivore' and self.agent.distance_to(a) < 15]
+        nearby_threats = self.nearby_threats(world)
         if nearby_threats:
             self.agent.log_diary("NAFS TAKEOVER: Fleeing predator!")
             return {'action': 'flee', 'target': nearby_threats[0]}
@@ -205,17 +240,68 @@ class Nafs:
             
         return None
 
+class Opinions(dict):
+    """
+    agent_id -> opinion. A plain dict that also tells watchers (tribes) when
+    one watched entry changes, so a tribe's harmony stays current without
+    re-reading every member. Only item assignment and deletion are observed.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.watchers = {} # watcher.id -> (watched agent_id, watcher)
+
+    def watch(self, key: str, watcher):
+        self.watchers[watcher.id] = (key, watcher)
+
+    def unwatch(self, watcher):
+        self.watchers.pop(watcher.id, None)
+
+    def __reduce__(self):
+        # Pickled copies (shard migration) start unwatched: watchers are tribes of the old World
+        return (Opinions, (dict(self),))
+
+    def __setitem__(self, key, value):
+        if self.watchers:
+            old = self.get(key, 0)
+            super().__setitem__(key, value)
+            for watched, watcher in list(self.watchers.values()):
+                if watched == key:
+                    watcher.opinion_changed(old, value)
+        else:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        old = self.get(key, 0)
+        super().__delitem__(key)
+        for watched, watcher in list(self.watchers.values()):
+            if watched == key:
+                watcher.opinion_changed(old, 0)
+
+# path -> loaded RL model (None if it failed), shared by every agent of this
+# process: models are only read, and migrating agents reload theirs on arrival
+_BRAINS: Dict[str, object] = {}
+
+def _load_model(path):
+    if path not in _BRAINS:
+        _BRAINS[path] = None
+        from stable_baselines3 import PPO
+        _BRAINS[path] = PPO.load(path)
+    return _BRAINS[path]
+
 class Qalb:
     """
     The Middle Layer (The Heart/Ego).
     Responsible for Society, Emotion, Mediation, and Daily Logic.
     """
+    social = StoreField()
+    fun = StoreField()
+
     def __init__(self, agent):
         self.agent = agent
         self.social: float = 1.0 # 1.0 Connected -> 0.0 Lonely
         self.fun: float = 1.0    # 1.0 Entertained -> 0.0 Bored
         self.emotional_state: str = "Neutral"
-        self.opinions: Dict[str, float] = {} # agent_id -> -1.0 to 1.0
+        self.opinions: Dict[str, float] = Opinions() # agent_id -> -1.0 to 1.0
         self.social_memory: Dict[str, str] = {} # agent_id -> 'cooperate' or 'defect' (Last move they made against me)
         self.history: Dict[str, List[str]] = {} # agent_id -> List of past moves for complex strategies
         self.social_cooldowns: Dict[str, int] = {} # agent_id -> timestamp when cooldown expires
@@ -225,11 +311,30 @@ class Qalb:
         # Social goals
         self.current_social_target: Optional[str] = None
         self.brain = None # RL Model
+        self.brain_path: Optional[str] = None # Where it was loaded from (pickled copies reload it)
+        self.batched_desire = None # (time_step, dominant, intensity, unknown_nearby, nearest_rival) from the desire engine
+
+    def __getstate__(self):
+        # Pickled with its agent (see Agent.__getstate__): the RL model goes as
+        # its path, and no desire-engine result pointing at other agents
+        state = self.__dict__.copy()
+        state.update(brain=None, batched_desire=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.__dict__.setdefault('brain_path', None):
+            try:
+                self.brain = _load_model(self.brain_path)
+            except Exception as e:
+                print(f"Failed to reload brain from {self.brain_path}: {e}")
 
     def load_brain(self, path):
         try:
-            from stable_baselines3 import PPO
-            self.brain = PPO.load(path)
+            self.brain = _load_model(path)
+            if self.brain is None:
+                raise RuntimeError(f"{path} failed to load earlier")
+            self.brain_path = path
             print(f"Agent {self.agent.attributes.name} loaded brain from {path}")
         except Exception as e:
             print(f"Failed to load brain: {e}")
@@ -274,7 +379,7 @@ class Qalb:
                 self.opinions[other_id] = min(100, current_op + 0.1)
                 
                 # 3. Log occasionally
-                if np.random.random() < 0.05:
+                if self.agent.rng.random() < 0.05:
                     self.agent.log_diary(f"Chatting with {other.attributes.name} while working.")
 
     def propose_action(self, world) -> Dict:
@@ -303,6 +408,34 @@ class Qalb:
             # if action_idx == 4: return {'action': 'step_x', 'val': 1, 'desc': 'Moving Right'}
             # if action_idx == 5: return {'action': 'interact', 'desc': 'interacting'}
 
+        # The batched desire engine (World.begin_tick) may have scored us already
+        cached = self.batched_desire
+        if cached and cached[0] == world.time_step:
+            _, dominant_desire, intensity, unknown_nearby, nearest_rival = cached
+        else:
+            desires, unknown_nearby, nearest_rival = self.desires(world)
+            dominant_desire = max(desires, key=desires.get)
+            intensity = desires[dominant_desire]
+        
+        # DEBUG
+        if intensity > 0.0:
+            self.agent.log_diary(f"DEBUG: Desire {dominant_desire} ({intensity:.2f})")
+            pass
+
+        # REPRODUCTION (Opportunistic Override) - DISABLED
+        # User wants reproduction only on specific milestones (multiples of 60 opinion)
+        # if self.agent.state.happiness > 0.6 and self.agent.attributes.partner_id:
+        #      if self.agent.nafs.energy > 0.4:
+        #          return {'action': 'reproduce', 'desc': "Expanding the bloodline."}
+
+        return self.plan_for(dominant_desire, intensity, unknown_nearby, nearest_rival)
+
+    def desires(self, world) -> Tuple[Dict[str, float], bool, Optional[Any]]:
+        """
+        Desire strengths (0.0 to 1.0, insertion order = DESIRES) plus what the
+        action mapping needs: whether a stranger is nearby and the nearest rival.
+        app/agents/desire.py computes the same thing for many agents at once.
+        """
         p = self.agent.attributes.personality_vector
 
         # --- THE DESIRE SYSTEM ---
@@ -337,11 +470,8 @@ class Qalb:
         
         # OPPORTUNITY BONUS
         # If I see someone close, it's "Cheap" to socialize.
-        nearest_agent_dist = 999.0
-        for other in world.agents.values():
-             if other.id == self.agent.id: continue
-             d = self.agent.distance_to(other)
-             if d < nearest_agent_dist: nearest_agent_dist = d
+        nearby = world.query_radius(self.agent.x, self.agent.y, 5.0, kind='agent', exclude_id=self.agent.id)
+        nearest_agent_dist = nearby[0][0] if nearby else 999.0
         
         if nearest_agent_dist < 5.0:
              desire_social += 0.7 # Interaction is irresistible when close
@@ -373,10 +503,7 @@ class Qalb:
         # Let's use the 'candidates' from vision scan in propose_action? No, that's inside socialize.
         # We need a quick check here.
         
-        for other in world.agents.values():
-            if other.id == self.agent.id: continue
-            dist = self.agent.distance_to(other)
-            if dist < 15: # Visual range
+        for dist, other in world.query_radius(self.agent.x, self.agent.y, 15, kind='agent', exclude_id=self.agent.id): # Visual range
                  if other.id not in self.agent.qalb.opinions:
                      unknown_nearby = True
                      candidates.append(other)
@@ -439,8 +566,26 @@ class Qalb:
         desires["Gift"] = 0.0
         
         inventory_count = sum([s['count'] for s in self.agent.inventory])
+        self.exchange_desires(desires, p, inventory_count)
         
+        # DAMPENER: Full Inventory
+        inventory_count = sum([s['count'] for s in self.agent.inventory])
+        if inventory_count >= 20:
+            desires["Find Wood"] *= 0.1
+            desires["Find Stone"] *= 0.1
+            desires["Find Food"] *= 0.1
+
+        # 8. Violence (Aggression + Rivalry)
+        desires["Violence"] = 0.0
         
+        # Base Aggression
+        if p["Aggression"] > 0.8: desires["Violence"] += 0.2
+        
+        nearest_rival = self.rival_desires(desires, world)
+        return desires, unknown_nearby, nearest_rival
+
+    def exchange_desires(self, desires: Dict[str, float], p: Dict[str, float], inventory_count: int):
+        """Raises Gift/Trade from what visible neighbors need or carry (reads Find Wood, before dampening)."""
         # Look at visible neighbors
         for agent_id, state in self.agent.visible_agents_state.items():
              # Distance check (must be close to trade)
@@ -465,20 +610,9 @@ class Qalb:
              # General Trading (Crafting needs)
              if desires["Find Wood"] > 0.5 and "Wood" in str(state['inventory']):
                   desires["Trade"] = max(desires["Trade"], 0.6)
-        
-        # DAMPENER: Full Inventory
-        inventory_count = sum([s['count'] for s in self.agent.inventory])
-        if inventory_count >= 20:
-            desires["Find Wood"] *= 0.1
-            desires["Find Stone"] *= 0.1
-            desires["Find Food"] *= 0.1
 
-        # 8. Violence (Aggression + Rivalry)
-        desires["Violence"] = 0.0
-        
-        # Base Aggression
-        if p["Aggression"] > 0.8: desires["Violence"] += 0.2
-        
+    def rival_desires(self, desires: Dict[str, float], world) -> Optional[Any]:
+        """Raises Violence for visible rivals and tribe enemies; returns the one to attack (or None)."""
         # Check Neighbors for Rivals
         nearest_rival = None
         min_dist = 999
@@ -509,24 +643,10 @@ class Qalb:
                              desires["Violence"] = 1.0 # WAR!
                              rival = world.agents.get(agent_id)
                              if rival: nearest_rival = rival
+        return nearest_rival
 
-        # --- ARBITRATION ---
-        
-        dominant_desire = max(desires, key=desires.get)
-        intensity = desires[dominant_desire]
-        
-        # DEBUG
-        if intensity > 0.0:
-            self.agent.log_diary(f"DEBUG: Desire {dominant_desire} ({intensity:.2f})")
-            pass
-
-        # REPRODUCTION (Opportunistic Override) - DISABLED
-        # User wants reproduction only on specific milestones (multiples of 60 opinion)
-        # if self.agent.state.happiness > 0.6 and self.agent.attributes.partner_id:
-        #      if self.agent.nafs.energy > 0.4:
-        #          return {'action': 'reproduce', 'desc': "Expanding the bloodline."}
-
-        # ACTION MAPPING
+    def plan_for(self, dominant_desire: str, intensity: float, unknown_nearby: bool, nearest_rival) -> Dict:
+        """ACTION MAPPING: the plan for the strongest desire."""
         if dominant_desire == "Eat":
             if intensity > 0.2: 
                 return {'action': 'find_resource', 'resource': 'consumable', 'desc': "Seeking sustenance."}
@@ -589,7 +709,7 @@ class Ruh:
     """
     def __init__(self, agent, soul: Optional[Soul] = None):
         self.agent = agent
-        self.soul = soul if soul else Soul(id=str(uuid.uuid4()), memories=[])
+        self.soul = soul if soul else Soul(id=random_id(agent.rng), memories=[])
         self.life_goal: str = "Survival" # Default
         self.wisdom: float = self.soul.wisdom_score
         
@@ -625,23 +745,30 @@ class Ruh:
 # --- MAIN AGENT CLASS ---
 
 class Agent:
-    def __init__(self, x: int, y: int, name: str = None, gender: str = None, soul: Soul = None, birth_time: int = 0):
-        self.id = str(uuid.uuid4())
-        self.x = x
-        self.y = y
+    def __init__(self, x: int, y: int, name: str = None, gender: str = None, soul: Soul = None, birth_time: int = 0,
+                 rng: Optional[np.random.Generator] = None):
+        # Every draw this agent makes (identity, behavior) comes from its own
+        # stream: a World substream (World.new_agent) or, outside any World,
+        # one seeded from np.random (see env/rng.py)
+        self.rng = rng if rng is not None else legacy_stream()
+        self.id = random_id(self.rng)
+        # Numeric state lives in a private store until a World adopts us (see attach)
+        self._store = AgentStore(1)
+        self._slot = self._store.allocate(self)
+        self.place(x, y)
         self.birth_time = birth_time
         
         # Identity
         if gender is None: 
             # Force 50/50 distribution roughly using random choice
-            gender = np.random.choice(['male', 'female'], p=[0.5, 0.5])
-        if name is None: name = np.random.choice(NAMES_MALE if gender == 'male' else NAMES_FEMALE)
+            gender = self.rng.choice(['male', 'female'], p=[0.5, 0.5])
+        if name is None: name = self.rng.choice(NAMES_MALE if gender == 'male' else NAMES_FEMALE)
         
         # Personality
-        p_vector = {trait: np.random.random() for trait in PERSONALITY_TRAITS}
+        p_vector = {trait: self.rng.random() for trait in PERSONALITY_TRAITS}
         
         self.attributes = AgentAttributes(name=name, gender=gender, personality_vector=p_vector)
-        self.state = AgentState()
+        self.state = AgentState(agent=self)
         
         # Inventory & Knowledge
         # Inventory & Knowledge
@@ -661,6 +788,22 @@ class Agent:
             'stone': [],
             'agent': []
         }
+        self._known_places: Dict[str, Tuple[List, Set]] = {} # category -> (list, set mirror)
+        self._sightings: Dict[str, Dict] = {} # agent id -> spatial_memory['agent'] entry
+        self.perceived_step = -1 # Time step of the last perception pass
+        self.biology_step = -1 # Time step of the last batched biology pass (see World.update_biology)
+        
+        # Decision Scheduler (see should_think)
+        self.plan: Optional[Dict] = None # Last decided action plan, carried forward between thinks
+        self.plan_step = -1 # Time step it was decided
+        self.plan_done = False # Set by execute_action when a multi-step plan finishes
+        self.plan_hunger = 0.0 # Hunger when it was decided
+        self._think = (-1, True) # (time_step, should_think) memo
+        self.think_count = 0 # Steps spent deciding
+        self.carry_count = 0 # Steps that carried the plan forward
+        self.lod_count = 0 # Cheap low-detail steps (see World.low_detail)
+        self.lod_phase = int(self.id[:8], 16) # Staggers low-detail agents' full steps
+        self._path: Optional[Dict] = None # Cached navigate_to path (see _next_path_step)
         
         # Internal Systems
         self.nafs = Nafs(self)
@@ -707,9 +850,16 @@ class Agent:
 
         self.state.age_steps += 1
         
+        # Sub-stage timings when the world's profiler is on (see env/profiler.py)
+        profiler = getattr(world, 'profiler', None)
+        profiler = profiler if profiler is not None and profiler.enabled else None
+        t = clock() if profiler else 0
+        
         # 1. Update Internal Systems
-        self.nafs.update(world)
-        self.qalb.update(world)
+        # Skipped when World.update_biology already ran them for us this tick
+        if self.biology_step != world.time_step:
+            self.nafs.update(world)
+            self.qalb.update(world)
         
         # Tribe Leader Duty
         if self.attributes.tribe_id and self.attributes.leader_id == self.id:
@@ -718,8 +868,29 @@ class Agent:
                 tribe.assess_needs()
                 self.log_diary(f"Tribe Goal Updated: {tribe.goal}")
         
+        # 1.1 Level of Detail: alone and unwatched, most steps are a cheap drift
+        if hasattr(world, 'low_detail') and world.low_detail(self):
+            self.lod_count += 1
+            self.nafs.check_survival_eating()
+            self.drift(world)
+            if profiler: profiler.lap("act.lod", t)
+            return
+        
+        if profiler: t = profiler.lap("act.biology", t)
+        
+        # 1.2 Decision Scheduler: between thinks, just keep doing the plan
+        if external_action is None and not self.should_think(world):
+            self.carry_count += 1
+            self.execute_action(self.plan, world)
+            if profiler: profiler.lap("act.carry", t)
+            return
+        self.think_count += 1
+        
         # 1.5 Perception (Vision)
-        self.scan_surroundings(world)
+        # Skipped when the batched pass already saw for us this tick
+        if self.perceived_step != world.time_step:
+            self.scan_surroundings(world)
+        if profiler: t = profiler.lap("act.perception", t)
 
         # 2. MULTITASKING KERNEL
         # If socially locked, run the conversation loop IN PARALLEL
@@ -735,6 +906,7 @@ class Agent:
                  self.state.social_lock_target = None
                  self.state.social_lock_steps = 0
                  self.log_diary("Social connection lost (distance).")
+             if profiler: t = profiler.lap("act.social", t)
 
         # 2. Decision Making (TRI-PARTITE SYSTEM)
         action_plan = None
@@ -786,8 +958,53 @@ class Agent:
         if action_plan and action_plan['action'] != 'sleep':
             self.qalb.check_passive_social(world)
 
+        self.plan, self.plan_step, self.plan_done = action_plan, world.time_step, False
+        self.plan_hunger = self.nafs.hunger
+        if profiler: t = profiler.lap("act.decide", t)
+
         # 5. Execution
         self.execute_action(action_plan, world)
+        if profiler: profiler.lap("act.execute", t)
+
+    def should_think(self, world, remember: bool = True) -> bool:
+        """
+        Whether this step re-plans (perception, Nafs/Qalb/Ruh, brain) or just
+        carries the last plan forward. Re-plans every world.think_interval
+        steps, and early on any salient event: the plan finished or can't be
+        carried, a threat appeared (or a fled one is gone), hunger crossed a
+        HUNGER_THRESHOLDS level, the plan's target vanished, or a
+        conversation is running. Memoized per step, so World.begin_tick and
+        act() agree; begin_tick passes remember=False when act() has yet to
+        run Nafs.update (legacy biology), so act() asks again with this
+        step's hunger.
+        """
+        step, thinking = self._think
+        if step == world.time_step:
+            return thinking
+        thinking = self._needs_to_think(world)
+        if remember:
+            self._think = (world.time_step, thinking)
+        return thinking
+
+    def _needs_to_think(self, world) -> bool:
+        plan = self.plan
+        if getattr(world, 'think_interval', 1) <= 1 or plan is None or self.plan_done:
+            return True
+        if world.time_step - self.plan_step >= world.think_interval:
+            return True
+        if plan['action'] not in CARRY_ACTIONS:
+            return True
+        if self.state.social_lock_target and self.state.social_lock_steps > 0:
+            return True
+        hunger = self.nafs.hunger
+        if any((self.plan_hunger < t) != (hunger < t) for t in HUNGER_THRESHOLDS):
+            return True
+        target = plan.get('target')
+        if target is not None and hasattr(target, 'id') and \
+                target.id not in world.agent_grid and target.id not in world.animal_grid:
+            return True
+        threatened = bool(self.nafs.nearby_threats(world))
+        return threatened != (plan['action'] == 'flee')
         
     def execute_action(self, plan: Dict, world):
         """Dispatches the action."""
@@ -830,8 +1047,7 @@ class Agent:
                 
                 # Create Wall Item
                 from ..env.item import Item
-                import uuid
-                wall = Item(id=f"wall_{uuid.uuid4()}", name="Wall", weight=100.0, hardness=1.0, durability=10.0, tags=["building", "defense"])
+                wall = Item(id=f"wall_{world.random.new_id()}", name="Wall", weight=100.0, hardness=1.0, durability=10.0, tags=["building", "defense"])
                 
                 # Place in World
                 world._add_item(self.x, self.y, wall)
@@ -846,8 +1062,7 @@ class Agent:
                     
                 # Create Stone Block
                 from ..env.item import Item
-                import uuid
-                block = Item(id=f"sb_{uuid.uuid4()}", name="Stone Block", weight=5.0, hardness=0.8, durability=1.0, tags=["material", "building"])
+                block = Item(id=f"sb_{world.random.new_id()}", name="Stone Block", weight=5.0, hardness=0.8, durability=1.0, tags=["material", "building"])
                 self._add_to_inventory(block)
                 self.log_diary("Crafted a Stone Block.")
                 
@@ -888,12 +1103,11 @@ class Agent:
                 mem_type = 'wood'
             
             knowns = self.spatial_memory.get(mem_type, [])
-            if knowns:
-                # Find nearest known
-                # Sort by distance
-                knowns.sort(key=lambda p: (p[0]-self.x)**2 + (p[1]-self.y)**2)
-                target = knowns[0]
-                
+            # Sort by distance, nearest first
+            knowns.sort(key=lambda p: (p[0]-self.x)**2 + (p[1]-self.y)**2)
+            # Nearest known that is on our land mass (the rest stay in memory)
+            target = next((p for p in knowns if self.can_reach(p[0], p[1], world)), None)
+            if target:
                 # Go there
                 # Go there
                 dist_sq = (target[0]-self.x)**2 + (target[1]-self.y)**2
@@ -901,13 +1115,14 @@ class Agent:
                 if dist_sq == 0:
                     # On top: Gather!
                     self.gather(world)
+                    self.plan_done = True # Re-decide next step
                     # If empty, remove from memory
                     if target not in world.items_grid:
-                        knowns.pop(0) # Remove from memory
+                        knowns.remove(target) # Remove from memory
                         # We are done with this step, wait for next decision
                 else:
                     # Move towards
-                    self.navigate_to(target[0], target[1], world)
+                    self.navigate_to(target[0], target[1], world, flow=mem_type)
             else:
                 # Explore (Smart Wander)
                 self.move_random(world)
@@ -935,6 +1150,7 @@ class Agent:
          for other_id, state in self.visible_agents_state.items():
              other = world.agents.get(other_id)
              if not other: continue
+             if not self.can_reach(other.x, other.y, world): continue # Across water
              d = self.distance_to(other)
              if d < min_dist:
                  min_dist = d
@@ -975,8 +1191,7 @@ class Agent:
                  # Add Stone Block (Magic creation for now, ignoring Item class instantiation detail)
                  # We need to create specific Item object
                  from ..env.item import Item
-                 import uuid
-                 block = Item(id=f"sb_{uuid.uuid4()}", name="Stone Block", weight=5.0, hardness=0.8, durability=1.0, tags=["material", "building"])
+                 block = Item(id=f"sb_{world.random.new_id()}", name="Stone Block", weight=5.0, hardness=0.8, durability=1.0, tags=["material", "building"])
                  self._add_to_inventory(block)
                  self.log_diary("Crafted a Stone Block.")
              else:
@@ -1000,8 +1215,7 @@ class Agent:
                  
                  # Place Wall Item
                  from ..env.item import Item
-                 import uuid
-                 wall = Item(id=f"wall_{uuid.uuid4()}", name="Wall", weight=100.0, hardness=1.0, durability=10.0, tags=["building", "heavy"])
+                 wall = Item(id=f"wall_{world.random.new_id()}", name="Wall", weight=100.0, hardness=1.0, durability=10.0, tags=["building", "heavy"])
                  
                  # Placement Logic: Near Tribe Center or Self
                  # For now, place right here. 
@@ -1049,96 +1263,98 @@ class Agent:
         # Reincarnation Logic (Evolution)
         # We don't spawn immediately here (handled by world births), but we save the soul?
         # For now, just remove from world.
-        del world.agents[self.id]
+        world.remove_agent(self.id)
         
     def scan_surroundings(self, world):
         """
-        Probabilistic Infinite Vision.
-        Probability of seeing = 1.0 / (1.0 + max(0, dist - 20) * 0.1)
+        Probabilistic vision, capped at VISION_RANGE.
+        Probability of seeing = 1.0 / (1.0 + max(0, dist - 20) * 0.05)
         Near (<=20): 100%
-        Far (>20): Decays.
+        Far (>20): Decays, down to ~25% just inside VISION_RANGE.
+        Beyond (>= VISION_RANGE): never seen.
+        This is the legacy per-agent pass; app.agents.perception.perceive does
+        the same for every agent at once (see World.begin_tick).
         """
-        # We cannot iterate ALL items in world every step for every agent (O(N^2)). 
-        # But for limited N (~50 agents, ~100 items?), it is okay.
-        # Let's optimize: Only scan if not busy? No, perception is passive.
-        # Clear agent memory for fresh scan
-        if 'agent' not in self.spatial_memory: self.spatial_memory['agent'] = []
-        
-        # Cleanup old memories (older than 500 steps)
-        self.spatial_memory['agent'] = [m for m in self.spatial_memory['agent'] if world.time_step - m.get('time', 0) < 500]
-        
-        self.visible_agents = [] # Reset per frame
-        
-        # 1. Scan Items (Food/Wood/Stone)
-        
-        # 1. Scan Items (Food/Wood/Stone)
-        # Note: In a real large grid, we would use a spatial index (Quadtree). 
-        # For 100x100 grid, raw iteration over dictionary keys is fast enough.
-        
-        for pos, items in world.items_grid.items():
-            dist = np.sqrt((self.x - pos[0])**2 + (self.y - pos[1])**2)
-            
-            # Probabilistic Vision (100% at 20, ~66% at 30)
-            prob = 1.0
-            if dist > 20: 
-                prob = 1.0 / (1.0 + (dist - 20) * 0.05)
-            
-            if np.random.random() < prob:
-                # Seen! Memorize.
-                # Simplified: Just store 'food' or type
-                item_name = items[0].name.lower()
-                category = 'food' if 'consumable' in items[0].tags else 'item'
-                if 'wood' in item_name: category = 'wood'
-                if 'rock' in item_name or 'stone' in item_name: category = 'stone'
+        self.begin_scan(world)
+        
+        # 1. Scan Items (Food/Wood/Stone/Item)
+        # The world's resource index only hands us cells inside vision range.
+        for category in RESOURCE_CATEGORIES:
+            key = MEMORY_KEYS.get(category, category)
+            for dist, pos in world.query_resources(self.x, self.y, VISION_RANGE, category=category):
+                # Probabilistic Vision (100% at 20, ~66% at 30)
+                prob = 1.0
+                if dist > 20: 
+                    prob = 1.0 / (1.0 + (dist - 20) * 0.05)
                 
-                # Add to memory (Set logic)
-                if pos not in self.spatial_memory.get(category, []):
-                     if category not in self.spatial_memory: self.spatial_memory[category] = []
-                     self.spatial_memory[category].append(pos)
+                if self.rng.random() < prob:
+                    self.remember_place(key, pos)
 
         # 2. Scan Agents (Social)
-        for other in world.agents.values():
-            if other.id == self.id: continue
-            dist = self.distance_to(other)
-             
+        for dist, other in world.query_radius(self.x, self.y, VISION_RANGE, kind='agent', exclude_id=self.id):
             # Probabilistic Vision
             prob = 1.0
             if dist > 20:
                 prob = 1.0 / (1.0 + (dist - 20) * 0.05)
             
-            if np.random.random() < prob:
-                # Add to known agents (We use opinions dict for now, or spatial)
-                # Let's add to spatial memory 'agent'
-                if 'agent' not in self.spatial_memory: self.spatial_memory['agent'] = []
-                # Remove if exist (inefficient but needed to update pos)
-                # self.spatial_memory['agent'] = [pos for pos in self.spatial_memory['agent'] if pos[2] != other.id] # Tuple doesn't have ID in spatial def?
-                # Definition: self.spatial_memory: Dict[str, List[Tuple[int, int]]]
-                # We need ID to track who it is. Update definition or use opinions.
-                # Opinions has persistent ID. Use that for identification.
-                # Spatial memory is for "Resource Locations".
-                # For agents, let's just use a separate list in memory or update opinions 'last_seen'
-                # For the 'Proximity Bonus' in propose_action, we need positions.
-                # Let's simple append (x,y) to 'agent' list, clear it every step? 
-                # Better: In propose_action, use `world.agents` directly if we allow "Sense" there.
-                # But we want strict memory.
-                # Let's just append to spatial_memory['agent'] tuple (x,y)
-                # self.spatial_memory['agent'].append((other.x, other.y))
-                
-                # STORE MEMORY WITH TIMESTAMPS
-                # Check if we already have this agent in memory, update it
-                mem_entry = next((m for m in self.spatial_memory['agent'] if m['id'] == other.id), None)
-                if mem_entry:
-                    mem_entry['pos'] = (other.x, other.y)
-                    mem_entry['time'] = world.time_step
-                else:
-                    self.spatial_memory['agent'].append({'pos': (other.x, other.y), 'id': other.id, 'time': world.time_step})
-                
-                # PUBLIC STATE OBSERVATION
-                self.visible_agents_state[other.id] = other.get_public_state()
-                
-                # DEBUG: Log sighting
-                self.log_diary(f"DEBUG: Saw {other.attributes.name} at {dist:.1f}")
-                self.visible_agents.append(other.attributes.name)
+            if self.rng.random() < prob:
+                self.see_agent(other, dist, world)
+
+    def begin_scan(self, world):
+        """Start of a perception pass: ages out old sightings and resets per-frame vision."""
+        if 'agent' not in self.spatial_memory: self.spatial_memory['agent'] = []
+        
+        # Cleanup old memories (older than 500 steps)
+        self.spatial_memory['agent'] = [m for m in self.spatial_memory['agent'] if world.time_step - m.get('time', 0) < 500]
+        self._sightings = {m['id']: m for m in self.spatial_memory['agent']}
+        
+        self.visible_agents = [] # Reset per frame
+        self.perceived_step = world.time_step
+
+    def remember_place(self, category: str, pos: Tuple[int, int]):
+        """Memorize a resource location (set logic)."""
+        places, known = self._place_memory(category)
+        if pos not in known:
+            places.append(pos)
+            known.add(pos)
+
+    def remember_places(self, category: str, seen: Set[Tuple[int, int]]):
+        """Bulk remember_place for a set of locations (used by the batched pass)."""
+        places, known = self._place_memory(category)
+        new = seen - known
+        if new:
+            places.extend(sorted(new))
+            known |= new
+
+    def _place_memory(self, category: str):
+        places = self.spatial_memory.setdefault(category, [])
+        # Set mirror of the list for O(1) membership; other code pops from (or
+        # replaces) the lists, so a different list or length means it is stale.
+        cached = self._known_places.get(category)
+        if cached is None or cached[0] is not places or len(cached[1]) != len(places):
+            cached = self._known_places[category] = (places, set(places))
+        return cached
+
+    def see_agent(self, other, dist: float, world, public_state: Optional[Dict] = None):
+        """Record a sighting of `other` (position memory, public state, diary)."""
+        # STORE MEMORY WITH TIMESTAMPS
+        # Opinions has the persistent ID; spatial memory keeps the last seen
+        # position so socializing can seek agents that walked out of view.
+        mem_entry = self._sightings.get(other.id)
+        if mem_entry:
+            mem_entry['pos'] = (other.x, other.y)
+            mem_entry['time'] = world.time_step
+        else:
+            mem_entry = {'pos': (other.x, other.y), 'id': other.id, 'time': world.time_step}
+            self.spatial_memory['agent'].append(mem_entry)
+            self._sightings[other.id] = mem_entry
+        
+        # PUBLIC STATE OBSERVATION
+        self.visible_agents_state[other.id] = public_state if public_state is not None else other.get_public_state()
+        
+        # DEBUG: Log sighting
+        self.log_diary(f"DEBUG: Saw {other.attributes.name} at {dist:.1f}")
+        self.visible_agents.append(other.attributes.name)
 
 
     def reproduce_in_game(self, world):
@@ -1160,7 +1376,7 @@ class Agent:
              # 0.5 chance for Single (1)
              # Remaining 0.4 = Failure
              
-             rand = np.random.random()
+             rand = self.rng.random()
              children_count = 0
              
              if rand < 0.1:
@@ -1226,6 +1442,15 @@ class Agent:
             # Update last known position handled by world, but we could update internal tracking if any
         return success
 
+    def drift(self, world):
+        """Low-detail movement: keep the momentum most of the time, otherwise turn randomly."""
+        mx, my = self.state.momentum_dir
+        if (mx == 0 and my == 0) or self.rng.random() < 0.2:
+            mx, my = int(self.rng.integers(-1, 2)), int(self.rng.integers(-1, 2))
+        if not world.move_agent(self.id, mx, my):
+            mx, my = 0, 0 # Blocked: pick a new heading next time
+        self.state.momentum_dir = (mx, my)
+
     def move_random(self, world):
         # 1. Follow Leader (Swarm Bias)
         if self.attributes.leader_id and self.attributes.leader_id != self.id:
@@ -1234,24 +1459,30 @@ class Agent:
                 # COHESION BIAS: 30% chance to correct course towards swarm center
                 dist = self.distance_to(leader)
                 if dist > 3.0: # Too far, catch up
-                     if np.random.random() < 0.3:
-                        dx = leader.x - self.x
-                        dy = leader.y - self.y
-                        # Normalize
-                        mx = 1 if dx > 0 else -1 if dx < 0 else 0
-                        my = 1 if dy > 0 else -1 if dy < 0 else 0
-                        self.state.momentum_dir = (mx, my)
+                     if self.rng.random() < 0.3:
+                        # The leader's flow field steers around water; every
+                        # follower shares it
+                        step = world.flow_step(f"leader:{leader.id}", self.x, self.y) if hasattr(world, 'flow_step') else None
+                        if step:
+                            self.state.momentum_dir = step
+                        else:
+                            dx = leader.x - self.x
+                            dy = leader.y - self.y
+                            # Normalize
+                            mx = 1 if dx > 0 else -1 if dx < 0 else 0
+                            my = 1 if dy > 0 else -1 if dy < 0 else 0
+                            self.state.momentum_dir = (mx, my)
 
         # Apply Momentum (Drift)
-        if np.random.random() < 0.6:
+        if self.rng.random() < 0.6:
              mx, my = self.state.momentum_dir
              if mx != 0 or my != 0:
                  world.move_agent(self.id, mx, my)
                  return
                  
         # Explicit Random
-        mx = np.random.randint(-1, 2)
-        my = np.random.randint(-1, 2)
+        mx = int(self.rng.integers(-1, 2))
+        my = int(self.rng.integers(-1, 2))
         # Update momentum
         self.state.momentum_dir = (mx, my)
         world.move_agent(self.id, mx, my)
@@ -1269,7 +1500,7 @@ class Agent:
                      is_valid = True
         
         # 2. If valid and lucky, keep going (Momentum)
-        if is_valid and np.random.random() < 0.8:
+        if is_valid and self.rng.random() < 0.8:
              next_dir = current_dir
         else:
              # 3. Pick a new valid direction
@@ -1296,7 +1527,7 @@ class Agent:
              if options:
                  # Weighted random choice
                  total_w = sum(o[1] for o in options)
-                 r = np.random.uniform(0, total_w)
+                 r = self.rng.uniform(0, total_w)
                  upto = 0
                  next_dir = (0, 0)
                  for d, w in options:
@@ -1319,74 +1550,99 @@ class Agent:
         my = 1 if dy > 0 else -1 if dy < 0 else 0
         world.move_agent(self.id, mx, my)
 
-    def navigate_to(self, tx, ty, world):
+    def navigate_to(self, tx, ty, world, flow: Optional[str] = None):
         """
-        Smart navigation using BFS to avoid water/obstacles.
-        Refreshes path every step (for simplicity) or uses cached path.
+        Smart navigation using A* to avoid water/obstacles.
+        Steps straight at the target while that works; once blocked, follows
+        the world's shared flow field for `flow` (e.g. 'food') if the target is
+        one of its goals, else plans an A* path. Either is kept (cached) until
+        the target moves away or the terrain along the path changes.
         """
-        # 1. Try naive match first (Optimization)
-        dx = tx - self.x
-        dy = ty - self.y
-        mx = 1 if dx > 0 else -1 if dx < 0 else 0
-        my = 1 if dy > 0 else -1 if dy < 0 else 0
-        
-        # Check if direct move is blocked by water
-        # Boundary check first
-        target_x, target_y = self.x + mx, self.y + my
-        if 0 <= target_x < world.width and 0 <= target_y < world.height:
-             if world.terrain_grid[target_y][target_x] != 0: # Not Water
-                 # Safe to move directly
-                 world.move_agent(self.id, mx, my)
-                 return
-        
-        # 2. PATHFINDING (BFS)
-        # Find shortest path to (tx, ty)
-        queue = [(self.x, self.y, [])]
-        visited = set()
-        visited.add((self.x, self.y))
-        
-        # Limit depth to prevent lag
-        max_depth = 25
-        
-        found_path = None
-        
-        while queue:
-            cx, cy, path = queue.pop(0)
+        # 1. Cached path / flow field from an earlier detour
+        step = self._next_path_step(tx, ty, world)
+        
+        if step is None:
+            # 2. Try naive match first (Optimization)
+            dx = tx - self.x
+            dy = ty - self.y
+            mx = 1 if dx > 0 else -1 if dx < 0 else 0
+            my = 1 if dy > 0 else -1 if dy < 0 else 0
             
-            if len(path) > max_depth: continue
-            
-            # Neighbors (Up, Down, Left, Right)
-            for nx, ny in [(cx+1, cy), (cx-1, cy), (cx, cy+1), (cx, cy-1)]:
-                 if 0 <= nx < world.width and 0 <= ny < world.height:
-                     if (nx, ny) not in visited:
-                         # Check Walkable
-                         if world.terrain_grid[ny][nx] != 0: # Not Water
-                             visited.add((nx, ny))
-                             new_path = list(path)
-                             new_path.append((nx, ny))
-                             queue.append((nx, ny, new_path))
-                             
-                             # Early exit if target found or close enough
-                             # Exact match might be hard if blocked, so "close enough" logic?
-                             # For now, simplistic: Exact or Adjacent to target
-                             dist_sq = (nx - tx)**2 + (ny - ty)**2
-                             if dist_sq <= 2: 
-                                 found_path = new_path
-                                 break
-            if found_path: break
+            # Check if direct move is blocked by water
+            # Boundary check first
+            target_x, target_y = self.x + mx, self.y + my
+            if 0 <= target_x < world.width and 0 <= target_y < world.height:
+                 if world.terrain_grid[target_y][target_x] != 0: # Not Water
+                     # Safe to move directly
+                     world.move_agent(self.id, mx, my)
+                     return
             
-        if found_path:
-            # Take first step
-            next_step = found_path[0]
-            nx, ny = next_step
+            # 3. SHARED FLOW FIELD (one distance map for everyone heading to e.g. food)
+            if flow and world.flow_distance(flow, tx, ty) == 0:
+                self._path = {'target': (tx, ty), 'flow': flow}
+                step = self._next_path_step(tx, ty, world)
+        
+        if step is None:
+            # 4. PATHFINDING (A*)
+            # Failed searches are remembered for a while so an unreachable
+            # target does not cost a full search every step.
+            cached = self._path
+            if (cached and not cached.get('flow') and cached['steps'] is None and cached['target'] == (tx, ty)
+                    and cached['version'] == world.terrain_version
+                    and world.time_step - cached['time'] < PATH_RETRY_STEPS):
+                found_path = None
+            else:
+                # Across water: don't search at all
+                found_path = world.find_path((self.x, self.y), (tx, ty)) if self.can_reach(tx, ty, world) else None
+                self._path = {
+                    'target': (tx, ty),
+                    'steps': found_path[::-1] if found_path else None, # Reversed: next step at the end
+                    'end': found_path[-1] if found_path else None,
+                    'version': world.terrain_version,
+                    'time': world.time_step,
+                }
+            if found_path:
+                step = found_path[0]
+        
+        if step:
             # Calculate delta
-            ddx = nx - self.x
-            ddy = ny - self.y
-            world.move_agent(self.id, ddx, ddy)
+            nx, ny = step
+            if world.move_agent(self.id, nx - self.x, ny - self.y) and self._path.get('steps'):
+                self._path['steps'].pop()
         else:
             # Fallback: Random (stuck)
             self.move_random(world)
 
+    def _next_path_step(self, tx, ty, world):
+        """Next cell of the cached path, or None (dropping the cache) if it no longer applies."""
+        path = self._path
+        if not path:
+            return None
+        if path.get('flow'):
+            # Flow fields stay valid on their own (the world rebuilds them)
+            d = world.flow_step(path['flow'], self.x, self.y) if path['target'] == (tx, ty) else None
+            if d is None:
+                self._path = None
+                return None
+            return (self.x + d[0], self.y + d[1])
+        if not path['steps']:
+            return None
+        steps = path['steps']
+        ex, ey = path['end']
+        nx, ny = steps[-1]
+        if ((ex - tx)**2 + (ey - ty)**2 > 2 # Target moved away from the path's end
+                or max(abs(nx - self.x), abs(ny - self.y)) != 1 # We got displaced
+                or world.terrain_changed(steps, path['version'])):
+            self._path = None
+            return None
+        path['version'] = world.terrain_version
+        return steps[-1]
+
+    def can_reach(self, x, y, world) -> bool:
+        """Same land mass as (x, y)? Worlds without component labels count everything as reachable."""
+        reachable = getattr(world, 'reachable', None)
+        return reachable is None or reachable(self.x, self.y, x, y)
+
     def gather(self, world):
         """
         Gather resources with Tool Multiplier and Depletion.
@@ -1411,9 +1667,8 @@ class Agent:
             
             # 2. Add to Inventory
             if self.can_pickup(to_take):
-                 # Take the item
-                 items.pop(0)
-                 if not items: del world.items_grid[(self.x, self.y)]
+                 # Take the item (World keeps the resource index in sync)
+                 world.remove_item(self.x, self.y, to_take)
                  
                  # Add base item
                  self._add_to_inventory(to_take)
@@ -1431,7 +1686,7 @@ class Agent:
                  if to_take.name == "Wood":
                      current_terrain = world.terrain_grid[self.y][self.x]
                      if current_terrain == 3: # Forest
-                         world.terrain_grid[self.y][self.x] = 2 # Grass
+                         world.set_terrain(self.x, self.y, 2) # Grass
                          
                  # If we took Stone from Mountain, well, mountains are big. 
                  # But maybe if it was a surface rock, it's gone.
@@ -1500,9 +1755,18 @@ class Agent:
         """
         # 1. Vision Filter (Who can I see?)
         candidates = []
-        for other in world.agents.values():
-            if other.id == self.id: continue
-            dist = self.distance_to(other)
+        in_range = world.query_radius(self.x, self.y, VISION_RANGE, kind='agent', exclude_id=self.id)
+        
+        # Family/Friends are sensed even beyond vision range
+        linked_ids = {self.attributes.partner_id, *self.attributes.friend_ids} - {None, self.id}
+        linked_ids -= {other.id for _, other in in_range}
+        for other_id in sorted(linked_ids):
+            other = world.agents.get(other_id)
+            if other: in_range.append((self.distance_to(other), other))
+        
+        for dist, other in in_range:
+            # Can't walk over there (other island), don't bother
+            if not self.can_reach(other.x, other.y, world): continue
             
             # Probabilistic Vision (100% at 20, ~66% at 30)
             prob = 1.0
@@ -1512,7 +1776,7 @@ class Agent:
             if other.id == self.attributes.partner_id or other.id in self.attributes.friend_ids:
                 prob = 1.0
                 
-            if np.random.random() < prob:
+            if self.rng.random() < prob:
                 candidates.append((dist, other))
         
         cand_count = len(candidates)
@@ -1781,7 +2045,7 @@ class Agent:
             
             if target.attributes.leader_id != self.id:
                  # Attempt Convert
-                 if np.random.random() < 0.3: # 30% chance they concede
+                 if self.rng.random() < 0.3: # 30% chance they concede
                      # Join my Tribe
                      if self.attributes.tribe_id:
                          world.join_tribe(target.id, self.attributes.tribe_id)
@@ -1795,7 +2059,7 @@ class Agent:
              if target.attributes.leader_id != self.attributes.leader_id:
                  leader_tribe_id = self.attributes.tribe_id
                  if leader_tribe_id:
-                     if np.random.random() < 0.1:
+                     if self.rng.random() < 0.1:
                          world.join_tribe(target.id, leader_tribe_id)
                          target.attributes.leader_id = self.attributes.leader_id
                          self.log_diary(f"Convinced {target.attributes.name} to join our tribe.")
@@ -1853,7 +2117,7 @@ class Agent:
         total = sum(weights)
         norm_weights = [w/total for w in weights]
         
-        self.attributes.strategy = np.random.choice(strategies, p=norm_weights)
+        self.attributes.strategy = self.rng.choice(strategies, p=norm_weights)
         
     def get_public_state(self):
         """
@@ -1876,7 +2140,7 @@ class Agent:
         if not history:
             # First move: Cooperate usually, unless aggressive
             if strat in [GameStrategy.ALWAYS_DEFECT.value, GameStrategy.BULLY.value]: return 'defect'
-            if strat == GameStrategy.RANDOM.value: return np.random.choice(['cooperate', 'defect'])
+            if strat == GameStrategy.RANDOM.value: return self.rng.choice(['cooperate', 'defect'])
             return 'cooperate' # TFT, Pavlov, etc start nice
             
         # 2. Strategies
@@ -1884,7 +2148,7 @@ class Agent:
         if strat == GameStrategy.ALWAYS_DEFECT.value: return 'defect'
         
         if strat == GameStrategy.RANDOM.value: 
-            return np.random.choice(['cooperate', 'defect'])
+            return self.rng.choice(['cooperate', 'defect'])
             
         if strat == GameStrategy.TIT_FOR_TAT.value:
             return last_move_them if last_move_them else 'cooperate'
@@ -1924,7 +2188,7 @@ class Agent:
         if strat == GameStrategy.PEACEMAKER.value:
             # TFT but 10% chance to forgive defect
             if last_move_them == 'defect':
-                if np.random.random() < 0.2: return 'cooperate'
+                if self.rng.random() < 0.2: return 'cooperate'
                 return 'defect'
             return 'cooperate'
             
@@ -1957,7 +2221,7 @@ class Agent:
         if mode == 'gift':
              if surplus:
                  # Offer random surplus
-                 offer_item_name = np.random.choice(surplus)
+                 offer_item_name = self.rng.choice(surplus)
                  # Find actual item object
                  for slot in self.inventory:
                      if slot['item']['name'] == offer_item_name:
@@ -2181,12 +2445,9 @@ class Agent:
                  partner.log_diary(f"My love {self.attributes.name} has died. I am broken.")
                  partner.state.happiness = 0.0
                  
-        # 4. Remove from World (This calls world.remove_agent usually, but we need to call it manually or let world handle it logic)
-        # World.remove_agent isn't exposed yet, we need to modify agents dict directly or better, use a world method.
-        # Let's assume world.agents.pop(self.id) is safe if we do it carefully.
-        # Better: Mark as dead and let World clean up? Or direct removal.
+        # 4. Remove from World (also frees the occupancy cell)
         if self.id in world.agents:
-            del world.agents[self.id]
+            world.remove_agent(self.id)
 
     # --- HELPERS ---
 
@@ -2219,6 +2480,96 @@ class Agent:
         
         return "Gatherer"
 
+    def place(self, x: int, y: int):
+        """
+        Sets the position. x/y stay plain attributes (scalar code reads them
+        millions of times a tick); the store's position columns are written
+        through here, so move positions with place() rather than assigning x/y.
+        """
+        self.x = x
+        self.y = y
+        self._store.x[self._slot] = x
+        self._store.y[self._slot] = y
+
+    def attach(self, store: AgentStore):
+        """Moves this agent's numeric state into a slot of `store` (the World's, usually)."""
+        if store is self._store:
+            return
+        slot = store.allocate(self)
+        store.copy_slot(self._store, self._slot, slot)
+        # personality_vector stays the canonical dict (it is fixed once born); the row mirrors it
+        p = self.attributes.personality_vector
+        store.personality[slot] = [p[trait] for trait in PERSONALITY_TRAITS]
+        self._store.release(self._slot)
+        self._store, self._slot = store, slot
+
+    def detach(self):
+        """Moves this agent's numeric state back into a private store (its values stay readable)."""
+        self.attach(AgentStore(1))
+
+    def __getstate__(self):
+        """
+        Pickling (agents migrating between World shards, see env/sharding.py):
+        the store row travels in a private one-slot store, and the plan and
+        per-step memos, which point at other agents and animals, are dropped.
+        """
+        state = self.__dict__.copy()
+        store = AgentStore(1)
+        slot = store.allocate(None)
+        store.copy_slot(self._store, self._slot, slot)
+        state.update(_store=store, _slot=slot, plan=None, plan_done=True, _think=(-1, True), _path=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._store.owners[self._slot] = self
+
+    def to_marker(self, world=None):
+        """
+        Just what the map needs to draw the agent (the "positions" stream detail).
+        """
+        tribe = world.tribes.get(self.attributes.tribe_id) if world and self.attributes.tribe_id else None
+        return {
+            "id": self.id,
+            "x": int(self.x),
+            "y": int(self.y),
+            "attributes": {
+                "name": self.attributes.name,
+                "gender": self.attributes.gender,
+                "leader_id": self.attributes.leader_id,
+                "tribe_color": tribe.color if tribe else None
+            }
+        }
+
+    def to_summary(self, world=None):
+        """
+        Compact per-frame serializer: the map, census and top bar fields.
+        The inspector gets the full to_dict() on demand (GET /agents/{id}).
+        """
+        tribe = world.tribes.get(self.attributes.tribe_id) if world and self.attributes.tribe_id else None
+        return {
+            "id": self.id,
+            "x": int(self.x),
+            "y": int(self.y),
+            "attributes": {
+                "name": self.attributes.name,
+                "gender": self.attributes.gender,
+                "leader_id": self.attributes.leader_id,
+                "tribe_id": self.attributes.tribe_id,
+                "is_prophet": self.attributes.is_prophet,
+                "job": self.calculate_job_title(),
+                "tribe_color": tribe.color if tribe else None
+            },
+            "state": {"health": self.state.health},
+            "needs": {
+                "hunger": self.nafs.hunger,
+                "energy": self.nafs.energy,
+                "social": self.qalb.social,
+                "fun": self.qalb.fun
+            },
+            "generation": self.attributes.generation
+        }
+
     def to_dict(self, world=None):
         """
         Serializer for Frontend/API.
@@ -2244,15 +2595,18 @@ class Agent:
                 "parent_names": [resolve_name(pid) for pid in self.attributes.parents],
                 "child_names": [resolve_name(cid) for cid in self.attributes.children]
             },
-            "state": self.state.__dict__,
+            "state": {"health": self.state.health, "happiness": self.state.happiness,
+                      **{k:v for k,v in self.state.__dict__.items() if k != 'agent'}},
             "needs": { 
                 "hunger": self.nafs.hunger,
                 "energy": self.nafs.energy,
                 "social": self.qalb.social,
                 "fun": self.qalb.fun
             },
-            "nafs": {k:v for k,v in self.nafs.__dict__.items() if k != 'agent'},
-            "qalb": {k:v for k,v in self.qalb.__dict__.items() if k != 'agent' and k != 'brain'}, 
+            "nafs": {"hunger": self.nafs.hunger, "energy": self.nafs.energy, "pain": self.nafs.pain, "lust": self.nafs.lust,
+                     **{k:v for k,v in self.nafs.__dict__.items() if k != 'agent'}},
+            "qalb": {"social": self.qalb.social, "fun": self.qalb.fun,
+                     **{k:v for k,v in self.qalb.__dict__.items() if k not in ('agent', 'brain', 'batched_desire')}}, 
             "ruh": {
                 "life_goal": self.ruh.life_goal,
                 "wisdom": self.ruh.wisdom,
@@ -2269,7 +2623,9 @@ class Agent:
             "tribe_goal": world.tribes[self.attributes.tribe_id].goal if world and self.attributes.tribe_id and self.attributes.tribe_id in world.tribes else "wander",
             "tribe_harmony": world.tribes[self.attributes.tribe_id].calculate_harmony(world) if world and self.attributes.tribe_id and self.attributes.tribe_id in world.tribes else 50.0,
             "generation": self.attributes.generation,
-            "brain": self.brain.to_dict()
+            "brain": self.brain.to_dict(),
+            "decisions": {"thinks": self.think_count, "carried": self.carry_count,
+                          "plan": self.plan['action'] if self.plan else None}
         }
     
     def get_observation(self, world):
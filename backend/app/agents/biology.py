@@ -0,0 +1,67 @@
+import numpy as np
+from typing import List
+
+# Population at which World.update_biology takes over from the per-agent
+# Nafs.update/Qalb.update calls when biology_engine is 'auto'
+BATCH_BIOLOGY_THRESHOLD = 64
+
+
+def update_biology(world, agents: List) -> None:
+    """
+    Batched Nafs.update + Qalb.update for `agents` (all attached to
+    world.agent_store). Applies the same rules, in the same order and with the
+    same float64 arithmetic, as calling both updates agent by agent, so the
+    vitals come out bit-identical. Starvation diary rolls draw from each
+    agent's own stream (agent.rng), like the per-agent code does.
+
+    Marks each agent's biology_step so act() skips its own updates this tick.
+    """
+    if not agents:
+        return
+    store = world.agent_store
+    slots = np.fromiter((agent._slot for agent in agents), dtype=np.int64, count=len(agents))
+
+    decay_rate = 0.002
+    if hasattr(world, 'config') and world.config:
+        decay_rate = world.config.get("hunger_rate", 0.002)
+
+    # --- Nafs: Biological Decay ---
+    hunger = np.minimum(store.hunger[slots] + decay_rate, 1.0)
+    energy = store.energy[slots] - 0.0002
+    health = store.health[slots]
+    lust = store.lust[slots]
+    lust = np.where(health > 0.8, lust + 0.005, lust)
+
+    # 1. Starvation Damage
+    starving = hunger >= 1.0
+    health = np.where(starving, health - 0.02, health)
+
+    # 2. Regeneration (Well-fed & Rested)
+    regen = (hunger < 0.3) & (energy > 0.5)
+    health = np.where(regen, np.minimum(health + 0.005, 1.0), health)
+
+    # 3. Psychosomatic Effects
+    happiness = store.happiness[slots]
+    health = np.where(happiness < 0.2, health - 0.001, health)
+    health = np.where(happiness > 0.8, np.minimum(health + 0.002, 1.0), health)
+
+    store.hunger[slots] = hunger
+    store.energy[slots] = energy
+    store.lust[slots] = lust
+    store.health[slots] = health
+
+    # --- Qalb: Social/Fun decay and mood ---
+    social = store.social[slots] - 0.0005
+    store.social[slots] = social
+    store.fun[slots] -= 0.0005
+    moods = np.select([happiness > 0.7, happiness < 0.3, social < 0.2],
+                      ["Happy", "Depressed", "Lonely"], "Neutral")
+
+    for row in np.flatnonzero(starving).tolist():
+        if agents[row].rng.random() < 0.1:
+            agents[row].log_diary("I am starving to death...")
+
+    step = world.time_step
+    for agent, mood in zip(agents, moods.tolist()):
+        agent.qalb.emotional_state = mood
+        agent.biology_step = step
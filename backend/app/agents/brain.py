@@ -1,5 +1,4 @@
 from typing import List, Dict, Optional, Any
-import numpy as np
 
 class AgentBrain:
     def __init__(self, agent):
@@ -122,7 +121,7 @@ class AgentBrain:
         
         # Priority A: Gather Essential Materials (Wood/Stone)
         # Random choice to avoid synchronization
-        resource = 'wood' if np.random.random() < 0.5 else 'stone'
+        resource = 'wood' if self.agent.rng.random() < 0.5 else 'stone'
         plan = self._plan_stockpile(world, resource)
         if plan:
              self.current_goal = f"Gather {resource.capitalize()}"
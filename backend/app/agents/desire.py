@@ -0,0 +1,213 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .agent import PERSONALITY_TRAITS
+
+# Column order of the desire matrix. Matches the insertion order of
+# Qalb.desires, so argmax breaks ties the way max(desires, key=...) does.
+DESIRES = ("Eat", "Socialize", "Mating", "Exploration", "Find Food", "Find Wood",
+           "Find Stone", "Craft", "Build", "Trade", "Gift", "Violence")
+COLUMN = {name: i for i, name in enumerate(DESIRES)}
+
+# Population at which World.begin_tick scores everyone here instead of in
+# each agent's Qalb.propose_action when desire_engine is 'auto'
+DESIRE_BATCH_THRESHOLD = 64
+
+SOCIAL_RANGE = 5.0     # Someone this close makes socializing irresistible
+STRANGER_RANGE = 15.0  # Strangers this close spark curiosity
+
+# Up to this many observer x agent pairs, neighbor counts use a plain distance
+# matrix; above it, prefix sums over an agent count grid (see _disk_counts)
+DENSE_PAIRS = 1 << 18
+
+_TRAIT = {trait: i for i, trait in enumerate(PERSONALITY_TRAITS)}
+
+
+def _disk_counts(prefix: np.ndarray, x: np.ndarray, y: np.ndarray, r: int) -> np.ndarray:
+    """
+    Agents within distance < r of each (x, y), from `prefix` (row-wise
+    cumulative agent counts, one leading zero column): one lookup per disk
+    row, whatever the crowd size.
+    """
+    height, width = prefix.shape[0], prefix.shape[1] - 1
+    total = np.zeros(len(x), dtype=np.int64)
+    for dy in range(-r + 1, r):
+        half = int(np.ceil(np.sqrt(r * r - dy * dy))) - 1 # Largest dx with dx^2 + dy^2 < r^2
+        row = y + dy
+        inside = (row >= 0) & (row < height)
+        row = np.clip(row, 0, height - 1)
+        lo = np.clip(x - half, 0, width)
+        hi = np.clip(x + half + 1, 0, width)
+        total += np.where(inside, prefix[row, hi] - prefix[row, lo], 0)
+    return total
+
+
+def _neighbors(world, agents: List) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per agent: whether anyone is within SOCIAL_RANGE, whether a stranger (no
+    opinion yet) is within STRANGER_RANGE, and whether it holds any opinion
+    below -50 (rival candidates). Same strict integer distance tests as
+    SpatialGrid.query.
+    """
+    n = len(agents)
+    ox = np.fromiter((a.x for a in agents), dtype=np.int64, count=n)
+    oy = np.fromiter((a.y for a in agents), dtype=np.int64, count=n)
+    everyone = list(world.agents.values())
+    tx = np.fromiter((t.x for t in everyone), dtype=np.int64, count=len(everyone))
+    ty = np.fromiter((t.y for t in everyone), dtype=np.int64, count=len(everyone))
+    if n * len(everyone) <= DENSE_PAIRS:
+        d_sq = (tx[None, :] - ox[:, None]) ** 2 + (ty[None, :] - oy[:, None]) ** 2
+        close = (d_sq < SOCIAL_RANGE ** 2).sum(axis=1)
+        in_range = (d_sq < STRANGER_RANGE ** 2).sum(axis=1)
+    else:
+        counts = np.bincount(ty * world.width + tx, minlength=world.width * world.height)
+        prefix = np.zeros((world.height, world.width + 1), dtype=np.int64)
+        np.cumsum(counts.reshape(world.height, world.width), axis=1, out=prefix[:, 1:])
+        close = _disk_counts(prefix, ox, oy, int(SOCIAL_RANGE))
+        in_range = _disk_counts(prefix, ox, oy, int(STRANGER_RANGE))
+    # Minus one: every observer counts itself
+    close, in_range = close - 1, in_range - 1
+    position = {t.id: (t.x, t.y) for t in everyone}
+
+    # Acquaintances in range: one entry per opinion held about a living agent
+    rows, xs, ys, hostile = [], [], [], np.zeros(n, dtype=bool)
+    for row, agent in enumerate(agents):
+        for other_id, opinion in agent.qalb.opinions.items():
+            if opinion < -50:
+                hostile[row] = True
+            where = position.get(other_id)
+            if where is not None and other_id != agent.id:
+                rows.append(row)
+                xs.append(where[0])
+                ys.append(where[1])
+    known = np.zeros(n, dtype=np.int64)
+    if rows:
+        rows = np.array(rows)
+        d_sq = (np.array(xs) - ox[rows]) ** 2 + (np.array(ys) - oy[rows]) ** 2
+        known = np.bincount(rows[d_sq < STRANGER_RANGE ** 2], minlength=n)
+    return close > 0, in_range > known, hostile
+
+
+def desire_matrix(world, agents: List) -> Tuple[np.ndarray, np.ndarray, List[Optional[object]]]:
+    """
+    Qalb.desires for every agent in `agents` (members of world.agents,
+    attached to world.agent_store) in one pass: an agents x DESIRES matrix,
+    the stranger-nearby flags and each agent's nearest rival.
+    Needs, personality and neighbor counts are array operations; the
+    Gift/Trade and Violence scans of visible_agents_state only run (through the
+    same Qalb helpers) for the agents whose arrays say they can fire.
+    """
+    n = len(agents)
+    store = world.agent_store
+    slots = np.fromiter((a._slot for a in agents), dtype=np.int64, count=n)
+    p = store.personality[slots]
+    hunger = store.hunger[slots]
+    trait = lambda name: p[:, _TRAIT[name]]
+
+    # Per-agent Python state the store does not hold
+    locked = np.zeros(n, dtype=bool)
+    has_stone = np.zeros(n, dtype=bool)
+    has_block = np.zeros(n, dtype=bool)
+    inventory_count = np.zeros(n, dtype=np.int64)
+    at_war = np.zeros(n, dtype=bool)
+    goals = []
+    for row, agent in enumerate(agents):
+        locked[row] = bool(agent.state.social_lock_target and agent.state.social_lock_steps > 0)
+        for stack in agent.inventory:
+            name = stack['item']['name']
+            has_stone[row] |= name == 'Stone'
+            has_block[row] |= name == 'Stone Block'
+            inventory_count[row] += stack['count']
+        tribe = world.tribes.get(agent.attributes.tribe_id) if agent.attributes.tribe_id else None
+        goals.append(tribe.goal if tribe else None)
+        at_war[row] = bool(tribe and tribe.enemies)
+    goals = np.array(goals, dtype=object)
+    near, unknown_nearby, hostile = _neighbors(world, agents)
+
+    m = np.zeros((n, len(DESIRES)), dtype=np.float64)
+    conscientiousness = trait("Conscientiousness")
+
+    # 1. Sustenance
+    predicted_hunger = hunger + np.where(conscientiousness > 0.6, 0.1, 0.0)
+    m[:, COLUMN["Eat"]] = np.minimum(1.0, predicted_hunger * (2.0 + trait("Survival")))
+
+    # 2. Connection
+    loneliness = 1.0 - store.social[slots]
+    boredom = 1.0 - store.fun[slots]
+    # Python's float pow, as in Qalb.desires: np.power differs from it in the last bit for some inputs
+    lonely = loneliness.tolist()
+    root = np.fromiter((v ** 0.5 for v in lonely), dtype=np.float64, count=n)
+    root_cubed = np.fromiter((v ** 1.5 for v in lonely), dtype=np.float64, count=n)
+    social = np.where(trait("Social") > 0.7, root + boredom * 0.5, root_cubed + boredom * 0.3)
+    social = np.where(loneliness > 0.8, social + 0.2, social)
+    social = np.where(near, social + 0.7, social)
+    m[:, COLUMN["Socialize"]] = np.where(locked, 0.0, np.minimum(1.0, social))
+
+    # 3. Lust
+    m[:, COLUMN["Mating"]] = np.minimum(1.0, store.lust[slots] * (1.0 + trait("Lust")))
+
+    # 4. Curiosity
+    curiosity = trait("Curiosity")
+    stranger = 0.5 + curiosity * 0.5
+    stranger = np.where(trait("Social") > 0.6, stranger + 0.3, stranger)
+    m[:, COLUMN["Exploration"]] = np.where(unknown_nearby, stranger, curiosity * 0.3)
+
+    # 6. Productivity
+    base_labor = conscientiousness * 0.5
+    food = base_labor * 0.5
+    food = np.where(goals == "gather_food", food + 0.5, food)
+    m[:, COLUMN["Find Food"]] = np.where(hunger > 0.4, food + 0.3, food)
+    m[:, COLUMN["Find Wood"]] = np.where(goals == "gather_wood", base_labor + 0.6, base_labor)
+    m[:, COLUMN["Find Stone"]] = np.where(goals == "gather_stone", base_labor + 0.6, base_labor)
+    building = goals == "build_home"
+    craft = np.where(has_stone, 0.3, 0.0)
+    m[:, COLUMN["Craft"]] = np.where(has_stone & building, craft + 0.4, craft)
+    build = np.where(has_block, 0.4, 0.0)
+    m[:, COLUMN["Build"]] = np.where(has_block & building, build + 0.6, build)
+
+    # 7. Social Economy: only agents that could gift or trade scan their neighbors
+    could_exchange = (((trait("Altruism") > 0.6) & (inventory_count > 5)) | (hunger > 0.6) |
+                      (m[:, COLUMN["Find Wood"]] > 0.5))
+    for row in np.flatnonzero(could_exchange).tolist():
+        agent = agents[row]
+        if not agent.visible_agents_state:
+            continue
+        desires = {"Find Wood": m[row, COLUMN["Find Wood"]], "Trade": 0.0, "Gift": 0.0}
+        agent.qalb.exchange_desires(desires, agent.attributes.personality_vector, int(inventory_count[row]))
+        m[row, COLUMN["Trade"]] = desires["Trade"]
+        m[row, COLUMN["Gift"]] = desires["Gift"]
+
+    # Dampener: Full Inventory
+    full = inventory_count >= 20
+    for name in ("Find Wood", "Find Stone", "Find Food"):
+        m[full, COLUMN[name]] *= 0.1
+
+    # 8. Violence: base aggression, then rivals/enemies for agents that have any
+    m[:, COLUMN["Violence"]] = np.where(trait("Aggression") > 0.8, 0.2, 0.0)
+    rivals: List[Optional[object]] = [None] * n
+    for row in np.flatnonzero(hostile | at_war).tolist():
+        agent = agents[row]
+        if not agent.visible_agents_state:
+            continue
+        desires = {"Violence": m[row, COLUMN["Violence"]]}
+        rivals[row] = agent.qalb.rival_desires(desires, world)
+        m[row, COLUMN["Violence"]] = desires["Violence"]
+    return m, unknown_nearby, rivals
+
+
+def propose_actions(world, agents: List) -> None:
+    """
+    Scores every agent's desires at once and leaves the winner on
+    qalb.batched_desire, which Qalb.propose_action uses instead of scoring
+    itself again this tick.
+    """
+    agents = list(agents)
+    if not agents:
+        return
+    m, unknown_nearby, rivals = desire_matrix(world, agents)
+    dominant = m.argmax(axis=1)
+    intensity = m[np.arange(len(agents)), dominant]
+    step = world.time_step
+    for agent, column, value, stranger, rival in zip(agents, dominant.tolist(), intensity.tolist(),
+                                                     unknown_nearby.tolist(), rivals):
+        agent.qalb.batched_desire = (step, DESIRES[column], value, stranger, rival)
@@ -0,0 +1,97 @@
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+from .agent import VISION_RANGE, RESOURCE_CATEGORIES, MEMORY_KEYS
+
+# Upper bound on observer x target pairs evaluated per NumPy block
+BLOCK_PAIRS = 1 << 21
+
+
+def sighting_probability(dist: np.ndarray) -> np.ndarray:
+    """Vision falloff used by Agent.scan_surroundings: 1.0 up to 20, then 1 / (1 + (d - 20) * 0.05)."""
+    return 1.0 / (1.0 + np.maximum(dist - 20.0, 0.0) * 0.05)
+
+
+def _blocks(ox: np.ndarray, oy: np.ndarray, tx: np.ndarray, ty: np.ndarray, reach: float):
+    """
+    Pairs groups of observers with the targets that can be within `reach` of them.
+    Observers are grouped by reach-sized tiles; each group only sees targets inside
+    its bounding box grown by `reach`, so sparse huge maps never build a full
+    observers x targets matrix. Yields (rows, cols) index arrays.
+    """
+    tiles = (ox // reach).astype(np.int64) * (1 << 32) + (oy // reach).astype(np.int64)
+    order = np.argsort(tiles, kind='stable')
+    starts = np.flatnonzero(np.r_[True, tiles[order][1:] != tiles[order][:-1]])
+    for group in np.split(order, starts[1:]):
+        gx, gy = ox[group], oy[group]
+        cols = np.flatnonzero((tx > gx.min() - reach) & (tx < gx.max() + reach) &
+                              (ty > gy.min() - reach) & (ty < gy.max() + reach))
+        if len(cols) == 0:
+            continue
+        step = max(1, BLOCK_PAIRS // len(cols))
+        for i in range(0, len(group), step):
+            yield group[i:i + step], cols
+
+
+def _sightings(ox, oy, tx, ty, rng: np.random.Generator, exclude_self: bool = False):
+    """
+    Distance, probability and the random draw for every observer/target pair in
+    range, one block at a time. Yields (rows, cols, dist) for the pairs that were seen.
+    """
+    for rows, cols in _blocks(ox, oy, tx, ty, VISION_RANGE):
+        dx = tx[cols][None, :] - ox[rows][:, None]
+        dy = ty[cols][None, :] - oy[rows][:, None]
+        dist = np.sqrt(dx * dx + dy * dy)
+        seen = (dist < VISION_RANGE) & (rng.random(dist.shape) < sighting_probability(dist))
+        if exclude_self:
+            seen &= rows[:, None] != cols[None, :]
+        r, c = np.nonzero(seen)
+        if len(r):
+            yield rows[r], cols[c], dist[r, c]
+
+
+def perceive(world, agents: Iterable, rng: Optional[np.random.Generator] = None):
+    """
+    Batched scan_surroundings for `agents` (members of world.agents) against
+    everything in `world`.
+    All distances, sighting probabilities and draws are computed with NumPy,
+    then scattered into each agent's spatial_memory / visible_agents_state.
+    Statistically equivalent to calling agent.scan_surroundings(world) for each,
+    including the VISION_RANGE cutoff (dist < VISION_RANGE, as the spatial
+    index queries use).
+    """
+    observers = list(agents)
+    if not observers:
+        return
+    rng = rng if rng is not None else world.random.generator
+    ox = np.array([a.x for a in observers], dtype=np.float64)
+    oy = np.array([a.y for a in observers], dtype=np.float64)
+    for agent in observers:
+        agent.begin_scan(world)
+
+    # 1. Items (Food/Wood/Stone/Item)
+    for category in RESOURCE_CATEGORIES:
+        xs, ys, cells = world.resources.arrays(category)
+        if not cells:
+            continue
+        key = MEMORY_KEYS.get(category, category)
+        for rows, cols, _ in _sightings(ox, oy, xs, ys, rng):
+            # Pairs come out grouped by observer; hand each one its whole set
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            for row, seen in zip(rows[starts].tolist(), np.split(cols, starts[1:])):
+                observers[row].remember_places(key, {cells[c] for c in seen.tolist()})
+
+    # 2. Agents (Social)
+    # Observers first so an agent's own target column matches its row
+    observer_ids = {a.id for a in observers}
+    targets = observers + [o for o in world.agents.values() if o.id not in observer_ids]
+    tx = np.array([t.x for t in targets], dtype=np.float64)
+    ty = np.array([t.y for t in targets], dtype=np.float64)
+    public: Dict[str, Dict] = {} # One public state per seen agent per tick
+    for rows, cols, dist in _sightings(ox, oy, tx, ty, rng, exclude_self=True):
+        for row, col, d in zip(rows.tolist(), cols.tolist(), dist.tolist()):
+            other = targets[col]
+            state = public.get(other.id)
+            if state is None:
+                state = public[other.id] = other.get_public_state()
+            observers[row].see_agent(other, d, world, state)
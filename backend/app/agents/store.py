@@ -0,0 +1,132 @@
+"""
+Structure-of-arrays storage for per-agent numeric state.
+
+Every agent owns one slot in an AgentStore. Its vitals (Nafs hunger/energy/
+pain/lust, Qalb social/fun, AgentState health/happiness), position and
+personality live in contiguous NumPy columns indexed by that slot, and the
+familiar attributes (agent.nafs.hunger, agent.state.health, agent.x, ...) are
+StoreField descriptors reading and writing those columns. Per-tick biology can
+then run as a few array operations over World.agent_store instead of one Python
+attribute update per agent per field.
+
+Position is the exception: agent.x/agent.y stay plain attributes because the
+scalar code reads them millions of times per tick, and Agent.place() (used by
+World.add_agent/move_agent) writes them through to the x/y columns.
+
+A new Agent starts in a private one-slot store; World.add_agent moves it into
+the world's store and World.remove_agent moves it back out, so a dead agent's
+last values stay readable.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Column -> value for a fresh slot (same defaults the classes used to set)
+VITAL_DEFAULTS = {
+    "hunger": 0.0,   # Nafs: 0.0 Full -> 1.0 Starving
+    "energy": 1.0,   # Nafs: 1.0 Rested -> 0.0 Exhausted
+    "pain": 0.0,     # Nafs
+    "lust": 0.0,     # Nafs
+    "health": 1.0,   # AgentState
+    "happiness": 0.5, # AgentState
+    "social": 1.0,   # Qalb: 1.0 Connected -> 0.0 Lonely
+    "fun": 1.0,      # Qalb: 1.0 Entertained -> 0.0 Bored
+}
+POSITION_COLUMNS = ("x", "y")
+
+
+class AgentStore:
+    """
+    Columns of per-agent state, one row (slot) per agent. Slots are reused
+    after release; `active` marks the ones in use and `owners` maps them back
+    to their Agent. Capacity doubles when full, so column arrays can be
+    replaced: always index through the store (store.hunger[slot]), never keep
+    a column around across an allocate().
+    """
+    def __init__(self, capacity: int = 64, traits: int = 0):
+        from .agent import PERSONALITY_TRAITS
+        self.capacity = max(1, capacity)
+        self.traits = traits or len(PERSONALITY_TRAITS)
+        for column, default in VITAL_DEFAULTS.items():
+            setattr(self, column, np.full(self.capacity, default, dtype=np.float64))
+        for column in POSITION_COLUMNS:
+            setattr(self, column, np.zeros(self.capacity, dtype=np.int64))
+        self.personality = np.zeros((self.capacity, self.traits), dtype=np.float64)
+        self.active = np.zeros(self.capacity, dtype=bool)
+        self.owners: List[Optional[object]] = [None] * self.capacity
+        self._free: List[int] = list(range(self.capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
+    def _grow(self):
+        old = self.capacity
+        self.capacity = old * 2
+        for column in (*VITAL_DEFAULTS, *POSITION_COLUMNS, "personality", "active"):
+            array = getattr(self, column)
+            grown = np.zeros((self.capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, column, grown)
+        self.owners.extend([None] * old)
+        self._free.extend(range(self.capacity - 1, old - 1, -1))
+
+    def allocate(self, owner) -> int:
+        """A fresh slot (defaults filled in) for `owner`."""
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        for column, default in VITAL_DEFAULTS.items():
+            getattr(self, column)[slot] = default
+        self.x[slot] = self.y[slot] = 0
+        self.personality[slot] = 0.0
+        self.active[slot] = True
+        self.owners[slot] = owner
+        return slot
+
+    def release(self, slot: int):
+        self.active[slot] = False
+        self.owners[slot] = None
+        self._free.append(slot)
+
+    def copy_slot(self, source: "AgentStore", source_slot: int, slot: int):
+        """Copies every column of `source_slot` in `source` into our `slot`."""
+        for column in (*VITAL_DEFAULTS, *POSITION_COLUMNS):
+            getattr(self, column)[slot] = getattr(source, column)[source_slot]
+        self.personality[slot] = source.personality[source_slot]
+
+    def active_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.active)
+
+    def validate(self, agents: Dict[str, object]):
+        """
+        Consistency check (for tests/debugging). Raises AssertionError if the
+        store's slots or position columns disagree with `agents`.
+        """
+        assert len(self) == len(agents), "Agent store holds a different number of agents"
+        for agent_id, agent in agents.items():
+            slot = agent._slot
+            assert agent._store is self and self.owners[slot] is agent, f"Agent {agent_id} does not own slot {slot}"
+            assert (self.x[slot], self.y[slot]) == (agent.x, agent.y), \
+                f"Agent {agent_id} stored at {(int(self.x[slot]), int(self.y[slot]))} but is at {(agent.x, agent.y)}"
+
+
+class StoreField:
+    """
+    Attribute of an agent part (Nafs, Qalb, AgentState) kept in an AgentStore
+    column, found through the part's `agent` back-reference.
+    """
+    def __init__(self):
+        self.column = None
+
+    def __set_name__(self, owner, name):
+        self.column = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        agent = obj.agent
+        return float(getattr(agent._store, self.column)[agent._slot])
+
+    def __set__(self, obj, value):
+        agent = obj.agent
+        getattr(agent._store, self.column)[agent._slot] = value
@@ -0,0 +1,227 @@
+"""
+Background simulation loop for the server.
+
+One task owns the clock: it steps the world at a target ticks-per-second and
+publishes a Frame to every subscriber. The /ws endpoint only subscribes and
+sends, so extra tabs no longer speed the world up and a disconnect no longer
+stalls it.
+
+Each subscriber has a one-slot queue. If a client is still sending the previous
+frame when the next one is published, the stale frame is replaced, so a slow
+client drops frames instead of holding back the tick. The delta/binary encoders
+diff against what *they* last sent, so skipped frames need no resync.
+
+Ticks run on a dedicated executor thread, so a long batch no longer blocks
+FastAPI, Socket.IO or the pause command (the thread gives the GIL back every
+switch interval). That thread is the only writer: the event loop keeps running
+during a batch, so frames are not copied and code on the loop must not read the
+world until the batch is over. Readers (frame encoders, GET endpoints) await
+SimulationLoop.between_ticks() and then read without awaiting again; writers
+(config endpoints, /init_world) hand a function to SimulationLoop.call(), which
+runs it on the simulation thread between two batches.
+"""
+import asyncio
+import collections
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set
+
+from .stream import encode_full_state
+from ..env.profiler import clock
+
+MAX_FPS = 30              # Frames published per second, at most
+HEARTBEAT_SECONDS = 1.0   # Publish at least this often, even when paused
+LATENCY_PROBE_SECONDS = 0.05
+LATENCY_WINDOW = 200      # Probes kept for latency()
+
+
+class Frame:
+    """One published moment of the world. The full JSON encoding is shared by all clients that use it."""
+    def __init__(self, world, paused: bool):
+        self.world = world
+        self.paused = paused
+        self.time_step = world.time_step
+        self._full = None
+
+    def full_state(self) -> str:
+        if self._full is None:
+            started = clock()
+            self._full = encode_full_state(self.world, self.paused)
+            profiler = getattr(self.world, 'profiler', None)
+            if profiler is not None and profiler.enabled:
+                profiler.record("serialize", clock() - started)
+        return self._full
+
+
+class Subscription:
+    """A client's view of the broadcast: always holds only the newest unsent frame."""
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.dropped = 0
+        self.viewport = None # (x0, y0, x1, y1) the client watches, if it narrowed its view
+
+    def offer(self, frame: Frame):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    async def next_frame(self) -> Frame:
+        return await self.queue.get()
+
+
+class SimulationLoop:
+    """
+    Steps `get_world()` with `step(world)` at `tick_rate` ticks per second.
+    When stepping can't keep up, the loop spends at most one frame's worth of
+    time on ticks before publishing and yielding to the event loop, and drops
+    the backlog instead of trying to catch up later.
+    """
+    def __init__(self, get_world: Callable, step: Callable, tick_rate: float = 10.0, max_fps: float = MAX_FPS,
+                 threaded: bool = True):
+        self.get_world = get_world
+        self.step = step
+        self.tick_rate = tick_rate
+        self.max_fps = max_fps
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation") if threaded else None
+        self.subscribers: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.probe: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.frames = 0
+        self.lag = collections.deque(maxlen=LATENCY_WINDOW)
+        self.jobs = 0 # Batches and calls handed to the simulation thread and not finished yet
+        self.idle = asyncio.Event() # Set while jobs == 0 (see between_ticks)
+        self.idle.set()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    def viewports(self):
+        """Viewports of the subscribers watching a region; the world keeps those at full detail (LOD)."""
+        return [s.viewport for s in list(self.subscribers) if s.viewport]
+
+    def publish(self, world):
+        frame = Frame(world, getattr(world, 'paused', False))
+        for subscription in list(self.subscribers):
+            subscription.offer(frame)
+        self.frames += 1
+
+    def start(self):
+        """Starts the loop on the running event loop (no-op if it is already running)."""
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+            self.probe = asyncio.get_running_loop().create_task(self.watch_latency())
+        return self.task
+
+    async def stop(self):
+        for task in (self.task, self.probe):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.task = self.probe = None
+
+    async def watch_latency(self):
+        """Measures how late the event loop wakes up from a short sleep (0 = never starved)."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LATENCY_PROBE_SECONDS)
+            self.lag.append(max(0.0, time.perf_counter() - start - LATENCY_PROBE_SECONDS))
+
+    def latency(self) -> Dict[str, float]:
+        """Event loop lag over the last LATENCY_WINDOW probes, in milliseconds."""
+        lag = list(self.lag) or [0.0]
+        return {"last_ms": lag[-1] * 1000, "mean_ms": sum(lag) / len(lag) * 1000, "max_ms": max(lag) * 1000}
+
+    async def between_ticks(self):
+        """
+        Returns once the simulation thread is not using the world. It then
+        stays put until the caller awaits again, so read it right after,
+        synchronously (encode, copy out what you need), then await.
+        """
+        while not self.idle.is_set():
+            await self.idle.wait()
+
+    async def call(self, fn: Callable, *args):
+        """
+        Runs fn(*args) between ticks and returns its result. Threaded, it runs
+        on the simulation thread, queued behind the batch in progress, and
+        readers wait for it like for a batch. Anything that changes or
+        replaces the world goes through here.
+        """
+        if not self.executor:
+            return fn(*args)
+        return await self._on_thread(fn, *args)
+
+    async def _on_thread(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        self.jobs += 1
+        self.idle.clear()
+        job: Future = self.executor.submit(fn, *args)
+        # Counted down from the job itself, so a cancelled caller (a dropped
+        # request, stop()) can't reopen the gate while the thread still runs
+        job.add_done_callback(lambda _: self._notify(loop))
+        return await asyncio.shield(asyncio.wrap_future(job))
+
+    def _notify(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._job_done)
+        except RuntimeError: # Event loop already closed (shutdown)
+            pass
+
+    def _job_done(self):
+        self.jobs -= 1
+        if not self.jobs:
+            self.idle.set()
+
+    def advance(self, world, now: float, next_tick: float) -> float:
+        """Runs the ticks that are due by `now` within one frame's budget; returns the next tick time."""
+        interval = 1.0 / self.tick_rate
+        deadline = now + 1.0 / self.max_fps
+        while next_tick <= now:
+            try:
+                self.step(world)
+            except Exception as e:
+                print(f"Simulation: Error in step: {e}")
+            self.ticks += 1
+            next_tick += interval
+            if time.perf_counter() >= deadline:
+                break
+        # Falling behind: forget the backlog rather than bursting later
+        return max(next_tick, time.perf_counter() - interval)
+
+    async def run(self):
+        next_tick = time.perf_counter()
+        last_publish = 0.0
+        last_key = None
+        while True:
+            await self.between_ticks() # A call() may be running, or queued behind the last batch
+            world = self.get_world()
+            now = time.perf_counter()
+            if getattr(world, 'paused', False):
+                next_tick = now + 1.0 / self.tick_rate
+            elif next_tick <= now:
+                world.viewports = self.viewports()
+                if self.executor:
+                    next_tick = await self._on_thread(self.advance, world, now, next_tick)
+                else:
+                    next_tick = self.advance(world, now, next_tick)
+
+            await self.between_ticks()
+            world = self.get_world()
+            now = time.perf_counter()
+            key = (id(world), world.time_step, getattr(world, 'paused', False))
+            if now - last_publish >= 1.0 / self.max_fps and (key != last_key or now - last_publish >= HEARTBEAT_SECONDS):
+                self.publish(world)
+                last_publish, last_key = now, key
+
+            wake = min(next_tick, last_publish + 1.0 / self.max_fps)
+            await asyncio.sleep(max(0.0, wake - time.perf_counter()))
@@ -0,0 +1,515 @@
+"""
+State streaming for the /ws endpoint.
+
+Protocols:
+  full  - the original stream: world.get_state() as JSON every frame.
+  delta - one "snapshot" message, then "delta" messages carrying only what
+          changed since the previous frame. Every message has a `seq`; a delta
+          applies on top of seq - 1. A client that misses one sends
+          {"type": "resync"} and gets a fresh snapshot.
+  binary - packed little-endian frames (layout documented above BinaryStream).
+
+A client may also get {"type": "notice", "code", "ignored", "message"} text
+messages, which are not frames: e.g. code "sharded" when the world runs in
+shards and its protocol or subscribe falls back to full JSON frames.
+
+Agents go out as Agent.to_summary(); the inspector's full Agent.to_dict() is
+served on demand (GET /agents/{id}, or "inspect" below) and cached per tick.
+
+Any protocol can be narrowed with a subscribe message (see View):
+  {"type": "subscribe", "viewport": {"x", "y", "width", "height"} | null,
+   "max_fps": 10, "detail": "summary" | "positions" | "full", "inspect": agent_id | null}
+Only agents, animals and items inside the viewport are serialized. "positions"
+sends Agent.to_marker(), "full" sends to_dict() for everyone. The inspected
+agent is always sent in full wherever it is.
+
+Delta message fields (all optional except type/seq/time_step):
+  agents / animals             {id: {field: value}} top-level fields that changed
+                               (new entities come with all fields)
+  agents_removed / animals_removed   [id]
+  item_cells                   [{"x", "y", "items": [...]}] full stack of every
+                               cell that changed (empty list = cell cleared)
+  terrain                      [[x, y, terrain_id]] edited cells
+  logs                         new log lines, oldest first
+  harmony                      population harmony (0-100)
+"""
+import json
+import struct
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# --- JSON Encoder for Numpy ---
+class NumpyEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.bool_):
+            return bool(obj)
+        return super(NumpyEncoder, self).default(obj)
+
+def sanitize_for_json(obj):
+    """
+    Recursively replace NaN and Infinity with None to ensure valid JSON.
+    """
+    if isinstance(obj, float):
+        if np.isnan(obj) or np.isinf(obj):
+            return None
+        return obj
+    elif isinstance(obj, dict):
+        return {k: sanitize_for_json(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [sanitize_for_json(v) for v in obj]
+    elif isinstance(obj, np.floating):
+         if np.isnan(obj) or np.isinf(obj):
+            return None
+         return float(obj)
+    elif isinstance(obj, np.integer): # Handle numpy ints here too for safety
+        return int(obj)
+    elif isinstance(obj, np.ndarray):
+        return sanitize_for_json(obj.tolist())
+    return obj
+
+
+DETAIL_LEVELS = ("summary", "positions", "full")
+
+
+class InspectorCache:
+    """
+    Full, sanitized Agent.to_dict() per agent, built at most once per tick no
+    matter how many clients inspect it. Entries are JSON-ready copies, so they
+    stay valid while the simulation moves on.
+    """
+    def __init__(self):
+        self.world = None
+        self.time_step = None
+        self.entries: Dict[str, Dict] = {}
+
+    def get(self, world, agent_id: str) -> Optional[Dict]:
+        agent = world.agents.get(agent_id)
+        if agent is None:
+            return None
+        if world is not self.world or world.time_step != self.time_step:
+            self.world, self.time_step, self.entries = world, world.time_step, {}
+        details = self.entries.get(agent_id)
+        if details is None:
+            details = self.entries[agent_id] = sanitize_for_json(agent.to_dict(world))
+        return details
+
+
+inspector = InspectorCache()
+
+
+class View:
+    """
+    What one client asked to see. The default view (whole map, summaries, no
+    FPS cap) is world.get_state().
+    """
+    def __init__(self, viewport: Optional[tuple] = None, max_fps: Optional[float] = None,
+                 detail: str = "summary", inspect: Optional[str] = None):
+        self.viewport = viewport # (x0, y0, x1, y1) in cells, end exclusive; None = whole map
+        self.max_fps = max_fps
+        self.detail = detail
+        self.inspect = inspect
+
+    @classmethod
+    def from_message(cls, message: Dict) -> "View":
+        """Parses a subscribe message; raises ValueError on malformed fields."""
+        viewport = message.get("viewport")
+        if viewport is not None:
+            x, y = int(viewport["x"]), int(viewport["y"])
+            width, height = int(viewport["width"]), int(viewport["height"])
+            if width <= 0 or height <= 0:
+                raise ValueError(f"Empty viewport: {viewport}")
+            viewport = (x, y, x + width, y + height)
+        max_fps = message.get("max_fps")
+        if max_fps is not None:
+            max_fps = float(max_fps)
+            if max_fps <= 0:
+                raise ValueError(f"max_fps must be positive, got {max_fps}")
+        detail = message.get("detail", "summary")
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(f"Unknown detail level '{detail}', expected one of {DETAIL_LEVELS}")
+        return cls(viewport, max_fps, detail, message.get("inspect"))
+
+    @property
+    def is_default(self) -> bool:
+        return self.viewport is None and self.detail == "summary" and self.inspect is None
+
+    def agents(self, world) -> List:
+        if self.viewport is None:
+            agents = list(world.agents.values())
+        else:
+            agents = world.query_rect(*self.viewport, kind='agent')
+            inspected = world.agents.get(self.inspect)
+            if inspected is not None and inspected not in agents:
+                agents.append(inspected)
+        return agents
+
+    def animals(self, world) -> List:
+        if self.viewport is None:
+            return list(world.animals)
+        return world.query_rect(*self.viewport, kind='animal')
+
+    def item_cells(self, world) -> List[tuple]:
+        if self.viewport is None:
+            return list(world.items_grid)
+        return world.resources.cells_in_rect(*self.viewport)
+
+    def contains(self, x, y) -> bool:
+        if self.viewport is None:
+            return True
+        x0, y0, x1, y1 = self.viewport
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def agent_dict(self, agent, world) -> Dict:
+        if agent.id == self.inspect:
+            return inspector.get(world, agent.id)
+        if self.detail == "full":
+            return agent.to_dict(world)
+        if self.detail == "positions":
+            return agent.to_marker(world)
+        return agent.to_summary(world)
+
+    def state(self, world) -> Dict:
+        """world.get_state() narrowed to this view."""
+        if self.is_default:
+            return world.get_state()
+        return {
+            "width": int(world.width),
+            "height": int(world.height),
+            "time_step": int(world.time_step),
+            "is_day": world.time_step % 1000 < 500,
+            "terrain": world.terrain_grid.tolist(),
+            "items": [{**item.to_dict(), "x": int(x), "y": int(y)}
+                      for x, y in self.item_cells(world) for item in world.items_grid.get((x, y), [])],
+            "agents": [self.agent_dict(agent, world) for agent in self.agents(world)],
+            "animals": [animal.to_dict() for animal in self.animals(world)],
+            "logs": getattr(world, 'logs', []),
+            "generation": world.generation,
+            "harmony": world.harmony(),
+        }
+
+
+def encode_full_state(world, paused: bool, view: Optional[View] = None) -> str:
+    """The original frame: complete world state (or what `view` covers of it) as JSON text."""
+    state = view.state(world) if view else world.get_state()
+    state["paused"] = paused
+
+    # OPTIMIZATION: Only sanitize dynamic entities where NaNs occur.
+    # Sanitizing the entire terrain (200x200) is too slow and unnecessary (ints).
+    state["agents"] = sanitize_for_json(state["agents"])
+    state["animals"] = sanitize_for_json(state["animals"])
+    return json.dumps(state, cls=NumpyEncoder)
+
+
+def _cell_items(world, cell) -> List[Dict]:
+    return [item.to_dict() for item in world.items_grid.get(cell, [])]
+
+
+class DeltaStream:
+    """
+    Per-client encoder for the delta protocol. Remembers what the client has
+    (sanitized agent/animal dicts, item/terrain versions, log count) and sends
+    the difference.
+    """
+    def __init__(self):
+        self.seq = 0
+        self.needs_snapshot = True
+        self.world = None # World the client's copy came from (/init_world swaps it)
+        self.agents: Dict[str, Dict] = {}
+        self.animals: Dict[str, Dict] = {}
+        self.item_version = 0
+        self.terrain_version = 0
+        self.log_count = 0
+        self.view = View()
+
+    def resync(self):
+        """Next frame is a full snapshot (client asked, or it fell behind)."""
+        self.needs_snapshot = True
+
+    def set_view(self, view: View):
+        """New subscription. A moved viewport needs a snapshot (newly visible items)."""
+        if view.viewport != self.view.viewport:
+            self.resync()
+        self.view = view
+
+    def encode(self, world, paused: bool) -> str:
+        self.seq += 1
+        if world is not self.world:
+            self.world = world
+            self.needs_snapshot = True
+        if not self.needs_snapshot:
+            frame = self._delta(world, paused)
+            if frame is not None:
+                return json.dumps(frame, cls=NumpyEncoder)
+        self.needs_snapshot = False
+        return json.dumps(self._snapshot(world, paused), cls=NumpyEncoder)
+
+    def _agent_states(self, world) -> Dict[str, Dict]:
+        return {agent.id: sanitize_for_json(self.view.agent_dict(agent, world)) for agent in self.view.agents(world)}
+
+    def _animal_states(self, world) -> Dict[str, Dict]:
+        return {animal.id: sanitize_for_json(animal.to_dict()) for animal in self.view.animals(world)}
+
+    def _snapshot(self, world, paused: bool) -> Dict:
+        state = self.view.state(world)
+        self.agents = {agent["id"]: agent for agent in sanitize_for_json(state["agents"])}
+        self.animals = {animal["id"]: animal for animal in sanitize_for_json(state["animals"])}
+        self.item_version = world.item_version
+        self.terrain_version = world.terrain_version
+        self.log_count = getattr(world, 'log_count', 0)
+        state.update({
+            "type": "snapshot",
+            "seq": self.seq,
+            "paused": paused,
+            "agents": list(self.agents.values()),
+            "animals": list(self.animals.values()),
+        })
+        return state
+
+    def _delta(self, world, paused: bool) -> Optional[Dict]:
+        changed_cells = world.items_changed_since(self.item_version)
+        if changed_cells is None:
+            return None # Journal no longer reaches back: snapshot instead
+
+        frame = {
+            "type": "delta",
+            "seq": self.seq,
+            "time_step": int(world.time_step),
+            "is_day": world.time_step % 1000 < 500,
+            "paused": paused,
+            "generation": world.generation,
+            "harmony": world.harmony(),
+        }
+
+        agents = self._agent_states(world)
+        frame["agents"] = _diff_entities(self.agents, agents)
+        frame["agents_removed"] = [aid for aid in self.agents if aid not in agents]
+        self.agents = agents
+
+        animals = self._animal_states(world)
+        frame["animals"] = _diff_entities(self.animals, animals)
+        frame["animals_removed"] = [aid for aid in self.animals if aid not in animals]
+        self.animals = animals
+
+        frame["item_cells"] = [{"x": x, "y": y, "items": _cell_items(world, (x, y))}
+                               for x, y in sorted(changed_cells) if self.view.contains(x, y)]
+        self.item_version = world.item_version
+
+        frame["terrain"] = world.terrain_changed_since(self.terrain_version)
+        self.terrain_version = world.terrain_version
+
+        logs = getattr(world, 'logs', [])
+        log_count = getattr(world, 'log_count', 0)
+        frame["logs"] = logs[max(0, len(logs) - (log_count - self.log_count)):] if log_count > self.log_count else []
+        self.log_count = log_count
+        return frame
+
+
+def _diff_entities(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Changed top-level fields per entity id; entities not in `old` are sent whole."""
+    changes = {}
+    for entity_id, state in new.items():
+        prev = old.get(entity_id)
+        if prev is None:
+            changes[entity_id] = state
+            continue
+        fields = {key: value for key, value in state.items() if prev.get(key) != value}
+        if fields:
+            changes[entity_id] = fields
+    return changes
+
+
+# --- Binary protocol ---
+#
+# One WebSocket binary message per frame, little-endian, every section starting
+# on a 4-byte boundary (decoders can view the buffer without copying):
+#
+#   header (40 bytes)
+#     0  char[4] magic "ADM1"
+#     4  u32     flags: 1 paused, 2 is_day, 4 terrain section, 8 items section
+#     8  u32     time_step
+#    12  u32     generation
+#    16  u16     width            18  u16  height
+#    20  u32     n_agents         24  u32  n_animals        28  u32  n_items
+#    32  u16     agent id width   34  u16  animal id width  (ASCII, NUL padded)
+#    36  u32     json trailer length
+#   terrain        u8[height * width]            only when flag 4 (first frame, then on edits)
+#   agent ids      char[n_agents * id width]
+#   agent xy       i16[n_agents * 2]
+#   agent needs    f32[n_agents * 4]             hunger, energy, social, fun (NaN = missing)
+#   animal ids     char[n_animals * id width]
+#   animal xy      i16[n_animals * 2]
+#   animal energy  f32[n_animals]
+#   animal type    u8[n_animals]                 index into trailer.animal_types
+#   item xy        i16[n_items * 2]              only when flag 8 (first frame, then on changes)
+#   item kind      u16[n_items]                  index into trailer.item_kinds
+#   trailer        UTF-8 JSON {logs, harmony, agent_details, animal_types, item_kinds}
+#                  agent_details[i] is agent i's dict (View.agent_dict) minus id/x/y/needs;
+#                  items carry only name/tags (what the map draws)
+#
+# frontend/src/binaryFrame.js is the reference decoder.
+
+BINARY_MAGIC = b"ADM1"
+BINARY_HEADER = struct.Struct("<4sIIIHHIIIHHI")
+FLAG_PAUSED, FLAG_DAY, FLAG_TERRAIN, FLAG_ITEMS = 1, 2, 4, 8
+AGENT_NEEDS = ["hunger", "energy", "social", "fun"]
+
+
+def _pad4(chunks: List[bytes], data: bytes):
+    chunks.append(data)
+    if len(data) % 4:
+        chunks.append(b"\0" * (4 - len(data) % 4))
+
+
+def _finite(values) -> np.ndarray:
+    """float32 array with every non-finite value turned into NaN (one vectorized pass)."""
+    array = np.asarray(values, dtype=np.float32)
+    return np.where(np.isfinite(array), array, np.float32(np.nan))
+
+
+def _dumps_finite(obj) -> str:
+    """json.dumps, sanitizing only if the C encoder actually produced NaN/Infinity."""
+    text = json.dumps(obj, cls=NumpyEncoder)
+    if "NaN" in text or "Infinity" in text:
+        text = json.dumps(sanitize_for_json(obj), cls=NumpyEncoder)
+    return text
+
+
+def _fixed_ids(ids: List[str]):
+    width = max((len(i) for i in ids), default=0)
+    return width, np.array(ids, dtype=f"S{max(width, 1)}").tobytes() if ids else b""
+
+
+class BinaryStream:
+    """
+    Per-client encoder for the binary protocol. Terrain and items are only
+    re-sent when they changed since this client's previous frame.
+    """
+    def __init__(self):
+        self.world = None
+        self.terrain_version = None
+        self.item_version = None
+        self.view = View()
+
+    def resync(self):
+        self.terrain_version = None
+        self.item_version = None
+
+    def set_view(self, view: View):
+        if view.viewport != self.view.viewport:
+            self.item_version = None # Items section covers the viewport only
+        self.view = view
+
+    def encode(self, world, paused: bool) -> bytes:
+        if world is not self.world:
+            self.world = world
+            self.resync()
+        flags = (FLAG_PAUSED if paused else 0) | (FLAG_DAY if world.time_step % 1000 < 500 else 0)
+        chunks: List[bytes] = []
+
+        if self.terrain_version != world.terrain_version:
+            flags |= FLAG_TERRAIN
+            _pad4(chunks, np.ascontiguousarray(world.terrain_grid, dtype=np.uint8).tobytes())
+            self.terrain_version = world.terrain_version
+
+        agents = self.view.agents(world)
+        agent_id_width, agent_ids = _fixed_ids([a.id for a in agents])
+        _pad4(chunks, agent_ids)
+        chunks.append(np.array([(a.x, a.y) for a in agents], dtype=np.int16).tobytes())
+        chunks.append(_finite([(a.nafs.hunger, a.nafs.energy, a.qalb.social, a.qalb.fun) for a in agents]).tobytes())
+
+        animals = self.view.animals(world)
+        animal_id_width, animal_ids = _fixed_ids([a.id for a in animals])
+        _pad4(chunks, animal_ids)
+        animal_types: Dict[str, int] = {}
+        chunks.append(np.array([(a.x, a.y) for a in animals], dtype=np.int16).tobytes())
+        chunks.append(_finite([a.energy for a in animals]).tobytes())
+        _pad4(chunks, np.array([animal_types.setdefault(a.type, len(animal_types)) for a in animals], dtype=np.uint8).tobytes())
+
+        n_items = 0
+        item_kinds: Dict[tuple, int] = {}
+        if self.item_version != world.item_version:
+            flags |= FLAG_ITEMS
+            cells, kinds = [], []
+            for x, y in self.view.item_cells(world):
+                for item in world.items_grid.get((x, y), []):
+                    cells.append((x, y))
+                    kinds.append(item_kinds.setdefault((item.name, tuple(item.tags)), len(item_kinds)))
+            n_items = len(cells)
+            chunks.append(np.array(cells, dtype=np.int16).tobytes())
+            _pad4(chunks, np.array(kinds, dtype=np.uint16).tobytes())
+            self.item_version = world.item_version
+
+        packed = ("id", "x", "y", "needs")
+        details = [{k: v for k, v in self.view.agent_dict(agent, world).items() if k not in packed} for agent in agents]
+        trailer = _dumps_finite({
+            "logs": getattr(world, 'logs', []),
+            "harmony": world.harmony(),
+            "agent_details": details,
+            "animal_types": list(animal_types),
+            "item_kinds": [{"name": name, "tags": list(tags)} for name, tags in item_kinds],
+        }).encode("utf-8")
+
+        header = BINARY_HEADER.pack(BINARY_MAGIC, flags, int(world.time_step), int(world.generation),
+                                    int(world.width), int(world.height), len(agents), len(animals), n_items,
+                                    agent_id_width, animal_id_width, len(trailer))
+        return b"".join([header, *chunks, trailer])
+
+
+def decode_binary_frame(data: bytes) -> Dict:
+    """
+    Python twin of frontend/src/binaryFrame.js (tests/tools). Returns the frame
+    as a get_state()-shaped dict; 'terrain'/'items' only when the frame has them.
+    """
+    (magic, flags, time_step, generation, width, height, n_agents, n_animals, n_items,
+     agent_id_width, animal_id_width, json_len) = BINARY_HEADER.unpack_from(data, 0)
+    assert magic == BINARY_MAGIC, "Not an ADM1 frame"
+    offset = BINARY_HEADER.size
+
+    def take(dtype, count, align=True):
+        nonlocal offset
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        if align and offset % 4:
+            offset += 4 - offset % 4
+        return array
+
+    frame = {"time_step": time_step, "generation": generation, "width": width, "height": height,
+             "paused": bool(flags & FLAG_PAUSED), "is_day": bool(flags & FLAG_DAY)}
+    if flags & FLAG_TERRAIN:
+        frame["terrain"] = take(np.uint8, width * height).reshape(height, width).tolist()
+    agent_ids = take(f"S{max(agent_id_width, 1)}", n_agents) if n_agents else []
+    agent_xy = take(np.int16, n_agents * 2, align=False).reshape(-1, 2)
+    needs = take(np.float32, n_agents * len(AGENT_NEEDS)).reshape(-1, len(AGENT_NEEDS))
+    animal_ids = take(f"S{max(animal_id_width, 1)}", n_animals) if n_animals else []
+    animal_xy = take(np.int16, n_animals * 2, align=False).reshape(-1, 2)
+    animal_energy = take(np.float32, n_animals, align=False)
+    animal_type = take(np.uint8, n_animals)
+    if flags & FLAG_ITEMS:
+        item_xy = take(np.int16, n_items * 2, align=False).reshape(-1, 2)
+        item_kind = take(np.uint16, n_items)
+    trailer = json.loads(data[offset:offset + json_len].decode("utf-8"))
+
+    def num(v):
+        return None if np.isnan(v) else float(v)
+
+    frame["logs"] = trailer["logs"]
+    frame["harmony"] = trailer["harmony"]
+    frame["agents"] = []
+    for i, details in enumerate(trailer["agent_details"]):
+        frame["agents"].append({**details, "id": agent_ids[i].decode(), "x": int(agent_xy[i][0]),
+                                "y": int(agent_xy[i][1]), "needs": dict(zip(AGENT_NEEDS, map(num, needs[i])))})
+    frame["animals"] = [{"id": animal_ids[i].decode(), "x": int(animal_xy[i][0]), "y": int(animal_xy[i][1]),
+                         "type": trailer["animal_types"][animal_type[i]], "energy": num(animal_energy[i])}
+                        for i in range(n_animals)]
+    if flags & FLAG_ITEMS:
+        kinds = trailer["item_kinds"]
+        frame["items"] = [{**kinds[k], "x": int(x), "y": int(y)} for (x, y), k in zip(item_xy.tolist(), item_kind.tolist())]
+    return frame
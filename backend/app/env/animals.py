@@ -1,6 +1,7 @@
-from dataclasses import dataclass
-import uuid
+from dataclasses import dataclass, field
+from typing import Optional
 import numpy as np
+from .rng import legacy_stream, random_id
 
 @dataclass
 class Animal:
@@ -9,10 +10,13 @@ class Animal:
     type: str # 'herbivore', 'carnivore'
     energy: float = 1.0
     id: str = None
+    rng: Optional[np.random.Generator] = field(default=None, repr=False, compare=False) # Own stream (World.new_animal)
 
     def __post_init__(self):
+        if self.rng is None:
+            self.rng = legacy_stream()
         if self.id is None:
-            self.id = str(uuid.uuid4())
+            self.id = random_id(self.rng)
 
     def act(self, world):
         # Simple AI
@@ -57,16 +61,16 @@ class Animal:
                     move_y = 1 if dy > 0 else -1
                 
                 # Add some randomness to avoid getting stuck
-                if np.random.random() < 0.2:
-                    move_x = np.random.randint(-1, 2)
-                    move_y = np.random.randint(-1, 2)
+                if self.rng.random() < 0.2:
+                    move_x = int(self.rng.integers(-1, 2))
+                    move_y = int(self.rng.integers(-1, 2))
                 
                 world.move_animal(self.id, move_x, move_y)
             else:
                 # Random graze
-                if np.random.random() < 0.2:
-                    move_x = np.random.randint(-1, 2)
-                    move_y = np.random.randint(-1, 2)
+                if self.rng.random() < 0.2:
+                    move_x = int(self.rng.integers(-1, 2))
+                    move_y = int(self.rng.integers(-1, 2))
                     world.move_animal(self.id, move_x, move_y)
 
     def _hunt(self, world):
@@ -99,48 +103,35 @@ class Animal:
             current_terrain = world.terrain_grid[self.y][self.x]
             if current_terrain != 3:
                 # Move randomly to find forest? Or just random wander
-                move_x = np.random.randint(-1, 2)
-                move_y = np.random.randint(-1, 2)
+                move_x = int(self.rng.integers(-1, 2))
+                move_y = int(self.rng.integers(-1, 2))
                 world.move_animal(self.id, move_x, move_y)
             else:
                 # Already in forest, stay put mostly, or patrol
-                if np.random.random() < 0.1:
-                    move_x = np.random.randint(-1, 2)
-                    move_y = np.random.randint(-1, 2)
+                if self.rng.random() < 0.1:
+                    move_x = int(self.rng.integers(-1, 2))
+                    move_y = int(self.rng.integers(-1, 2))
                     world.move_animal(self.id, move_x, move_y)
 
     def _get_nearby_animals(self, world, radius, type_filter):
-        animals = []
-        for animal in world.animals:
-            if animal.id == self.id: continue
-            if animal.type != type_filter: continue
-            dist = np.sqrt((animal.x - self.x)**2 + (animal.y - self.y)**2)
-            if dist < radius:
-                animals.append(animal)
-        return animals
+        nearby = world.query_radius(self.x, self.y, radius, kind='animal', exclude_id=self.id)
+        return [animal for _, animal in nearby if animal.type == type_filter]
 
     def _get_nearby_agents(self, world, radius):
-        # Inefficient O(N), but fine for small N
-        agents = []
-        for agent in world.agents.values():
-            dist = np.sqrt((agent.x - self.x)**2 + (agent.y - self.y)**2)
-            if dist < radius:
-                agents.append(agent)
-        agents.sort(key=lambda a: np.sqrt((a.x - self.x)**2 + (a.y - self.y)**2))
-        return agents
+        # Sorted nearest first
+        return [agent for _, agent in world.query_radius(self.x, self.y, radius, kind='agent')]
 
 
     def die(self, world):
         if self in world.animals:
-            world.animals.remove(self)
+            world.remove_animal(self)
             # Drop meat
             from .item import Item
-            import uuid
-            meat = Item(id=f"meat_{uuid.uuid4()}", name="Meat", weight=0.5, hardness=0.1, durability=0.1, tags=["food", "consumable"])
+            meat = Item(id=f"meat_{world.random.new_id()}", name="Meat", weight=0.5, hardness=0.1, durability=0.1, tags=["food", "consumable"])
             world._add_item(self.x, self.y, meat)
             
             # Drop Leather (New)
-            leather = Item(id=f"leather_{uuid.uuid4()}", name="Leather", weight=0.2, hardness=0.3, durability=0.5, tags=["material", "craftable"])
+            leather = Item(id=f"leather_{world.random.new_id()}", name="Leather", weight=0.2, hardness=0.3, durability=0.5, tags=["material", "craftable"])
             world._add_item(self.x, self.y, leather)
 
     def to_dict(self):
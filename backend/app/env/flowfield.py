@@ -0,0 +1,96 @@
+import numpy as np
+from typing import Optional, Tuple
+
+# Step directions, orthogonal first so ties prefer straight moves
+DIRECTIONS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)], dtype=np.int64)
+
+UNREACHABLE = -1
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    """3x3 box dilation (8-neighborhood) of a boolean grid."""
+    rows = mask.copy()
+    rows[1:] |= mask[:-1]
+    rows[:-1] |= mask[1:]
+    grown = rows.copy()
+    grown[:, 1:] |= rows[:, :-1]
+    grown[:, :-1] |= rows[:, 1:]
+    return grown
+
+
+def distance_field(walkable: np.ndarray, goal_xs, goal_ys) -> np.ndarray:
+    """
+    Multi-source BFS (Dijkstra with unit step cost, diagonals included) from
+    every goal cell over the walkable cells, one frontier ring per NumPy pass.
+    Returns int32 steps-to-nearest-goal per cell, UNREACHABLE where no path exists.
+    """
+    dist = np.full(walkable.shape, UNREACHABLE, dtype=np.int32)
+    frontier = np.zeros(walkable.shape, dtype=bool)
+    frontier[np.asarray(goal_ys, dtype=np.int64), np.asarray(goal_xs, dtype=np.int64)] = True
+    dist[frontier] = 0
+    visited = frontier.copy()
+    d = 0
+    while frontier.any():
+        d += 1
+        frontier = _dilate(frontier) & walkable & ~visited
+        dist[frontier] = d
+        visited |= frontier
+    return dist
+
+
+def descent_directions(dist: np.ndarray) -> np.ndarray:
+    """
+    Index into DIRECTIONS of the neighbor with the smallest distance for every
+    cell (-1 at goals and unreachable cells), so a next-step lookup is one read.
+    """
+    h, w = dist.shape
+    big = np.iinfo(np.int32).max
+    padded = np.full((h + 2, w + 2), big, dtype=np.int32)
+    padded[1:-1, 1:-1] = np.where(dist == UNREACHABLE, big, dist)
+    neighbor = np.stack([padded[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx] for dx, dy in DIRECTIONS])
+    best = neighbor.argmin(axis=0).astype(np.int8)
+    best_dist = np.take_along_axis(neighbor, best[None].astype(np.int64), axis=0)[0]
+    best[(dist <= 0) | (best_dist >= dist)] = -1
+    return best
+
+
+class FlowField:
+    """
+    Distance map to a goal set (e.g. all food cells, one tribe leader) shared by
+    every agent heading there. Built once; lookups are O(1) array reads.
+    `walkable` may be a window of the map whose top-left cell is `origin`
+    (goals and lookups stay in map coordinates; outside it is unreachable).
+    """
+    def __init__(self, walkable: np.ndarray, goal_xs, goal_ys, signature=None, walkable_version: int = 0, time_step: int = 0,
+                 origin: Tuple[int, int] = (0, 0)):
+        self.origin = origin
+        self.dist = distance_field(walkable, np.asarray(goal_xs, dtype=np.int64) - origin[0],
+                                   np.asarray(goal_ys, dtype=np.int64) - origin[1])
+        self.directions = descent_directions(self.dist)
+        self.signature = signature # What the goal set looked like when built
+        self.walkable_version = walkable_version
+        self.time_step = time_step
+        self.last_used = time_step
+
+    def _inside(self, x: int, y: int) -> bool:
+        h, w = self.dist.shape
+        return 0 <= x < w and 0 <= y < h
+
+    def distance(self, x: int, y: int) -> Optional[int]:
+        """Steps from (x, y) to the nearest goal, or None if unreachable."""
+        x, y = x - self.origin[0], y - self.origin[1]
+        if not self._inside(x, y):
+            return None
+        d = int(self.dist[y, x])
+        return None if d == UNREACHABLE else d
+
+    def step(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """(dx, dy) that moves one step closer to the nearest goal; None at a goal or if unreachable."""
+        x, y = x - self.origin[0], y - self.origin[1]
+        if not self._inside(x, y):
+            return None
+        i = int(self.directions[y, x])
+        if i < 0:
+            return None
+        dx, dy = DIRECTIONS[i]
+        return int(dx), int(dy)
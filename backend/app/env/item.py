@@ -58,3 +58,19 @@ BASE_VALUES = {
     "Diamond": 50, # Rare
     "Gold": 25
 }
+
+def item_category(item) -> str:
+    """
+    Resource category of an item: 'food', 'wood', 'stone', 'material' or 'item'.
+    Same naming rules agents use when memorizing what they see.
+    Also accepts an Item.to_dict() (inventory entries store those).
+    """
+    if isinstance(item, dict):
+        name, tags = item.get('name', '').lower(), item.get('tags', [])
+    else:
+        name, tags = item.name.lower(), item.tags
+    if 'rock' in name or 'stone' in name: return 'stone'
+    if 'wood' in name: return 'wood'
+    if 'consumable' in tags: return 'food'
+    if 'material' in tags: return 'material'
+    return 'item'
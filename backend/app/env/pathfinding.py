@@ -0,0 +1,125 @@
+import heapq
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+# Nodes A* may pop before giving up (a 200x200 map has 40k cells)
+MAX_EXPANSIONS = 20000
+
+# 8-connected moves, matching World.move_agent's (dx, dy) in [-1, 1]
+NEIGHBORS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def astar(walkable: Sequence[int], width: int, height: int, start: Tuple[int, int], goal: Tuple[int, int],
+          reach_sq: int = 2, max_expansions: int = MAX_EXPANSIONS) -> Optional[List[Tuple[int, int]]]:
+    """
+    Heap-based A* over a flat walkability mask (walkable[y * width + x] truthy
+    for passable cells). Every move, diagonal included, costs one step.
+    Stops at the first cell within sqrt(reach_sq) of `goal` (the goal itself may
+    be blocked, e.g. another agent standing on it).
+    Returns the cells to walk through, excluding `start` ([] when start is
+    already close enough), or None when no path was found within max_expansions.
+    """
+    sx, sy = start
+    gx, gy = goal
+    if (sx - gx) ** 2 + (sy - gy) ** 2 <= reach_sq:
+        return []
+
+    def h(x, y):
+        # Chebyshev distance to the goal region: admissible with unit diagonal cost
+        return max(abs(x - gx), abs(y - gy), 1) - 1
+
+    start_idx = sy * width + sx
+    came_from = {start_idx: -1}
+    cost = {start_idx: 0}
+    # (f, -g, idx): among equal f, expand the deepest node first
+    heap = [(h(sx, sy), 0, start_idx)]
+    expansions = 0
+
+    while heap:
+        _, neg_g, idx = heapq.heappop(heap)
+        g = -neg_g
+        if g > cost[idx]:
+            continue # Stale heap entry
+        expansions += 1
+        if expansions > max_expansions:
+            return None
+        cy, cx = divmod(idx, width)
+        for dx, dy in NEIGHBORS:
+            nx, ny = cx + dx, cy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            n_idx = ny * width + nx
+            if not walkable[n_idx]:
+                continue
+            ng = g + 1
+            if ng >= cost.get(n_idx, ng + 1):
+                continue
+            cost[n_idx] = ng
+            came_from[n_idx] = idx
+            if (nx - gx) ** 2 + (ny - gy) ** 2 <= reach_sq:
+                # Walk back to the start
+                path = []
+                while n_idx != start_idx:
+                    py, px = divmod(n_idx, width)
+                    path.append((px, py))
+                    n_idx = came_from[n_idx]
+                path.reverse()
+                return path
+            heapq.heappush(heap, (ng + h(nx, ny), -ng, n_idx))
+    return None
+
+
+def label_components(walkable: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    8-connected component labels of the walkable cells (land masses).
+    Works on horizontal runs instead of cells: runs are found with NumPy, runs
+    touching in neighboring rows are merged with a union-find, then the
+    labels are painted back. Returns (labels, count) with labels 1..count on
+    land and 0 on water.
+    """
+    h, w = walkable.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = walkable
+    edges = np.diff(padded, axis=1)
+    run_rows, run_x0 = np.nonzero(edges == 1) # Run starts
+    _, run_x1 = np.nonzero(edges == -1)       # One past each run end
+    run_x1 = run_x1 - 1
+    n = len(run_rows)
+    labels = np.zeros((h, w), dtype=np.int32)
+    if n == 0:
+        return labels, 0
+
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Runs of each row are contiguous and sorted by x in the nonzero output
+    row_start = np.searchsorted(run_rows, np.arange(h + 1))
+    for y in range(h - 1):
+        a0, a1 = row_start[y], row_start[y + 1]
+        b0, b1 = row_start[y + 1], row_start[y + 2]
+        if a0 == a1 or b0 == b1:
+            continue
+        # Runs in the next row overlapping [x0 - 1, x1 + 1] (diagonal contact counts)
+        lo = b0 + np.searchsorted(run_x1[b0:b1], run_x0[a0:a1] - 1, side='left')
+        hi = b0 + np.searchsorted(run_x0[b0:b1], run_x1[a0:a1] + 1, side='right')
+        for a, (l, r) in enumerate(zip(lo.tolist(), hi.tolist()), start=a0):
+            ra = find(a)
+            for b in range(l, r):
+                rb = find(b)
+                if ra != rb:
+                    parent[rb] = ra
+
+    roots = np.array([find(i) for i in range(n)])
+    _, run_labels = np.unique(roots, return_inverse=True)
+    run_labels = run_labels.astype(np.int32) + 1
+    lengths = run_x1 - run_x0 + 1
+    flat = run_rows * w + run_x0
+    # Paint each run: cell index = run start + offset within the run
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    labels.ravel()[np.repeat(flat, lengths) + offsets] = np.repeat(run_labels, lengths)
+    return labels, int(run_labels.max())
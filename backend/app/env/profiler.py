@@ -0,0 +1,132 @@
+"""
+Per-phase tick profiler.
+
+Every World (and ShardedWorld) owns a Profiler, off by default. When enabled
+(config "profile", POST /profiler, or `python -m app.sim run`), the step's
+phases and Agent.act's sub-stages add perf_counter_ns() deltas to per-tick
+accumulators; end_tick() turns each accumulator into one sample, and the last
+PROFILE_WINDOW samples per phase give the rolling p50/p95/p99 served by
+/metrics and printed by the headless runner. Disabled, every timed site costs
+one attribute check.
+
+Phases nest: "tick" holds the whole step, "agents" holds every "act.*"
+stage, and "pathfinding.*" is counted inside whichever act stage searched.
+A tick that skips a phase samples 0 for it, so percentiles are per tick;
+"serialize" is the exception, sampled per encoded frame.
+"""
+import collections
+import contextlib
+import time
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+PROFILE_WINDOW = 1000 # Samples kept per phase for the rolling percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+clock = time.perf_counter_ns
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False, window: int = PROFILE_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.ticks = 0 # Ticks profiled since the last reset
+        self.samples: Dict[str, Deque[int]] = {} # phase -> last `window` samples (ns)
+        self.totals: Dict[str, List[int]] = {} # phase -> [ns, samples] ever recorded (Prometheus _sum/_count)
+        self._tick: Dict[str, int] = {} # phase -> ns accumulated during the current tick
+        self._per_tick: Set[str] = set() # Phases timed by lap: a tick that skips them samples 0
+
+    def lap(self, phase: str, start: int) -> int:
+        """Adds the time since `start` to `phase` for this tick; returns now, the start of the next lap."""
+        now = clock()
+        self._tick[phase] = self._tick.get(phase, 0) + now - start
+        return now
+
+    @contextlib.contextmanager
+    def phase(self, phase: str):
+        """Times the block into `phase` (for the few coarse phases per tick; inner loops use lap)."""
+        if not self.enabled:
+            yield
+            return
+        start = clock()
+        try:
+            yield
+        finally:
+            self.lap(phase, start)
+
+    @contextlib.contextmanager
+    def tick(self):
+        """Times one whole step as "tick" and closes its samples."""
+        if not self.enabled:
+            yield
+            return
+        start = clock()
+        try:
+            yield
+        finally:
+            self.lap("tick", start)
+            self.end_tick()
+
+    def end_tick(self):
+        """Turns this tick's accumulators into one sample per phase (0 for per-tick phases that did not run)."""
+        self._per_tick.update(self._tick)
+        for phase in self._per_tick:
+            self.record(phase, self._tick.get(phase, 0))
+        self._tick.clear()
+        self.ticks += 1
+
+    def record(self, phase: str, ns: int):
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = collections.deque(maxlen=self.window)
+            self.totals[phase] = [0, 0]
+        samples.append(ns)
+        total = self.totals[phase]
+        total[0] += ns
+        total[1] += 1
+
+    def reset(self):
+        self.ticks = 0
+        self.samples.clear()
+        self.totals.clear()
+        self._tick.clear()
+        self._per_tick.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """phase -> mean/p50/p95/p99 in milliseconds over the rolling window, plus its sample count."""
+        result = {}
+        for phase, samples in self.samples.items():
+            values = np.fromiter(samples, dtype=np.float64, count=len(samples)) / 1e6
+            p50, p95, p99 = np.quantile(values, QUANTILES)
+            result[phase] = {"mean_ms": float(values.mean()), "p50_ms": float(p50), "p95_ms": float(p95),
+                             "p99_ms": float(p99), "samples": len(samples)}
+        return result
+
+    def prometheus(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None,
+                   counters: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """
+        Prometheus text exposition: one `adam_phase_seconds` summary (rolling
+        quantiles, all-time _sum/_count) per phase, then `gauges` and
+        `counters` (name -> (help, value)) as adam_<name>. Counter names end
+        in _total and must only ever go up.
+        """
+        lines = ["# HELP adam_profiler_enabled Whether phase timing is on.",
+                 "# TYPE adam_profiler_enabled gauge",
+                 f"adam_profiler_enabled {int(self.enabled)}",
+                 f"# HELP adam_phase_seconds Time per tick spent in each simulation phase (quantiles over the last {self.window} samples).",
+                 "# TYPE adam_phase_seconds summary"]
+        for phase in sorted(self.samples):
+            samples = self.samples[phase]
+            values = np.fromiter(samples, dtype=np.float64, count=len(samples)) / 1e9
+            for q, value in zip(QUANTILES, np.quantile(values, QUANTILES)):
+                lines.append(f'adam_phase_seconds{{phase="{phase}",quantile="{q}"}} {value:.9f}')
+            ns, count = self.totals[phase]
+            lines.append(f'adam_phase_seconds_sum{{phase="{phase}"}} {ns / 1e9:.9f}')
+            lines.append(f'adam_phase_seconds_count{{phase="{phase}"}} {count}')
+        for kind, metrics in (("gauge", gauges), ("counter", counters)):
+            for name, (description, value) in (metrics or {}).items():
+                lines.append(f"# HELP adam_{name} {description}")
+                lines.append(f"# TYPE adam_{name} {kind}")
+                lines.append(f"adam_{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,51 @@
+"""
+Seeded randomness for a simulation run.
+
+Every World owns a WorldRandom: one root SeedSequence from the world seed,
+from which it derives
+
+  - `generator`: the world's own stream (respawns, spawn positions, births,
+    perception sightings)
+  - `spawn()`: an independent substream per agent/animal, so what one agent
+    draws never shifts another's draws, whatever order (or engine, or
+    process) they are stepped in
+  - `new_id()`: uuid4-shaped ids from a dedicated stream, so ids (and
+    everything keyed or ordered by them) repeat between runs
+
+Objects made outside any World (tests, scripts) fall back to legacy_stream(),
+which is seeded from the global np.random state, so np.random.seed() keeps
+those reproducible too.
+"""
+import uuid
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def legacy_stream() -> np.random.Generator:
+    """A Generator seeded from (and advancing) the global np.random state."""
+    return np.random.default_rng(np.random.randint(0, 2 ** 32, size=4, dtype=np.uint64))
+
+
+def random_id(rng: np.random.Generator) -> str:
+    """A uuid4-shaped id drawn from `rng`."""
+    return str(uuid.UUID(bytes=rng.bytes(16), version=4))
+
+
+class WorldRandom:
+    def __init__(self, seed: int, stream: Tuple[int, ...] = ()):
+        # `stream` tells apart Worlds that share a seed but must not share
+        # draws (the shards of a ShardedWorld)
+        self.seed = seed
+        self._sequence = np.random.SeedSequence(seed, spawn_key=tuple(stream))
+        world, ids, self._entities = self._sequence.spawn(3)
+        self.generator = np.random.default_rng(world)
+        self._ids = np.random.default_rng(ids)
+
+    def spawn(self) -> np.random.Generator:
+        """A fresh substream for one agent or animal."""
+        return np.random.default_rng(self._entities.spawn(1)[0])
+
+    def new_id(self, prefix: Optional[str] = None) -> str:
+        value = random_id(self._ids)
+        return f"{prefix}_{value}" if prefix else value
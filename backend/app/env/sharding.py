@@ -0,0 +1,483 @@
+"""
+Sharded World: the map split into rectangular tiles, one worker process per tile.
+
+Each worker runs an ordinary World (same size and seed, so the same terrain)
+but only owns the agents, animals and items inside its tile (World.bounds).
+Once per tick the coordinator (ShardedWorld) does one round trip with every
+worker in parallel:
+
+    coordinator --(migrants, halo copies, viewports)--> worker
+        worker: swap in the new halo copies, adopt migrants, run one tick
+        worker: frame part (its agents, animals, item/terrain/log changes)
+        worker: hand agents/animals that left the tile to their new owner,
+                copy agents within HALO cells of a tile edge to that neighbor
+    coordinator <--(mail for the other workers, frame part)-- worker
+
+Halo copies ("ghosts", World.ghosts) let agents near a border see, meet and
+avoid agents across it. They are a tick old and read-only: they never act,
+and anything done to them (opinions, damage, trades) is dropped when the next
+copies replace them. Items and animals are per shard, and perception reaches
+across a border only HALO cells deep.
+
+Migrants keep their whole state, RL brain included (it travels as its path
+and is reloaded on arrival, see Qalb.load_brain). Tribes are replicated: a
+migrant brings its tribe's record (Tribe.record) to a shard that has none,
+and every replica counts only the members standing in its tile. Replicas
+never sync after that, so membership changes, the leader, goal, wars and the
+resource ledger can diverge between shards, and a leader's flow field only
+exists on the leader's shard. ShardedWorld.tribes adds the per-shard shares
+(member count, centroid, harmony, holdings) into one record per tribe.
+
+ShardedWorld.get_state() merges the frame parts into World.get_state()'s
+shape, so the default JSON /ws frames work unchanged. Delta/binary streams and
+custom views still need a local World: /ws sends those clients full JSON
+frames and one {"type": "notice", "code": "sharded"} message saying so.
+"""
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+from .world import World
+from .rng import WorldRandom
+from .profiler import Profiler, clock
+from ..agents.agent import Agent
+from ..social.tribe import Tribe, TRACKED_RESOURCES
+
+HALO = 16 # Cells of a neighbor's tile mirrored past each edge (covers the desire engine's STRANGER_RANGE)
+
+
+class Tiling:
+    """`count` tiles over a width x height map: a rows x cols grid, as square as `count` allows."""
+    def __init__(self, width: int, height: int, count: int):
+        self.width = width
+        self.height = height
+        self.rows = max(d for d in range(1, int(math.isqrt(count)) + 1) if count % d == 0)
+        self.cols = count // self.rows
+        if width < height:
+            self.rows, self.cols = self.cols, self.rows
+        # Edges are ceilings so that tile_of's floor division agrees with them
+        xs = [-(-i * width // self.cols) for i in range(self.cols + 1)]
+        ys = [-(-j * height // self.rows) for j in range(self.rows + 1)]
+        self.tiles: List[Tuple[int, int, int, int]] = [(xs[i], ys[j], xs[i + 1], ys[j + 1])
+                                                       for j in range(self.rows) for i in range(self.cols)]
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def tile_of(self, x: int, y: int) -> int:
+        col = min(max(int(x), 0) * self.cols // self.width, self.cols - 1)
+        row = min(max(int(y), 0) * self.rows // self.height, self.rows - 1)
+        return row * self.cols + col
+
+    def halo_of(self, x: int, y: int, own: int, halo: int = HALO) -> List[int]:
+        """The other tiles whose halo (tile grown by `halo` cells) contains (x, y)."""
+        x0, y0, x1, y1 = self.tiles[own]
+        if x0 + halo <= x < x1 - halo and y0 + halo <= y < y1 - halo:
+            return [] # Deep inside its own tile
+        return [i for i, (tx0, ty0, tx1, ty1) in enumerate(self.tiles)
+                if i != own and tx0 - halo <= x < tx1 + halo and ty0 - halo <= y < ty1 + halo]
+
+
+class _GhostPickler(pickle.Pickler):
+    """Pickles agents without their memories (diary, spatial memory, perception), which copies never need."""
+    def reducer_override(self, obj):
+        if type(obj) is not Agent:
+            return NotImplemented
+        state = obj.__getstate__()
+        state.update(diary=[], visible_agents=[], visible_agents_state={}, _known_places={}, _sightings={},
+                     spatial_memory={key: [] for key in obj.spatial_memory}, plan_queue=[])
+        return (Agent.__new__, (Agent,), state)
+
+
+def _ghost_blob(agent) -> bytes:
+    buffer = io.BytesIO()
+    _GhostPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(agent)
+    return buffer.getvalue()
+
+
+def _merge_tribes(parts: List[Dict]) -> Dict[str, Dict]:
+    """Tribe.to_dict()-shaped records for the whole map, added up from every shard's Tribe.share()."""
+    shares: Dict[str, List[Dict]] = {}
+    for part in parts:
+        for tribe_id, share in part["tribes"].items():
+            shares.setdefault(tribe_id, []).append(share)
+    tribes = {}
+    for tribe_id, group in shares.items():
+        # Name, goal and ledger from the replica that has the leader, else the biggest one
+        main = max(group, key=lambda share: (share["leader_id"] in share["members"], len(share["members"])))
+        members = sum(len(share["members"]) for share in group)
+        opinion_sum = sum(share["opinion_sum"] for share in group)
+        opinion_count = sum(share["opinion_count"] for share in group)
+        if not members:
+            harmony = 100.0
+        elif not opinion_count:
+            harmony = 50.0
+        else:
+            harmony = max(0.0, min(100.0, (opinion_sum / opinion_count + 100) / 2))
+        tribes[tribe_id] = {
+            "id": tribe_id,
+            "name": main["name"],
+            "leader_id": main["leader_id"],
+            "member_count": members,
+            "color": main["color"],
+            "goal": main["goal"],
+            "resources": main["resources"],
+            "harmony": harmony,
+            "centroid": (sum(share["sum_x"] for share in group) / members,
+                         sum(share["sum_y"] for share in group) / members) if members else None,
+            "holdings": {resource: sum(share["holdings"].get(resource, 0) for share in group)
+                         for resource in TRACKED_RESOURCES},
+        }
+    return tribes
+
+
+def _empty_mail() -> Dict:
+    return {"agents": [], "animals": [], "ghosts": [], "tribes": {}}
+
+
+class Shard:
+    """One tile's World and its side of the tick exchange (run inside a worker, or in-process)."""
+    def __init__(self, index: int, tiling: Tiling, seed: int, config: Optional[Dict], halo: int = HALO):
+        self.index = index
+        self.tiling = tiling
+        self.halo = halo
+        world = self.world = World(tiling.width, tiling.height, seed=seed, config=config)
+        world.random = WorldRandom(seed, stream=(index + 1,)) # Same terrain, but births, respawns and ids of its own
+        world.bounds = tiling.tiles[index]
+        world.bounds_margin = halo
+        x0, y0, x1, y1 = world.bounds
+        world.items_grid = {(x, y): items for (x, y), items in world.items_grid.items() if x0 <= x < x1 and y0 <= y < y1}
+        world._item_journal = []
+        world.item_version += 1
+        world.rebuild_spatial_index()
+        self.item_version = -1 # Item changes sent so far (-1: send everything)
+        self.terrain_version = world.terrain_version
+        self.log_count = world.log_count
+
+    def step(self, mail: Dict) -> Tuple[List[Dict], Dict]:
+        world = self.world
+        for agent_id in list(world.ghosts):
+            world.remove_agent(agent_id)
+        for tribe_id, record in mail["tribes"].items():
+            if tribe_id not in world.tribes: # First member to come here: start a replica
+                tribe = world.tribes[tribe_id] = Tribe(**record)
+                tribe.bind(world.agents)
+        for blob in mail["agents"]:
+            agent = pickle.loads(blob)
+            world.adopt_agent(agent)
+            tribe = world.tribes.get(agent.attributes.tribe_id) if agent.attributes.tribe_id else None
+            if tribe is not None:
+                tribe.member_arrived(agent.id)
+        for animal in mail["animals"]:
+            world.add_animal(animal)
+        for blob in mail["ghosts"]:
+            ghost = pickle.loads(blob)
+            if ghost.id not in world.agents:
+                world.adopt_agent(ghost)
+                world.ghosts.add(ghost.id)
+        world.viewports = mail.get("viewports", [])
+
+        world.step() # Ghosts never act
+
+        # Frame part before anything leaves, so migrants are drawn where they stand
+        part = self.frame_part()
+        outbox = [_empty_mail() for _ in self.tiling.tiles]
+        for agent in list(world.agents.values()):
+            if agent.id in world.ghosts:
+                continue
+            owner = self.tiling.tile_of(agent.x, agent.y)
+            if owner != self.index:
+                tribe = world.tribes.get(agent.attributes.tribe_id) if agent.attributes.tribe_id else None
+                if tribe is not None:
+                    tribe.member_left(agent.id)
+                    outbox[owner]["tribes"][tribe.id] = tribe.record()
+                world.remove_agent(agent.id)
+                outbox[owner]["agents"].append(pickle.dumps(agent, protocol=pickle.HIGHEST_PROTOCOL))
+                continue
+            neighbors = self.tiling.halo_of(agent.x, agent.y, self.index, self.halo)
+            if neighbors:
+                blob = _ghost_blob(agent)
+                for neighbor in neighbors:
+                    outbox[neighbor]["ghosts"].append(blob)
+        for animal in list(world.animals):
+            owner = self.tiling.tile_of(animal.x, animal.y)
+            if owner != self.index:
+                world.remove_animal(animal)
+                outbox[owner]["animals"].append(animal)
+        return outbox, part
+
+    def frame_part(self) -> Dict:
+        """This tile's share of World.get_state, plus what changed since the last part."""
+        world = self.world
+        owned = [a for a in world.agents.values() if a.id not in world.ghosts]
+        changed = world.items_changed_since(self.item_version)
+        cells = world.items_grid.keys() if changed is None else changed
+        self.item_version = world.item_version
+        new_logs = world.log_count - self.log_count
+        self.log_count = world.log_count
+        terrain = world.terrain_changed_since(self.terrain_version)
+        self.terrain_version = world.terrain_version
+        return {
+            "agents": [agent.to_summary(world) for agent in owned],
+            "animals": [animal.to_dict() for animal in world.animals],
+            "items": {cell: [item.to_dict() for item in world.items_grid.get(cell, [])] for cell in cells},
+            "items_reset": changed is None,
+            "terrain": terrain,
+            "logs": world.logs[-new_logs:] if new_logs > 0 else [],
+            "opinions": (sum(sum(a.qalb.opinions.values()) for a in owned), sum(len(a.qalb.opinions) for a in owned)),
+            "decisions": (sum(a.think_count for a in owned), sum(a.carry_count for a in owned),
+                          sum(a.lod_count for a in owned)),
+            "generation": world.generation,
+            "tribes": {tribe.id: tribe.share(world) for tribe in world.tribes.values()},
+        }
+
+    def inspect(self, agent_id: str) -> Optional[Dict]:
+        agent = self.world.agents.get(agent_id)
+        return agent.to_dict(self.world) if agent is not None and agent_id not in self.world.ghosts else None
+
+    def handle(self, command: str, payload):
+        if command == "step":
+            return self.step(payload)
+        if command == "inspect":
+            return self.inspect(payload)
+        raise ValueError(f"Unknown shard command {command!r}")
+
+
+def _serve(conn, index: int, tiling: Tiling, seed: int, config: Optional[Dict], halo: int, quiet: bool):
+    """Worker process: builds its Shard, then answers (command, payload) messages until 'close'."""
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    try:
+        shard = Shard(index, tiling, seed, config, halo)
+        conn.send(("ok", None))
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        return
+    while True:
+        command, payload = conn.recv()
+        if command == "close":
+            break
+        try:
+            conn.send(("ok", shard.handle(command, payload)))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+    conn.close()
+
+
+class ShardedWorld:
+    """
+    Coordinator for `workers` shards of a width x height world. Quacks like a
+    World where the server needs it to (time_step, paused, agents, animals,
+    get_state, add_agent/add_animal), and step() advances every shard one tick.
+    processes=False runs the shards in this process, one after the other
+    (tests, single-core machines).
+    """
+    def __init__(self, width: int, height: int, seed: int = 42, config: Optional[Dict] = None, workers: int = 2,
+                 halo: int = HALO, processes: bool = True, quiet: bool = False):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.tiling = Tiling(width, height, workers)
+        self.quiet = quiet
+        # Terrain for frames and clustered spawn positions for add_agent
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            self.template = World(width, height, seed=seed, config=config)
+        self.time_step = 0
+        self.paused = False
+        self.generation = 1
+        self.viewports = [] # Set by the simulation loop, forwarded to the shards' LOD
+        self.profiler = Profiler(self.template.profiler.enabled) # Coordinator phases only (round trip, merge); per-shard phases are not collected
+        self.agents: Dict[str, Dict] = {} # id -> summary, as of the last step
+        self.tribes: Dict[str, Dict] = {} # id -> Tribe.to_dict()-shaped record for the whole map, as of the last step
+        self.animals: List[Dict] = []
+        self.logs: List[str] = []
+        self._owner: Dict[str, int] = {} # agent id -> shard, as of the last step
+        self._items: List[Dict] = [{} for _ in self.tiling.tiles] # Per shard: cell -> item dicts
+        self._opinions = (0.0, 0)
+        self._decisions = (0, 0, 0)
+        self._mail = [_empty_mail() for _ in self.tiling.tiles] # Delivered with the next step
+        self._lock = threading.Lock() # One round trip at a time (the loop thread steps, endpoints inspect)
+
+        self.shards: List[Shard] = []
+        self.processes = []
+        self.pipes = []
+        if processes:
+            # Fresh interpreters rather than forks: a fork would carry (and, as
+            # refcounts touch it, copy) everything the server process holds
+            context = multiprocessing.get_context("spawn")
+            for index in range(len(self.tiling)):
+                parent, child = context.Pipe()
+                process = context.Process(target=_serve, daemon=True, name=f"shard-{index}",
+                                                  args=(child, index, self.tiling, seed, config, halo, quiet))
+                process.start()
+                self.pipes.append(parent)
+                self.processes.append(process)
+            for pipe in self.pipes:
+                self._reply(pipe)
+        else:
+            with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+                self.shards = [Shard(index, self.tiling, seed, config, halo) for index in range(len(self.tiling))]
+
+    @staticmethod
+    def _reply(pipe):
+        status, result = pipe.recv()
+        if status != "ok":
+            raise RuntimeError(f"Shard worker failed:\n{result}")
+        return result
+
+    def _call(self, command: str, payloads: Dict[int, object]) -> Dict[int, object]:
+        """Sends `command` to the given shards at once, then collects their replies."""
+        if self.shards:
+            with contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext():
+                return {index: self.shards[index].handle(command, payload) for index, payload in payloads.items()}
+        for index, payload in payloads.items():
+            self.pipes[index].send((command, payload))
+        return {index: self._reply(self.pipes[index]) for index in payloads}
+
+    # --- World-like interface ---
+
+    @property
+    def random(self) -> WorldRandom:
+        return self.template.random
+
+    def new_agent(self, x: int = 0, y: int = 0, **kwargs):
+        return self.template.new_agent(x, y, **kwargs)
+
+    def new_animal(self, x: int, y: int, type: str):
+        return self.template.new_animal(x, y, type)
+
+    def add_agent(self, agent):
+        """Places `agent` like World.add_agent does and hands it to the shard that owns the spot (next step)."""
+        with contextlib.redirect_stdout(io.StringIO()) if self.quiet else contextlib.nullcontext():
+            self.template.add_agent(agent)
+        self.template.remove_agent(agent.id)
+        self.adopt_agent(agent)
+
+    def adopt_agent(self, agent):
+        """Hands `agent` to the shard that owns the spot it already stands on (next step)."""
+        self._mail[self.tiling.tile_of(agent.x, agent.y)]["agents"].append(
+            pickle.dumps(agent, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def add_animal(self, animal):
+        self._mail[self.tiling.tile_of(animal.x, animal.y)]["animals"].append(animal)
+
+    def step(self):
+        """One tick on every shard, in parallel, then the exchange and the merged frame."""
+        with self._lock, self.profiler.tick():
+            mail, self._mail = self._mail, [_empty_mail() for _ in self.tiling.tiles]
+            viewports = list(self.viewports)
+            for box in mail:
+                box["viewports"] = viewports
+            t = clock() if self.profiler.enabled else 0
+            replies = self._call("step", dict(enumerate(mail)))
+            if t: t = self.profiler.lap("shards", t)
+            parts = []
+            for index in range(len(self.tiling)):
+                outbox, part = replies[index]
+                for box, sent in zip(self._mail, outbox):
+                    for key in ("agents", "animals", "ghosts"):
+                        box[key].extend(sent[key])
+                    box["tribes"].update(sent["tribes"])
+                parts.append(part)
+            self._merge(parts)
+            if t: self.profiler.lap("merge", t)
+            self.time_step += 1
+
+    def _merge(self, parts: List[Dict]):
+        agents, owner, animals = {}, {}, []
+        total = count = thinks = carried = low = 0
+        for index, part in enumerate(parts):
+            for summary in part["agents"]:
+                agents[summary["id"]] = summary
+                owner[summary["id"]] = index
+            animals.extend(part["animals"])
+            items = self._items[index]
+            if part["items_reset"]:
+                items.clear()
+            for cell, stack in part["items"].items():
+                if stack:
+                    items[cell] = stack
+                else:
+                    items.pop(cell, None)
+            for x, y, terrain_id in part["terrain"]:
+                self.template.terrain_grid[y, x] = terrain_id
+            self.logs.extend(part["logs"])
+            total += part["opinions"][0]
+            count += part["opinions"][1]
+            thinks += part["decisions"][0]
+            carried += part["decisions"][1]
+            low += part["decisions"][2]
+            self.generation = max(self.generation, part["generation"])
+        del self.logs[:-50]
+        self.agents, self._owner, self.animals = agents, owner, animals
+        self.tribes = _merge_tribes(parts)
+        self._opinions = (total, count)
+        self._decisions = (thinks, carried, low)
+
+    def harmony(self) -> float:
+        total, count = self._opinions
+        return float(((total / count) + 100) / 2) if count else 50.0
+
+    def get_state(self) -> Dict:
+        """World.get_state() for the whole map, merged from the shards' last frame parts."""
+        return {
+            "width": int(self.width),
+            "height": int(self.height),
+            "time_step": int(self.time_step),
+            "is_day": self.time_step % 1000 < 500,
+            "terrain": self.template.terrain_grid.tolist(),
+            "items": [{**item, "x": int(x), "y": int(y)}
+                      for items in self._items for (x, y), stack in items.items() for item in stack],
+            "agents": list(self.agents.values()),
+            "animals": list(self.animals),
+            "logs": list(self.logs),
+            "generation": self.generation,
+            "harmony": self.harmony()
+        }
+
+    def decision_metrics(self, per_agent: bool = False) -> Dict:
+        """World.decision_metrics totals over every shard (no per-agent breakdown)."""
+        thinks, carried, low = self._decisions
+        return {
+            "think_interval": self.template.think_interval,
+            "thinks": thinks,
+            "carried": carried,
+            "low_detail": low,
+            "think_ratio": thinks / (thinks + carried) if thinks + carried else 1.0,
+        }
+
+    def inspect(self, agent_id: str) -> Optional[Dict]:
+        """Agent.to_dict() from the shard that owns `agent_id`, or None."""
+        index = self._owner.get(agent_id)
+        if index is None:
+            return None
+        with self._lock:
+            details = self._call("inspect", {index: agent_id})[index]
+            if details is None: # Migrating: it is in the mail for its next shard
+                for mail in self._mail:
+                    for blob in mail["agents"]:
+                        agent = pickle.loads(blob)
+                        if agent.id == agent_id:
+                            return agent.to_dict()
+            return details
+
+    def close(self):
+        with self._lock:
+            for pipe in self.pipes:
+                pipe.send(("close", None))
+            for process in self.processes:
+                process.join(timeout=5)
+            self.pipes, self.processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
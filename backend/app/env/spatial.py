@@ -0,0 +1,275 @@
+import heapq
+import math
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class OccupancyIndex:
+    """
+    Cell -> agent ids index for O(1) "who is standing here" lookups.
+    A cell keeps a list because spawning can still stack agents on one tile;
+    the first id in the list is the one reported by World._get_agent_at.
+    """
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], List[str]] = {}
+        self.positions: Dict[str, Tuple[int, int]] = {} # agent_id -> cell
+
+    def add(self, agent_id: str, x: int, y: int):
+        cell = (int(x), int(y))
+        if agent_id in self.positions:
+            self.remove(agent_id)
+        self.cells.setdefault(cell, []).append(agent_id)
+        self.positions[agent_id] = cell
+
+    def remove(self, agent_id: str):
+        cell = self.positions.pop(agent_id, None)
+        if cell is None:
+            return
+        ids = self.cells.get(cell)
+        if ids and agent_id in ids:
+            ids.remove(agent_id)
+            if not ids:
+                del self.cells[cell]
+
+    def move(self, agent_id: str, x: int, y: int):
+        cell = (int(x), int(y))
+        if self.positions.get(agent_id) == cell:
+            return
+        self.add(agent_id, x, y)
+
+    def get(self, x: int, y: int) -> Optional[str]:
+        ids = self.cells.get((x, y))
+        return ids[0] if ids else None
+
+    def ids_at(self, x: int, y: int) -> List[str]:
+        return list(self.cells.get((x, y), []))
+
+    def rebuild(self, agents: Iterable):
+        self.cells = {}
+        self.positions = {}
+        for agent in agents:
+            self.add(agent.id, agent.x, agent.y)
+
+    def validate(self, agents: Dict[str, object]):
+        """
+        Consistency check (for tests/debugging). Raises AssertionError if the
+        index disagrees with the agents' actual positions.
+        """
+        assert set(self.positions) == set(agents), "Occupancy index tracks a different set of agents"
+        for agent_id, agent in agents.items():
+            cell = (int(agent.x), int(agent.y))
+            assert self.positions[agent_id] == cell, f"Agent {agent_id} indexed at {self.positions[agent_id]} but is at {cell}"
+            assert agent_id in self.cells.get(cell, []), f"Cell {cell} is missing agent {agent_id}"
+        assert sum(len(ids) for ids in self.cells.values()) == len(agents), "Occupancy index has stale entries"
+
+
+class SpatialGrid:
+    """
+    Uniform bucket grid for radius queries over moving entities (agents, animals).
+    Entities are bucketed by (x // cell_size, y // cell_size); a query only
+    visits the buckets overlapping its radius, so the cost follows local
+    density instead of total population.
+    """
+    def __init__(self, cell_size: int = 16):
+        self.cell_size = cell_size
+        self.buckets: Dict[Tuple[int, int], Dict[str, object]] = {} # bucket -> {id: entity}
+        self.where: Dict[str, Tuple[int, int]] = {} # id -> bucket
+
+    def _bucket(self, x, y) -> Tuple[int, int]:
+        return (int(x) // self.cell_size, int(y) // self.cell_size)
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, entity_id):
+        return entity_id in self.where
+
+    def get(self, entity_id: str):
+        bucket = self.where.get(entity_id)
+        if bucket is None:
+            return None
+        return self.buckets[bucket].get(entity_id)
+
+    def insert(self, entity):
+        if entity.id in self.where:
+            self.remove(entity.id)
+        bucket = self._bucket(entity.x, entity.y)
+        self.buckets.setdefault(bucket, {})[entity.id] = entity
+        self.where[entity.id] = bucket
+
+    def remove(self, entity_id: str):
+        bucket = self.where.pop(entity_id, None)
+        if bucket is None:
+            return
+        members = self.buckets.get(bucket)
+        if members is not None:
+            members.pop(entity_id, None)
+            if not members:
+                del self.buckets[bucket]
+
+    def update(self, entity):
+        """Call after an entity moved. Only touches the dicts when it changed bucket."""
+        bucket = self._bucket(entity.x, entity.y)
+        if self.where.get(entity.id) != bucket:
+            self.insert(entity)
+
+    def rebuild(self, entities: Iterable):
+        self.buckets = {}
+        self.where = {}
+        for entity in entities:
+            self.insert(entity)
+
+    def query(self, x, y, r: float, exclude_id: Optional[str] = None) -> List[Tuple[float, object]]:
+        """
+        All entities with distance < r from (x, y), as (dist, entity) pairs
+        sorted nearest first.
+        """
+        cs = self.cell_size
+        bx0, by0 = int((x - r) // cs), int((y - r) // cs)
+        bx1, by1 = int((x + r) // cs), int((y + r) // cs)
+        r_sq = r * r
+        found = []
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                members = self.buckets.get((bx, by))
+                if not members:
+                    continue
+                for entity_id, entity in members.items():
+                    if entity_id == exclude_id:
+                        continue
+                    d_sq = (entity.x - x) ** 2 + (entity.y - y) ** 2
+                    if d_sq < r_sq:
+                        found.append((math.sqrt(d_sq), entity))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def query_rect(self, x0, y0, x1, y1) -> List[object]:
+        """All entities with x0 <= x < x1 and y0 <= y < y1 (viewport culling), in no particular order."""
+        cs = self.cell_size
+        found = []
+        for by in range(int(y0) // cs, (int(y1) - 1) // cs + 1):
+            for bx in range(int(x0) // cs, (int(x1) - 1) // cs + 1):
+                members = self.buckets.get((bx, by))
+                if not members:
+                    continue
+                for entity in members.values():
+                    if x0 <= entity.x < x1 and y0 <= entity.y < y1:
+                        found.append(entity)
+        return found
+
+    def validate(self, entities: Iterable):
+        """Consistency check (for tests/debugging)."""
+        entities = list(entities)
+        assert set(self.where) == {e.id for e in entities}, "Spatial grid tracks a different set of entities"
+        for entity in entities:
+            bucket = self._bucket(entity.x, entity.y)
+            assert self.where[entity.id] == bucket, f"{entity.id} bucketed at {self.where[entity.id]} but is in {bucket}"
+            assert self.buckets[bucket].get(entity.id) is entity, f"Bucket {bucket} is missing {entity.id}"
+
+
+class ResourceIndex:
+    """
+    Typed index over World.items_grid: category -> spatial bucket -> cells.
+    A cell is filed under the category of its top item (the one gather() takes),
+    so "nearest N food within r" only visits food cells in nearby buckets.
+    """
+    def __init__(self, cell_size: int = 16):
+        self.cell_size = cell_size
+        self.buckets: Dict[str, Dict[Tuple[int, int], Set[Tuple[int, int]]]] = {} # category -> bucket -> cells
+        self.categories: Dict[Tuple[int, int], str] = {} # cell -> category
+        self.version = 0 # Bumped on every change, invalidates the array snapshots
+        self._snapshots: Dict[str, tuple] = {} # category -> (version, arrays)
+
+    def _bucket(self, x, y) -> Tuple[int, int]:
+        return (x // self.cell_size, y // self.cell_size)
+
+    def set_cell(self, x: int, y: int, category: Optional[str]):
+        """Files (x, y) under `category`, or drops it when category is None."""
+        cell = (int(x), int(y))
+        old = self.categories.get(cell)
+        if old == category:
+            return
+        bucket = self._bucket(*cell)
+        self.version += 1
+        if old is not None:
+            cells = self.buckets[old][bucket]
+            cells.discard(cell)
+            if not cells:
+                del self.buckets[old][bucket]
+            del self.categories[cell]
+        if category is not None:
+            self.buckets.setdefault(category, {}).setdefault(bucket, set()).add(cell)
+            self.categories[cell] = category
+
+    def count(self, category: str) -> int:
+        return sum(len(cells) for cells in self.buckets.get(category, {}).values())
+
+    def query(self, x, y, r: float, category: str, n: Optional[int] = None) -> List[Tuple[float, Tuple[int, int]]]:
+        """
+        Cells of `category` with distance < r from (x, y), as (dist, (cx, cy))
+        pairs nearest first, truncated to the nearest n when n is given.
+        """
+        by_bucket = self.buckets.get(category)
+        if not by_bucket:
+            return []
+        cs = self.cell_size
+        bx0, by0 = int((x - r) // cs), int((y - r) // cs)
+        bx1, by1 = int((x + r) // cs), int((y + r) // cs)
+        r_sq = r * r
+        found = []
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                cells = by_bucket.get((bx, by))
+                if not cells:
+                    continue
+                for cell in cells:
+                    d_sq = (cell[0] - x) ** 2 + (cell[1] - y) ** 2
+                    if d_sq < r_sq:
+                        found.append((d_sq, cell))
+        if n is not None and n < len(found):
+            found = heapq.nsmallest(n, found)
+        else:
+            found.sort()
+        return [(math.sqrt(d_sq), cell) for d_sq, cell in found]
+
+    def cells_in_rect(self, x0, y0, x1, y1) -> List[Tuple[int, int]]:
+        """Every non-empty item cell with x0 <= x < x1 and y0 <= y < y1, any category."""
+        cs = self.cell_size
+        found = []
+        for by_bucket in self.buckets.values():
+            for by in range(int(y0) // cs, (int(y1) - 1) // cs + 1):
+                for bx in range(int(x0) // cs, (int(x1) - 1) // cs + 1):
+                    for cell in by_bucket.get((bx, by), ()):
+                        if x0 <= cell[0] < x1 and y0 <= cell[1] < y1:
+                            found.append(cell)
+        return found
+
+    def arrays(self, category: str):
+        """
+        Flat snapshot of the `category` cells for batched passes: (xs, ys, cells)
+        where cells are the (x, y) tuples in the same order. Cached until the
+        index changes.
+        """
+        cached = self._snapshots.get(category)
+        if cached is None or cached[0] != self.version:
+            cells = [cell for bucket in self.buckets.get(category, {}).values() for cell in bucket]
+            coords = np.array(cells, dtype=np.int64).reshape(-1, 2)
+            cached = self._snapshots[category] = (self.version, (coords[:, 0], coords[:, 1], cells))
+        return cached[1]
+
+    def rebuild(self, items_grid: Dict[Tuple[int, int], list], categorize):
+        self.buckets = {}
+        self.categories = {}
+        self.version += 1
+        for (x, y), items in items_grid.items():
+            if items:
+                self.set_cell(x, y, categorize(items[0]))
+
+    def validate(self, items_grid: Dict[Tuple[int, int], list], categorize):
+        """Consistency check (for tests/debugging)."""
+        expected = {pos: categorize(items[0]) for pos, items in items_grid.items() if items}
+        assert self.categories == expected, "Resource index disagrees with items_grid"
+        for category, by_bucket in self.buckets.items():
+            for bucket, cells in by_bucket.items():
+                for cell in cells:
+                    assert self.categories.get(cell) == category and self._bucket(*cell) == bucket, f"Stale resource cell {cell}"
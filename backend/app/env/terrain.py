@@ -0,0 +1,250 @@
+import numpy as np
+from typing import Dict, Optional
+
+# Terrain ids used by World.terrain_grid
+WATER, SAND, GRASS, FOREST, MOUNTAIN, SNOW = 0, 1, 2, 3, 4, 5
+
+# Noise parameters (shared by the batched generator and the legacy loop)
+SCALE = 20.0 # Smaller scale for more variation in small world
+HEIGHT_OCTAVES = 6
+MOISTURE_OCTAVES = 4
+PERSISTENCE = 0.5
+LACUNARITY = 2.0
+MOISTURE_SEED_OFFSET = 100
+
+# Item placement chances per biome
+STONE_CHANCE = 0.4   # Mountain
+FRUIT_CHANCE = 0.005 # Grass
+WOOD_CHANCE = 0.6    # Forest
+
+# Cells per noise batch in generate_terrain
+CHUNK_CELLS = 1 << 20
+
+# How closely generate_terrain's biomes follow generate_terrain_legacy, by
+# seed (moisture uses base seed + MOISTURE_SEED_OFFSET, see _gradient_tables):
+# (highest seed, fraction of cells that may differ). Measured on 200x200 and
+# 150x90 maps: identical up to seed 11, under 0.2% of cells up to seed 100,
+# about 0.5% at 128. Above LEGACY_PARITY[-1][0] the legacy loop depends on
+# memory past the C table (18% of cells differ at seed 255, 68% at 1000), and
+# the batched map is defined by the wrapped table alone.
+LEGACY_PARITY = ((11, 0.0), (100, 0.002), (128, 0.006))
+
+# Ken Perlin's reference permutation (same table the `noise` C extension uses)
+_PERM = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+    242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+    239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+    141, 128, 195, 78, 66, 215, 61, 156, 180,
+], dtype=np.int32)
+
+_GRAD_X = np.array([1, -1, 1, -1, 1, -1, 1, -1, 0, 0, 0, 0, 1, -1, 0, 0], dtype=np.float32)
+_GRAD_Y = np.array([1, 1, -1, -1, 0, 0, 0, 0, 1, -1, 1, -1, 0, 0, -1, 1], dtype=np.float32)
+
+
+def _lattice(coord: np.ndarray, repeat: np.float32):
+    """Per-axis lattice indices (i, i+1) and fade weights, as in noise2()."""
+    i = np.floor(np.fmod(coord, repeat)).astype(np.intp)
+    ii = np.fmod((i + 1).astype(np.float32), repeat).astype(np.intp)
+    f = coord - np.floor(coord)
+    fade = f * f * f * (f * (f * np.float32(6) - np.float32(15)) + np.float32(10))
+    return (i & 255), (ii & 255), f, fade
+
+
+def _gradient_tables(base: int):
+    """
+    Gradient components for every (j & 255, i & 255) lattice corner:
+    GRAD3[PERM[PERM[PERM[i + base] + j + base]] & 15].
+    """
+    # The C table is 256 entries doubled (512), so wrapping the index is
+    # equivalent while i + base and PERM[..] + j + base stay below 512. Past
+    # that, noise2() reads beyond the table into whatever the compiled
+    # extension stores next (undefined behaviour; very large bases can crash
+    # it); we wrap instead. Only base <= 1 never reads past the table, so
+    # noise values drift from `noise.pnoise2` as base grows, and biomes with
+    # them: see LEGACY_PARITY for the seed ranges.
+    lattice = np.arange(256)
+    A = _PERM[(lattice + base) & 255]
+    h = _PERM[_PERM[(A[None, :] + lattice[:, None] + base) & 255]] & 15
+    return _GRAD_X[h], _GRAD_Y[h]
+
+
+def _noise2(xs: np.ndarray, ys: np.ndarray, repeatx: np.float32, repeaty: np.float32, gx: np.ndarray, gy: np.ndarray) -> np.ndarray:
+    """Single Perlin octave over a (ys x xs) grid, a NumPy port of noise2() in the `noise` C extension."""
+    i, ii, x, fx = _lattice(xs, repeatx)
+    j, jj, y, fy = _lattice(ys, repeaty)
+    one = np.float32(1)
+    x0, x1 = x[None, :], (x - one)[None, :]
+    y0, y1 = y[:, None], (y - one)[:, None]
+
+    # Row take then column take: two cheap gathers per corner
+    def corner(rows, cols, dx, dy):
+        return gx[rows][:, cols] * dx + gy[rows][:, cols] * dy
+
+    g_aa = corner(j, i, x0, y0)
+    g_ba = corner(j, ii, x1, y0)
+    g_ab = corner(jj, i, x0, y1)
+    g_bb = corner(jj, ii, x1, y1)
+    fx = fx[None, :]
+    lo = g_aa + fx * (g_ba - g_aa)
+    hi = g_ab + fx * (g_bb - g_ab)
+    return lo + fy[:, None] * (hi - lo)
+
+
+def pnoise2_grid(xs: np.ndarray, ys: np.ndarray, octaves: int = 1, persistence: float = 0.5,
+                 lacunarity: float = 2.0, repeatx: float = 1024, repeaty: float = 1024,
+                 base: int = 0) -> np.ndarray:
+    """
+    Vectorized equivalent of `noise.pnoise2` sampled on the grid xs (columns) x ys (rows).
+    Returns a (len(ys), len(xs)) array. Works in float32 like the C extension
+    so values match to within rounding.
+    """
+    xs = np.asarray(xs, dtype=np.float32).ravel()
+    ys = np.asarray(ys, dtype=np.float32).ravel()
+    gx, gy = _gradient_tables(base)
+    freq = np.float32(1.0)
+    amp = np.float32(1.0)
+    max_amp = np.float32(0.0)
+    total = np.zeros((len(ys), len(xs)), dtype=np.float32)
+    persistence = np.float32(persistence)
+    lacunarity = np.float32(lacunarity)
+    rx = np.float32(repeatx)
+    ry = np.float32(repeaty)
+
+    for _ in range(octaves):
+        total += _noise2(xs * freq, ys * freq, rx * freq, ry * freq, gx, gy) * amp
+        max_amp += amp
+        freq *= lacunarity
+        amp *= persistence
+    return (total / max_amp).astype(np.float64)
+
+
+def classify_biomes(height_map: np.ndarray, moisture_map: np.ndarray) -> np.ndarray:
+    """Maps height/moisture to terrain ids using the World thresholds."""
+    terrain = np.full(height_map.shape, GRASS, dtype=int)
+    terrain[moisture_map < 0.15] = GRASS
+    terrain[moisture_map >= 0.15] = FOREST
+    terrain[moisture_map < -0.15] = SAND # Desert
+    terrain[height_map > 0.35] = MOUNTAIN # Mountain Range
+    terrain[height_map > 0.6] = SNOW # Peaks
+    terrain[height_map < 0.0] = SAND # Beach
+    terrain[height_map < -0.1] = WATER
+
+    # Force Water Boundary
+    terrain[0, :] = WATER
+    terrain[-1, :] = WATER
+    terrain[:, 0] = WATER
+    terrain[:, -1] = WATER
+    return terrain
+
+
+def generate_terrain(width: int, height: int, seed: int, rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+    """
+    Batched terrain generation. Builds the height/moisture maps, the biome grid
+    and the item placement masks as whole arrays. Biomes match
+    generate_terrain_legacy only for small seeds (see LEGACY_PARITY).
+    Returns a dict with 'terrain', 'height', 'moisture', 'stone', 'fruit', 'wood'.
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    height_map = np.empty((height, width))
+    moisture_map = np.empty((height, width))
+    nx = np.arange(width) / SCALE
+
+    # Row bands keep the float32 temporaries bounded on very large maps
+    band = max(1, CHUNK_CELLS // width)
+    for y0 in range(0, height, band):
+        y1 = min(height, y0 + band)
+        ny = np.arange(y0, y1) / SCALE
+        height_map[y0:y1] = pnoise2_grid(nx, ny, octaves=HEIGHT_OCTAVES, persistence=PERSISTENCE,
+                                         lacunarity=LACUNARITY, repeatx=width, repeaty=height, base=seed)
+        moisture_map[y0:y1] = pnoise2_grid(nx, ny, octaves=MOISTURE_OCTAVES, persistence=PERSISTENCE,
+                                           lacunarity=LACUNARITY, repeatx=width, repeaty=height,
+                                           base=seed + MOISTURE_SEED_OFFSET)
+
+    # Border cells are never sampled by the legacy loop
+    border = np.zeros((height, width), dtype=bool)
+    border[0, :] = border[-1, :] = border[:, 0] = border[:, -1] = True
+    height_map[border] = 0.0
+    moisture_map[border] = 0.0
+
+    terrain = classify_biomes(height_map, moisture_map)
+
+    # One draw per cell from a single seeded Generator
+    roll = rng.random((height, width))
+    return {
+        "terrain": terrain,
+        "height": height_map,
+        "moisture": moisture_map,
+        "stone": (terrain == MOUNTAIN) & (roll < STONE_CHANCE),
+        "fruit": (terrain == GRASS) & (roll < FRUIT_CHANCE),
+        "wood": (terrain == FOREST) & (roll < WOOD_CHANCE),
+    }
+
+
+def generate_terrain_legacy(width: int, height: int, seed: int) -> Dict[str, np.ndarray]:
+    """
+    The original per-cell loop (two `noise.pnoise2` calls and one
+    `np.random.random()` per cell). Kept as the reference for tests/benchmarks.
+    """
+    import noise
+    terrain = np.zeros((height, width), dtype=int)
+    height_map = np.zeros((height, width))
+    moisture_map = np.zeros((height, width))
+    stone = np.zeros((height, width), dtype=bool)
+    fruit = np.zeros((height, width), dtype=bool)
+    wood = np.zeros((height, width), dtype=bool)
+    moisture_seed = seed + MOISTURE_SEED_OFFSET
+
+    for y in range(height):
+        for x in range(width):
+            if x == 0 or x == width - 1 or y == 0 or y == height - 1:
+                terrain[y][x] = WATER
+                continue
+
+            nx = x / SCALE
+            ny = y / SCALE
+            h = noise.pnoise2(nx, ny, octaves=HEIGHT_OCTAVES, persistence=PERSISTENCE, lacunarity=LACUNARITY, repeatx=width, repeaty=height, base=seed)
+            m = noise.pnoise2(nx, ny, octaves=MOISTURE_OCTAVES, persistence=PERSISTENCE, lacunarity=LACUNARITY, repeatx=width, repeaty=height, base=moisture_seed)
+            height_map[y][x] = h
+            moisture_map[y][x] = m
+
+            if h < -0.1:
+                terrain[y][x] = WATER
+            elif h < 0.0:
+                terrain[y][x] = SAND
+            elif h > 0.35:
+                if h > 0.6:
+                    terrain[y][x] = SNOW
+                else:
+                    terrain[y][x] = MOUNTAIN
+                    stone[y][x] = np.random.random() < STONE_CHANCE
+            elif m < -0.15:
+                terrain[y][x] = SAND
+            elif m < 0.15:
+                terrain[y][x] = GRASS
+                fruit[y][x] = np.random.random() < FRUIT_CHANCE
+            else:
+                terrain[y][x] = FOREST
+                wood[y][x] = np.random.random() < WOOD_CHANCE
+
+    return {
+        "terrain": terrain,
+        "height": height_map,
+        "moisture": moisture_map,
+        "stone": stone,
+        "fruit": fruit,
+        "wood": wood,
+    }
@@ -2,6 +2,7 @@ import time
 import numpy as np
 from typing import Dict, List, Optional, Set, Tuple
 from ..agents.agent import Agent, Soul
+from .rng import WorldRandom
 
 class TestWorld:
     def __init__(self, width=100, height=100, num_agents=10):
@@ -14,6 +15,7 @@ class TestWorld:
         self.food_grid: Set[Tuple[int, int]] = set()
         self.animals = [] 
         self.items_grid = {} 
+        self.random = WorldRandom(int(np.random.randint(0, 2 ** 31))) # Item ids; seeded from np.random like the rest of TestWorld
         
         # print(f"Initializing TestWorld with {num_agents} agents...")
         for _ in range(num_agents):
@@ -33,11 +35,43 @@ class TestWorld:
         
         nx, ny = agent.x + dx, agent.y + dy
         if 0 <= nx < self.width and 0 <= ny < self.height:
-            agent.x = nx
-            agent.y = ny
+            agent.place(nx, ny)
             return True
         return False
         
+    def query_radius(self, x, y, r, kind='agent', exclude_id=None):
+        # Brute force: TestWorld populations are tiny
+        entities = self.agents.values() if kind == 'agent' else self.animals
+        found = []
+        for e in entities:
+            if e.id == exclude_id: continue
+            dist = np.sqrt((e.x - x)**2 + (e.y - y)**2)
+            if dist < r:
+                found.append((dist, e))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def query_resources(self, x, y, r, category='food', n=None):
+        from .item import item_category
+        found = []
+        for pos, items in self.items_grid.items():
+            if not items or item_category(items[0]) != category: continue
+            dist = np.sqrt((pos[0] - x)**2 + (pos[1] - y)**2)
+            if dist < r:
+                found.append((dist, pos))
+        found.sort()
+        return found[:n] if n is not None else found
+
+    def remove_item(self, x, y, item):
+        items = self.items_grid.get((x, y))
+        if items and item in items:
+            items.remove(item)
+            if not items: del self.items_grid[(x, y)]
+
+    def remove_agent(self, agent_id):
+        if agent_id in self.agents:
+            del self.agents[agent_id]
+
     def log_event(self, msg):
         pass
 
@@ -1,10 +1,30 @@
+import bisect
 from dataclasses import dataclass
 import numpy as np
-from typing import List, Dict, Optional
-from typing import List, Dict, Optional
-from .item import Item
+from typing import Callable, Dict, List, Optional
+from .item import Item, item_category
+from .terrain import generate_terrain
+from .spatial import OccupancyIndex, SpatialGrid, ResourceIndex
+from .pathfinding import astar, label_components, MAX_EXPANSIONS
+from .flowfield import FlowField
+from .rng import WorldRandom
+from .profiler import Profiler, clock
+from ..agents.store import AgentStore
 from ..social.tribe import Tribe
 
+# Flow fields: minimum age before moved goals trigger a rebuild, and how long
+# an unused field is kept
+FLOW_REFRESH_STEPS = 5
+FLOW_IDLE_STEPS = 100
+
+# Item edits kept for stream clients catching up (see items_changed_since)
+ITEM_JOURNAL_LIMIT = 20000
+
+# Level of detail (see update_lod): region size in cells and the lod_map values
+LOD_REGION = 32
+LOD_FULL = 0
+LOD_LOW = 1
+
 class World:
     def __init__(self, width: int, height: int, seed: int = 42, config: Dict = None):
         self.width = width
@@ -13,80 +33,399 @@ class World:
         self.config = config or {
             "hunger_rate": 0.002,
             "resource_growth_rate": 1.0,
-            "initial_agent_count": 10
+            "initial_agent_count": 10,
+            "perception_engine": "batched",
+            "biology_engine": "auto",
+            "desire_engine": "auto",
+            "think_interval": 1,
+            "lod_interval": 1,
+            "force_full_detail": False,
+            "profile": False
         }
         self.agents = {} # id -> Agent
+        self.agent_store = AgentStore() # Columns of every living agent's vitals/position (see agents/store.py)
         self.animals = [] # List[Animal]
         self.terrain_grid = np.zeros((height, width), dtype=int) # 0: Water, 1: Sand, 2: Grass, 3: Forest, 4: Mountain, 5: Snow
         self.items_grid = {} # (x,y) -> [Item]
+        self.resources = ResourceIndex() # category -> bucket -> cells, mirrors items_grid
+        self.item_version = 0 # Bumped on every items_grid edit
+        self._item_journal = [] # (item_version, cell) per edit, oldest first (see items_changed_since)
         self.tribes = {} # id -> Tribe
         self.time_step = 0
         self.generation = 1
         self.trade_history = [] # List of trade events
+        self.logs = [] # Last 50 event lines
+        self._harmony = None # (time_step, value) cache for harmony()
+        self.log_count = 0 # Lines ever logged (stream clients diff against it)
+        self.rng = np.random.default_rng(seed) # Seeded Generator for world generation
+        self.random = WorldRandom(seed) # Everything random after generation: world stream, per-agent substreams, ids
+        
+        # Agent Occupancy (cell -> agent ids), kept in sync by add/move/spawn/remove
+        self.occupancy = OccupancyIndex()
+        self.check_occupancy = False # Cross-check every lookup against a full scan (tests)
+        
+        # Neighbor Queries (bucketed grids, see query_radius)
+        self.agent_grid = SpatialGrid()
+        self.animal_grid = SpatialGrid()
+        
+        # Perception: 'batched' scans every agent at once in begin_tick,
+        # 'legacy' leaves it to each agent's scan_surroundings in act()
+        self.perception_engine = self.config.get("perception_engine", "batched")
+        
+        # Biology: 'batched' runs every acting agent's Nafs/Qalb update in
+        # update_biology, 'legacy' leaves it to act(), 'auto' batches once the
+        # population reaches BATCH_BIOLOGY_THRESHOLD
+        self.biology_engine = self.config.get("biology_engine", "auto")
+        
+        # Desires: same choice for Qalb.propose_action's scoring ('batched'
+        # scores every acting agent in begin_tick, see agents/desire.py)
+        self.desire_engine = self.config.get("desire_engine", "auto")
+        
+        # Decision Scheduler: agents re-plan at least every think_interval
+        # steps (1 = every step) and carry their plan forward in between
+        # unless something salient happens (see Agent.should_think)
+        self.think_interval = int(self.config.get("think_interval", 1))
+        
+        # Level of Detail: in regions with nobody else around and no viewport,
+        # agents run the full step only every lod_interval steps and drift
+        # otherwise (1 = off). force_full_detail switches it off for
+        # reproducible runs without touching the config.
+        self.lod_interval = int(self.config.get("lod_interval", 1))
+        self.force_full_detail = bool(self.config.get("force_full_detail", False))
+        self.viewports = [] # (x0, y0, x1, y1) of clients watching a region (set by the simulation loop)
+        self.lod_map = None # LOD_FULL / LOD_LOW per LOD_REGION x LOD_REGION region, rebuilt by update_lod
+        
+        # Sharding (see env/sharding.py): a worker's World only simulates its
+        # tile, and holds read-only copies of agents near the tile's edges
+        # that other workers own
+        self.bounds = None # (x0, y0, x1, y1) this World owns (None = all of it); respawns stay inside
+        self.bounds_margin = 0 # Cells past bounds that flow fields still cover (the shard's halo)
+        self.ghosts = set() # Ids in self.agents that are copies owned elsewhere; they never act
+        
+        # Profiling (see env/profiler.py): per-phase tick timings, off unless
+        # the config or POST /profiler turns them on
+        self.profiler = Profiler(bool(self.config.get("profile", False)))
         
         # Terrain Generation (Perlin Noise)
         self._generate_terrain()
         
+        # Terrain Edits (see set_terrain): version counter + per-cell stamp of the
+        # version that last changed it, so cached paths can check their cells
+        self.terrain_version = 0
+        self.terrain_stamp = np.zeros((self.height, self.width), dtype=np.int64)
+        self.walkable_version = 0 # Bumped only when a cell turns water <-> land
+        self._walkable = None # (walkable_version, mask, flat bytes) for pathfinding
+        
+        # Land Masses (8-connected component labels, 0 = water; see reachable).
+        # Labels run 1..component_count; merges after terrain edits can leave gaps.
+        self.components, self.component_count = label_components(self.terrain_grid != 0)
+        
+        # Flow Fields (shared distance maps, see flow_field)
+        self.flow_fields: Dict[str, FlowField] = {}
+        
     def _generate_terrain(self):
-        import noise
-        # Height Map
-        scale = 20.0 # Smaller scale for more variation in small world
-        octaves = 6
-        persistence = 0.5
-        lacunarity = 2.0
-        seed = self.seed
-        
-        # Moisture Map
-        moisture_seed = self.seed + 100
-        
-        self.height_map = np.zeros((self.height, self.width))
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                # Force Water Boundary
-                if x == 0 or x == self.width - 1 or y == 0 or y == self.height - 1:
-                    self.terrain_grid[y][x] = 0 # Water
-                    continue
-                
-                # Height Noise
-                nx = x/scale
-                ny = y/scale
-                h = noise.pnoise2(nx, ny, octaves=octaves, persistence=persistence, lacunarity=lacunarity, repeatx=self.width, repeaty=self.height, base=seed)
-                
-                self.height_map[y][x] = h
-                
-                # Moisture Noise
-                m = noise.pnoise2(nx, ny, octaves=4, persistence=0.5, lacunarity=2.0, repeatx=self.width, repeaty=self.height, base=moisture_seed)
-                
-                # Terrain Logic
-                if h < -0.1:
-                    self.terrain_grid[y][x] = 0 # Water
-                elif h < 0.0:
-                    self.terrain_grid[y][x] = 1 # Sand (Beach)
-                else:
-                    # Land
-                    if h > 0.35: # Mountain Range (Lowered threshold)
-                        if h > 0.6:
-                            self.terrain_grid[y][x] = 5 # Snow (Peaks)
-                        else:
-                            self.terrain_grid[y][x] = 4 # Mountain
-                            # Stone chance
-                            if np.random.random() < 0.4:
-                                self._add_item(x, y, Item(id=f"stone_{x}_{y}", name="Stone", weight=2.0, hardness=0.9, durability=1.0, tags=["heavy", "material"]))
-                    else:
-                        # Flat/Hilly
-                        if m < -0.15:
-                            self.terrain_grid[y][x] = 1 # Sand (Desert)
-                        elif m < 0.15:
-                            self.terrain_grid[y][x] = 2 # Grass
-                            # Fruit chance
-                            if np.random.random() < 0.005:
-                                self._add_item(x, y, Item(id=f"fruit_{x}_{y}", name="Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable", "red"]))
-                        else:
-                            self.terrain_grid[y][x] = 3 # Forest
-                            # Wood chance
-                            if np.random.random() < 0.6:
-                                self._add_item(x, y, Item(id=f"wood_{x}_{y}", name="Wood", weight=1.0, hardness=0.5, durability=1.0, tags=["flammable", "material"]))
+        # Batched generator: whole-array noise, biomes and placement masks
+        maps = generate_terrain(self.width, self.height, self.seed, self.rng)
+        self.terrain_grid = maps["terrain"]
+        self.height_map = maps["height"]
+        self.moisture_map = maps["moisture"]
+
+        # Items: stones, then fruit, then wood, each row-major (the old per-cell
+        # loop interleaved them; only items_grid's key order differs)
+        for y, x in np.argwhere(maps["stone"]):
+            x, y = int(x), int(y)
+            self._add_item(x, y, Item(id=f"stone_{x}_{y}", name="Stone", weight=2.0, hardness=0.9, durability=1.0, tags=["heavy", "material"]))
+        for y, x in np.argwhere(maps["fruit"]):
+            x, y = int(x), int(y)
+            self._add_item(x, y, Item(id=f"fruit_{x}_{y}", name="Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable", "red"]))
+        for y, x in np.argwhere(maps["wood"]):
+            x, y = int(x), int(y)
+            self._add_item(x, y, Item(id=f"wood_{x}_{y}", name="Wood", weight=1.0, hardness=0.5, durability=1.0, tags=["flammable", "material"]))
+
+    def set_terrain(self, x: int, y: int, terrain_id: int):
+        """Changes one terrain cell (e.g. Forest -> Grass after logging) and records the edit."""
+        old = self.terrain_grid[y][x]
+        if old == terrain_id:
+            return
+        self.terrain_grid[y][x] = terrain_id
+        self.terrain_version += 1
+        self.terrain_stamp[y, x] = self.terrain_version
+        if (old == 0) != (terrain_id == 0):
+            self.walkable_version += 1 # Paths and flow fields are only stale if walkability changed
+            self._update_components(x, y, terrain_id != 0)
+
+    def terrain_changed(self, cells: List, since: int) -> bool:
+        """True if any of `cells` [(x, y)] was edited after terrain version `since`."""
+        if self.terrain_version == since or not cells:
+            return False
+        xs, ys = zip(*cells)
+        return bool((self.terrain_stamp[list(ys), list(xs)] > since).any())
+
+    def _update_components(self, x: int, y: int, is_land: bool):
+        """Keeps the land-mass labels current after (x, y) flipped between water and land."""
+        if not is_land:
+            # Removing land can split a mass; relabel (run-based, cheap)
+            self.components, self.component_count = label_components(self.terrain_grid != 0)
+            return
+        # New land joins (and may bridge) the masses around it
+        around = self.components[max(0, y - 1):y + 2, max(0, x - 1):x + 2]
+        touching = sorted(set(around[around > 0].tolist()))
+        if not touching:
+            self.component_count += 1
+            self.components[y, x] = self.component_count
+            return
+        keep = touching[0]
+        for label in touching[1:]:
+            self.components[self.components == label] = keep
+        self.components[y, x] = keep
+
+    def component_at(self, x: int, y: int) -> int:
+        """Land-mass label of (x, y); 0 for water or outside the map."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.components[y, x])
+        return 0
+
+    def reachable(self, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """
+        True if (x1, y1) can be walked to from (x0, y0), i.e. both are on the same
+        land mass. A water target counts as reachable from any land mass touching it
+        (navigate_to only has to get next to its target).
+        """
+        start = self.component_at(x0, y0)
+        if start == 0:
+            return False
+        goal = self.component_at(x1, y1)
+        if goal:
+            return goal == start
+        if not (-1 <= x1 <= self.width and -1 <= y1 <= self.height):
+            return False
+        around = self.components[max(0, y1 - 1):y1 + 2, max(0, x1 - 1):x1 + 2]
+        return bool((around == start).any())
+
+    def find_path(self, start, goal, max_expansions: int = MAX_EXPANSIONS) -> Optional[List]:
+        """
+        A* over land (anything but water) from start to a cell next to goal.
+        Returns the cells to step through (excluding start), or None if unreachable.
+        """
+        t = clock() if self.profiler.enabled else 0
+        path = astar(self._walkable_mask()[1], self.width, self.height, (int(start[0]), int(start[1])),
+                     (int(goal[0]), int(goal[1])), max_expansions=max_expansions)
+        if t: self.profiler.lap("pathfinding.astar", t)
+        return path
+
+    def _walkable_mask(self):
+        """(mask, flat bytes) of land cells, cached per walkable_version."""
+        if self._walkable is None or self._walkable[0] != self.walkable_version:
+            mask = self.terrain_grid != 0
+            self._walkable = (self.walkable_version, mask, mask.ravel().tobytes())
+        return self._walkable[1:]
+
+    def flow_field(self, key: str) -> Optional[FlowField]:
+        """
+        Shared distance map for a popular target set:
+          'food', 'wood', 'stone', 'material' - every cell of that resource category
+          'leader:<agent_id>'                 - a tribe leader's position
+        Built on first use, rebuilt immediately when walkability changes and at
+        most every FLOW_REFRESH_STEPS when the goals moved, so one field serves
+        all agents in between. Returns None if the target set is gone.
+        """
+        signature = self._flow_signature(key)
+        if signature is None:
+            self.flow_fields.pop(key, None)
+            return None
+        field = self.flow_fields.get(key)
+        if (field is None or field.walkable_version != self.walkable_version
+                or (field.signature != signature and self.time_step - field.time_step >= FLOW_REFRESH_STEPS)):
+            t = clock() if self.profiler.enabled else 0
+            xs, ys = self._flow_goals(key)
+            mask = self._walkable_mask()[0]
+            if self.bounds is None:
+                field = FlowField(mask, xs, ys, signature, self.walkable_version, self.time_step)
+            else: # A shard only needs distances on its tile: a smaller field with fewer BFS rings
+                m = self.bounds_margin
+                x0, y0 = max(0, self.bounds[0] - m), max(0, self.bounds[1] - m)
+                x1, y1 = min(self.width, self.bounds[2] + m), min(self.height, self.bounds[3] + m)
+                xs, ys = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+                inside = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+                field = FlowField(mask[y0:y1, x0:x1], xs[inside], ys[inside], signature, self.walkable_version,
+                                  self.time_step, origin=(x0, y0))
+            self.flow_fields[key] = field
+            if t: self.profiler.lap("pathfinding.flow_field", t)
+            # Drop fields nobody asked for in a while (dead leaders, dissolved tribes)
+            for other in [k for k, f in self.flow_fields.items() if self.time_step - f.last_used > FLOW_IDLE_STEPS]:
+                del self.flow_fields[other]
+        field.last_used = self.time_step
+        return field
+
+    def _flow_signature(self, key: str):
+        """Cheap token that changes when the goals of `key` do; None if there are none."""
+        if key.startswith('leader:'):
+            leader = self.agents.get(key[len('leader:'):])
+            return (leader.x, leader.y) if leader else None
+        return self.resources.version if self.resources.buckets.get(key) else None
+
+    def _flow_goals(self, key: str):
+        """Goal cells of `key` as (xs, ys)."""
+        if key.startswith('leader:'):
+            leader = self.agents[key[len('leader:'):]]
+            return [leader.x], [leader.y]
+        xs, ys, _ = self.resources.arrays(key)
+        return xs, ys
+
+    def flow_step(self, key: str, x: int, y: int):
+        """(dx, dy) one step closer to the nearest goal of flow_field(key), or None."""
+        field = self.flow_field(key)
+        return field.step(x, y) if field else None
+
+    def flow_distance(self, key: str, x: int, y: int) -> Optional[int]:
+        """Steps from (x, y) to the nearest goal of flow_field(key), or None if unreachable."""
+        field = self.flow_field(key)
+        return field.distance(x, y) if field else None
+
+    def step(self, policy: Optional[Callable] = None):
+        """
+        One tick: begin_tick, every agent, every animal, resource respawns.
+        The server loop, the headless runner and each shard all step through
+        here. `policy(agent, world)`, when given, returns the action id that
+        overrides the agent's own choice (the server's RL mode). An agent that
+        raises is reported and skipped, so one bad agent never stalls the run.
+        """
+        profiler = self.profiler # Phase timings when enabled (see env/profiler.py)
+        with profiler.tick():
+            with profiler.phase("begin_tick"):
+                self.begin_tick()
+            with profiler.phase("agents"):
+                for agent in list(self.agents.values()):
+                    if agent.id not in self.agents or agent.id in self.ghosts: # Died during this step / copy
+                        continue
+                    try:
+                        action = policy(agent, self) if policy is not None else None
+                        agent.act(self.time_step, self, external_action=action)
+                    except Exception as e:
+                        print(f"Simulation: Critical error in agent.act: {e}")
+            with profiler.phase("animals"):
+                for animal in list(self.animals):
+                    animal.act(self)
+            with profiler.phase("respawn"):
+                self.respawn_resources()
+            self.time_step += 1
+
+    def begin_tick(self):
+        """
+        Per-tick work shared by all agents, run before they act: the LOD map,
+        then for every agent that will act this step (not busy, not dead) the
+        Nafs/Qalb update when biology is batched (see update_biology). Agents
+        that will also think this step (full detail, see Agent.should_think)
+        get the vision pass with the batched perception engine and desire
+        scoring when desires are batched (see agents/desire.py).
+        """
+        from ..agents.biology import BATCH_BIOLOGY_THRESHOLD
+        from ..agents.desire import DESIRE_BATCH_THRESHOLD
+        profiler = self.profiler if self.profiler.enabled else None
+        t = clock() if profiler else 0
+        self.update_lod()
+        if profiler: t = profiler.lap("begin_tick.lod", t)
+        batch_biology = self._batched(self.biology_engine, BATCH_BIOLOGY_THRESHOLD)
+        batch_desires = self._batched(self.desire_engine, DESIRE_BATCH_THRESHOLD)
+        if self.perception_engine != "batched" and not batch_biology and not batch_desires:
+            return
+        acting = [a for a in self.agents.values()
+                  if a.state.busy_until <= self.time_step and a.state.health > 0 and a.id not in self.ghosts]
+        if batch_biology:
+            self.update_biology(acting)
+            if profiler: t = profiler.lap("begin_tick.biology", t)
+        # Without batched biology, act() updates hunger first and decides again
+        thinking = [a for a in acting if not self.low_detail(a) and a.should_think(self, remember=batch_biology)]
+        if self.perception_engine == "batched":
+            from ..agents.perception import perceive
+            perceive(self, thinking)
+            if profiler: t = profiler.lap("begin_tick.perception", t)
+        if batch_desires: # After perception: desires read visible_agents_state
+            from ..agents.desire import propose_actions
+            propose_actions(self, thinking)
+            if profiler: t = profiler.lap("begin_tick.desires", t)
+
+    def _batched(self, engine: str, threshold: int) -> bool:
+        """Whether an 'auto' / 'batched' / 'legacy' engine setting batches at this population."""
+        return engine == "batched" or (engine == "auto" and len(self.agents) >= threshold)
+
+    def lod_active(self) -> bool:
+        return self.lod_interval > 1 and not self.force_full_detail
+
+    def update_lod(self):
+        """
+        Rebuilds lod_map. A region stays at full detail while its 3x3
+        neighborhood of regions holds two or more agents (someone has company)
+        or a carnivore, or while a viewport overlaps it or its neighbors.
+        Everything else is low detail.
+        """
+        if not self.lod_active():
+            self.lod_map = None
+            return
+        rows, cols = -(-self.height // LOD_REGION), -(-self.width // LOD_REGION)
+
+        def neighborhood(entities):
+            counts = np.zeros((rows, cols), dtype=np.int64)
+            if entities:
+                xs = np.fromiter((e.x for e in entities), dtype=np.int64, count=len(entities)) // LOD_REGION
+                ys = np.fromiter((e.y for e in entities), dtype=np.int64, count=len(entities)) // LOD_REGION
+                np.add.at(counts, (ys, xs), 1)
+            padded = np.pad(counts, 1)
+            return sum(padded[dy:dy + rows, dx:dx + cols] for dy in range(3) for dx in range(3))
+
+        full = neighborhood(list(self.agents.values())) >= 2
+        full |= neighborhood([a for a in self.animals if a.type == 'carnivore']) > 0
+        for x0, y0, x1, y1 in self.viewports:
+            full[max(0, int(y0) // LOD_REGION - 1):int(y1 - 1) // LOD_REGION + 2,
+                 max(0, int(x0) // LOD_REGION - 1):int(x1 - 1) // LOD_REGION + 2] = True
+        self.lod_map = np.where(full, LOD_FULL, LOD_LOW).astype(np.uint8)
+
+    def low_detail(self, agent) -> bool:
+        """Whether `agent` takes a cheap step this tick (LOD on, low-detail region, not its every-k full step)."""
+        if self.lod_map is None or not self.lod_active():
+            return False
+        if self.lod_map[int(agent.y) // LOD_REGION, int(agent.x) // LOD_REGION] == LOD_FULL:
+            return False
+        return (self.time_step + agent.lod_phase) % self.lod_interval != 0
+
+    def lod_metrics(self) -> Dict:
+        """LOD settings, region counts and the region map itself (rows of LOD_FULL/LOD_LOW)."""
+        lod_map = self.lod_map
+        return {
+            "interval": self.lod_interval,
+            "forced_full": self.force_full_detail,
+            "region_size": LOD_REGION,
+            "regions_full": int((lod_map == LOD_FULL).sum()) if lod_map is not None else None,
+            "regions_low": int((lod_map == LOD_LOW).sum()) if lod_map is not None else 0,
+            "map": lod_map.tolist() if lod_map is not None else None,
+        }
+
+    def decision_metrics(self, per_agent: bool = False) -> Dict:
+        """Decision scheduler counters: steps spent thinking vs carrying plans forward, optionally per agent."""
+        thinks = sum(a.think_count for a in self.agents.values())
+        carried = sum(a.carry_count for a in self.agents.values())
+        metrics = {
+            "think_interval": self.think_interval,
+            "thinks": thinks,
+            "carried": carried,
+            "low_detail": sum(a.lod_count for a in self.agents.values()),
+            "think_ratio": thinks / (thinks + carried) if thinks + carried else 1.0,
+        }
+        if per_agent:
+            metrics["agents"] = {a.id: {"thinks": a.think_count, "carried": a.carry_count, "low_detail": a.lod_count}
+                                 for a in self.agents.values()}
+        return metrics
+
+    def update_biology(self, agents: Optional[List] = None):
+        """
+        Nafs/Qalb decay (hunger, energy, lust, health, social, fun, mood) for
+        `agents` (default: every living agent) as a few array operations over
+        agent_store. Same results as each agent's Nafs.update + Qalb.update.
+        """
+        from ..agents.biology import update_biology
+        if agents is None:
+            agents = [a for a in self.agents.values() if a.state.health > 0]
+        update_biology(self, agents)
 
     def respawn_resources(self):
         """Respawn resources based on time step and config."""
@@ -122,44 +461,48 @@ class World:
             self._spawn_animals()
 
     def _spawn_random_items(self, name, chance, terrain_types, tags):
-        for y in range(self.height):
-            for x in range(self.width):
-                # Force Water Boundary
-                if x == 0 or x == self.width - 1 or y == 0 or y == self.height - 1:
-                    self.terrain_grid[y][x] = 0 # Water
-                    continue
-                if self.terrain_grid[y][x] in terrain_types:
-                    if np.random.random() < chance:
-                        # Only add if empty? Or just add more? Let's add more.
-                        self._add_item(x, y, Item(id=f"{name}_{x}_{y}_{self.time_step}", name=name, weight=1.0, hardness=1.0, durability=1.0, tags=tags))
+        x0, y0, x1, y1 = self.bounds or (0, 0, self.width, self.height)
+        window = self.terrain_grid[y0:y1, x0:x1]
+        # Force Water Boundary
+        rows, cols = np.arange(y0, y1)[:, None], np.arange(x0, x1)[None, :]
+        window[(rows == 0) | (rows == self.height - 1) | (cols == 0) | (cols == self.width - 1)] = 0
+        # One roll per candidate cell, row-major
+        ys, xs = np.nonzero(np.isin(window, terrain_types))
+        hits = self.random.generator.random(len(ys)) < chance
+        for y, x in zip((ys[hits] + y0).tolist(), (xs[hits] + x0).tolist()):
+            # Only add if empty? Or just add more? Let's add more.
+            self._add_item(x, y, Item(id=f"{name}_{x}_{y}_{self.time_step}", name=name, weight=1.0, hardness=1.0, durability=1.0, tags=tags))
 
     def _spawn_animals(self):
-        from .animals import Animal
-        # Spawn a batch of animals
-        for _ in range(20):
+        # Spawn a batch of animals (a shard spawns its tile's share of it)
+        x0, y0, x1, y1 = self.bounds or (0, 0, self.width, self.height)
+        share = (x1 - x0) * (y1 - y0) / (self.width * self.height)
+        for _ in range(int(round(20 * share))):
             # Herbivores (Herd logic handled in movement, just spawn randomly for now)
             attempts = 0
             while attempts < 100:
-                x, y = np.random.randint(0, self.width), np.random.randint(0, self.height)
+                x, y = int(self.random.generator.integers(x0, x1)), int(self.random.generator.integers(y0, y1))
                 if self.terrain_grid[y][x] != 0:  # Not water
-                    self.animals.append(Animal(x=x, y=y, type='herbivore'))
+                    self.add_animal(self.new_animal(x, y, 'herbivore'))
                     break
                 attempts += 1
         
-        for _ in range(5):
+        for _ in range(int(round(5 * share))):
             # Carnivores
             attempts = 0
             while attempts < 100:
-                x, y = np.random.randint(0, self.width), np.random.randint(0, self.height)
+                x, y = int(self.random.generator.integers(x0, x1)), int(self.random.generator.integers(y0, y1))
                 if self.terrain_grid[y][x] != 0:  # Not water
-                    self.animals.append(Animal(x=x, y=y, type='carnivore'))
+                    self.add_animal(self.new_animal(x, y, 'carnivore'))
                     break
                 attempts += 1
 
     def _add_item(self, x: int, y: int, item: Item):
         if (x, y) not in self.items_grid:
             self.items_grid[(x, y)] = []
+            self.resources.set_cell(x, y, item_category(item)) # New top item
         self.items_grid[(x, y)].append(item)
+        self._touch_items(x, y)
 
     def remove_item(self, x: int, y: int, item: Item):
         if (x, y) in self.items_grid:
@@ -167,6 +510,46 @@ class World:
                 self.items_grid[(x, y)].remove(item)
                 if not self.items_grid[(x, y)]:
                     del self.items_grid[(x, y)]
+                self._refresh_resource_cell(x, y)
+                self._touch_items(x, y)
+
+    def _touch_items(self, x: int, y: int):
+        self.item_version += 1
+        self._item_journal.append((self.item_version, (x, y)))
+        if len(self._item_journal) > ITEM_JOURNAL_LIMIT:
+            del self._item_journal[:ITEM_JOURNAL_LIMIT // 2]
+
+    def items_changed_since(self, version: int):
+        """
+        Cells whose item stack changed after item_version `version`, or None if
+        the journal no longer reaches back that far (caller must resync).
+        """
+        if version == self.item_version:
+            return set()
+        journal = self._item_journal
+        if not journal or journal[0][0] > version + 1:
+            return None
+        start = bisect.bisect_right(journal, version, key=lambda entry: entry[0])
+        return {cell for _, cell in journal[start:]}
+
+    def terrain_changed_since(self, version: int) -> List:
+        """[(x, y, terrain_id)] for cells edited after terrain_version `version`."""
+        if version == self.terrain_version:
+            return []
+        ys, xs = np.nonzero(self.terrain_stamp > version)
+        return [(int(x), int(y), int(self.terrain_grid[y, x])) for x, y in zip(xs, ys)]
+
+    def _refresh_resource_cell(self, x: int, y: int):
+        items = self.items_grid.get((x, y))
+        self.resources.set_cell(x, y, item_category(items[0]) if items else None)
+
+    def query_resources(self, x, y, r: float, category: str = 'food', n: Optional[int] = None) -> List:
+        """
+        Resource query: cells whose top item is of `category`
+        ('food', 'wood', 'stone', 'material', 'item') within r of (x, y).
+        Returns (dist, (cx, cy)) pairs nearest first; at most n if given.
+        """
+        return self.resources.query(x, y, r, category, n)
 
     def get_tile_info(self, x: int, y: int) -> Dict:
         """Returns a dict representation of a tile (for API/Agents)."""
@@ -183,6 +566,16 @@ class World:
         return None
 
 
+    def new_agent(self, x: int = 0, y: int = 0, **kwargs):
+        """An Agent drawing from its own substream of this world (add it with add_agent)."""
+        from ..agents.agent import Agent
+        return Agent(x, y, rng=self.random.spawn(), **kwargs)
+
+    def new_animal(self, x: int, y: int, type: str):
+        """An Animal drawing from its own substream of this world (add it with add_animal)."""
+        from .animals import Animal
+        return Animal(x=x, y=y, type=type, rng=self.random.spawn())
+
     def add_agent(self, agent):
         # Clustered Spawning
         # Spawn around center (width/2, height/2) with radius ~40
@@ -191,8 +584,8 @@ class World:
         
         while True:
             # Random point in circle
-            angle = np.random.uniform(0, 2 * np.pi)
-            r = np.random.uniform(0, 40) # 40 block radius
+            angle = self.random.generator.uniform(0, 2 * np.pi)
+            r = self.random.generator.uniform(0, 40) # 40 block radius
             
             x = int(center_x + r * np.cos(angle))
             y = int(center_y + r * np.sin(angle))
@@ -202,10 +595,60 @@ class World:
             y = max(0, min(y, self.height - 1))
             
             if self.terrain_grid[y][x] != 0: # Not water
-                agent.x = x
-                agent.y = y
+                agent.place(x, y)
                 break
         self.agents[agent.id] = agent
+        agent.attach(self.agent_store)
+        self.occupancy.add(agent.id, agent.x, agent.y)
+        self.agent_grid.insert(agent)
+
+    def adopt_agent(self, agent):
+        """Adds an agent where it already stands (one migrating in from another shard)."""
+        self.agents[agent.id] = agent
+        agent.attach(self.agent_store)
+        agent.place(agent.x, agent.y)
+        self.occupancy.add(agent.id, agent.x, agent.y)
+        self.agent_grid.insert(agent)
+
+    def remove_agent(self, agent_id: str):
+        """Removes an agent from the world (death) and frees its cell."""
+        if agent_id in self.agents:
+            self.agents.pop(agent_id).detach()
+        self.occupancy.remove(agent_id)
+        self.agent_grid.remove(agent_id)
+        self.ghosts.discard(agent_id)
+
+    def add_animal(self, animal):
+        self.animals.append(animal)
+        self.animal_grid.insert(animal)
+
+    def remove_animal(self, animal):
+        if animal in self.animals:
+            self.animals.remove(animal)
+        self.animal_grid.remove(animal.id)
+
+    def query_radius(self, x, y, r: float, kind: str = 'agent', exclude_id: Optional[str] = None) -> List:
+        """
+        Neighbor query shared by agents and animals.
+        Returns (dist, entity) pairs with dist < r, nearest first.
+        kind: 'agent' or 'animal'.
+        """
+        grid = self.agent_grid if kind == 'agent' else self.animal_grid
+        return grid.query(x, y, r, exclude_id=exclude_id)
+
+    def query_rect(self, x0, y0, x1, y1, kind: str = 'agent') -> List:
+        """Agents (or animals, kind='animal') with x0 <= x < x1 and y0 <= y < y1."""
+        grid = self.agent_grid if kind == 'agent' else self.animal_grid
+        return grid.query_rect(x0, y0, x1, y1)
+
+    def rebuild_spatial_index(self):
+        """Re-syncs the occupancy index, neighbor grids and resource index from scratch."""
+        self.occupancy.rebuild(self.agents.values())
+        self.agent_grid.rebuild(self.agents.values())
+        self.animal_grid.rebuild(self.animals)
+        self.resources.rebuild(self.items_grid, item_category)
+        for tribe in self.tribes.values():
+            tribe.rebuild()
 
     def move_agent(self, agent_id: str, dx: int, dy: int) -> bool:
         agent = self.agents.get(agent_id)
@@ -224,13 +667,16 @@ class World:
         if self._get_agent_at(new_x, new_y):
             return False
 
-        agent.x = new_x
-        agent.y = new_y
+        agent.place(new_x, new_y)
+        self.occupancy.move(agent_id, new_x, new_y)
+        self.agent_grid.update(agent)
+        tribe = self.tribes.get(agent.attributes.tribe_id) if agent.attributes.tribe_id else None
+        if tribe is not None:
+            tribe.member_moved(agent_id, dx, dy) # Keeps the centroid current
         return True
 
     def move_animal(self, animal_id: str, dx: int, dy: int) -> bool:
-        # Find animal (inefficient list search, optimize later)
-        animal = next((a for a in self.animals if a.id == animal_id), None)
+        animal = self.animal_grid.get(animal_id)
         if not animal:
             return False
 
@@ -246,6 +692,7 @@ class World:
 
         animal.x = new_x
         animal.y = new_y
+        self.animal_grid.update(animal)
         return True
 
 
@@ -267,16 +714,32 @@ class World:
                 for k, v in self.items_grid.items() 
                 for item in v
             ],
-            "agents": [agent.to_dict(self) for agent in self.agents.values()],
+            "agents": [agent.to_summary(self) for agent in self.agents.values()],
             "animals": [animal.to_dict() for animal in self.animals],
             "logs": getattr(self, 'logs', []),
-            "generation": self.generation
+            "generation": self.generation,
+            "harmony": self.harmony()
         }
 
+    def harmony(self) -> float:
+        """
+        Population-wide mood, 0-100: mean of every opinion (-100..100) rescaled.
+        The top bar used to compute this from every agent's opinions client-side.
+        """
+        if self._harmony is not None and self._harmony[0] == self.time_step:
+            return self._harmony[1]
+        total = count = 0
+        for agent in self.agents.values():
+            opinions = agent.qalb.opinions
+            total += sum(opinions.values())
+            count += len(opinions)
+        value = float(((total / count) + 100) / 2) if count else 50.0
+        self._harmony = (self.time_step, value)
+        return value
+
     def spawn_child(self, p1, p2):
         """Spawns a child from two parents immediately in the world."""
-        from ..agents.agent import Agent, PERSONALITY_TRAITS, NAMES_MALE, NAMES_FEMALE, Soul
-        import uuid
+        from ..agents.agent import PERSONALITY_TRAITS, Soul
         
         # 1. Anti-Stacking Logistics
         # Find a free spot near p1
@@ -301,20 +764,20 @@ class World:
             self.log_event(f"Birth failed: No room for child of {p1.attributes.name}.")
             return
 
-        child_gender = np.random.choice(["male", "female"])
+        child_gender = self.random.generator.choice(["male", "female"])
         
         # New Soul (Fresh Start for in-game birth)
         # But inherit Karma average
         avg_karma = (p1.ruh.soul.karma + p2.ruh.soul.karma) / 2.0
-        child_soul = Soul(id=str(uuid.uuid4()), memories=[], karma=avg_karma, past_lives=0)
+        child_soul = Soul(id=self.random.new_id(), memories=[], karma=avg_karma, past_lives=0)
         
-        child = Agent(x=spawn_x, y=spawn_y, gender=child_gender, soul=child_soul, birth_time=self.time_step)
+        child = self.new_agent(spawn_x, spawn_y, gender=child_gender, soul=child_soul, birth_time=self.time_step)
         
         # Genetics: Personality
         child_p_vector = {}
         for trait in PERSONALITY_TRAITS:
             val = (p1.attributes.personality_vector[trait] + p2.attributes.personality_vector[trait]) / 2.0
-            if np.random.random() < 0.1: val += np.random.normal(0, 0.1)
+            if self.random.generator.random() < 0.1: val += self.random.generator.normal(0, 0.1)
             child_p_vector[trait] = float(np.clip(val, 0.0, 1.0))
         
         child.attributes.personality_vector = child_p_vector
@@ -360,6 +823,9 @@ class World:
         
         # Add to world
         self.agents[child.id] = child
+        child.attach(self.agent_store)
+        self.occupancy.add(child.id, child.x, child.y)
+        self.agent_grid.insert(child)
         
         # Link Parents
         p1.attributes.children.append(child.id)
@@ -376,8 +842,9 @@ class World:
         pass
 
     def create_tribe(self, name: str, leader_id: str) -> Tribe:
-        import uuid
-        tribe = Tribe(name=name)
+        color = f"#{int(self.random.generator.integers(0, 0xFFFFFF)):06x}"
+        tribe = Tribe(id=self.random.new_id(), name=name, color=color)
+        tribe.bind(self.agents)
         tribe.set_leader(leader_id)
         self.tribes[tribe.id] = tribe
         self.log_event(f"Tribe Founded: {name} by {self.agents[leader_id].attributes.name}")
@@ -410,6 +877,7 @@ class World:
             self.logs = []
         msg = f"[Step {self.time_step}] {message}"
         self.logs.append(msg)
+        self.log_count = getattr(self, 'log_count', 0) + 1
         print(msg)
         if len(self.logs) > 50:
             self.logs.pop(0)
@@ -438,7 +906,27 @@ class World:
              self.log_event(f"{protagonist.attributes.name} traded {offer['name']} with {target.attributes.name} for {request}.")
     
     def _get_agent_at(self, x, y):
-        for a in self.agents.values():
-            if int(a.x) == x and int(a.y) == y:
-                return a.id
-        return None
+        agent_id = self.occupancy.get(x, y)
+        if self.check_occupancy:
+            scanned = [a.id for a in self.agents.values() if int(a.x) == x and int(a.y) == y]
+            assert sorted(scanned) == sorted(self.occupancy.ids_at(x, y)), f"Occupancy mismatch at {(x, y)}"
+            self.occupancy.validate(self.agents)
+        return agent_id
+
+
+def populate(world, agents: int, herbivores: int = 20, carnivores: int = 5, brain: Optional[str] = None):
+    """
+    The starting population (/init_world, the headless runner): `agents`
+    agents around the center, alternating male/female, each loading `brain`
+    when given, then the animals anywhere on the map. Everything is drawn from
+    the world's streams. Works on a World or a ShardedWorld.
+    """
+    for i in range(agents):
+        agent = world.new_agent(gender="male" if i % 2 == 0 else "female")
+        if brain:
+            agent.load_brain(brain)
+        world.add_agent(agent)
+    spawn = world.random.generator
+    for kind, count in (("herbivore", herbivores), ("carnivore", carnivores)):
+        for _ in range(count):
+            world.add_animal(world.new_animal(int(spawn.integers(0, world.width)), int(spawn.integers(0, world.height)), kind))
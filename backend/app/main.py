@@ -1,15 +1,19 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
 import asyncio
 import json
-import numpy as np
+import time
+from typing import Optional
 import socketio
-from .env.world import World
-from .agents.agent import Agent
-from .env.animals import Animal
+from .env.world import World, populate
+from .env.sharding import ShardedWorld
 from .api.training import router as training_router
 from .api.training import router as training_router
+from .api.stream import BinaryStream, DeltaStream, View, encode_full_state, inspector, sanitize_for_json
+from .api.simulation import SimulationLoop
+from .env.profiler import clock
 from .rl.training_manager import sio
 from .rl.envs import compute_samsara_observation
 from stable_baselines3 import PPO
@@ -62,9 +66,23 @@ class WorldConfig(BaseModel):
     hunger_rate: float = 0.002
     resource_growth_rate: float = 1.0
     initial_agent_count: int = 10
+    perception_engine: str = "batched" # 'batched' or 'legacy'
+    biology_engine: str = "auto" # 'auto', 'batched' or 'legacy'
+    desire_engine: str = "auto" # 'auto', 'batched' or 'legacy'
+    think_interval: int = 1 # Steps between re-plans (salient events re-plan early)
+    lod_interval: int = 1 # Full steps for lone, unwatched agents every k steps (1 = off)
+    force_full_detail: bool = False
+    seed: int = 42 # Same seed and config, same run (see env/rng.py)
+    shards: int = 1 # Worker processes, one map tile each; 1 = one local World. Tribes split across tiles are per-shard replicas (see env/sharding.py)
+    profile: bool = False # Per-phase tick timings for /metrics (see env/profiler.py); POST /profiler toggles it
 
 @app.post("/init_world")
-def init_world(config: WorldConfig):
+async def init_world(config: WorldConfig):
+    """Replaces the world, on the simulation thread between two ticks (building it can take a while)."""
+    await simulation.call(genesis, config)
+    return {"message": "World Initialized", "config": config.dict()}
+
+def genesis(config: WorldConfig):
     global world
     print("\n" + "="*50)
     print(f"🌍 RECEIVING GENESIS CONFIGURATION FROM FRONTEND 🌍")
@@ -74,166 +92,216 @@ def init_world(config: WorldConfig):
     print("="*50 + "\n")
     
     # 1. Create New World
-    world = World(width=200, height=200, config=config.dict())
-    
-    # 2. Spawn Agents
-    count = config.initial_agent_count
-    for i in range(count):
-        gender = "male" if i % 2 == 0 else "female"
-        # Spawn near center/random
-        agent = Agent(x=np.random.randint(0, 200), y=np.random.randint(0, 200), gender=gender)
-        
-        # Load logic
-        if os.path.exists("adam_soul_movement.zip"): agent.load_brain("adam_soul_movement")
-        elif os.path.exists("adam_soul.zip"): agent.load_brain("adam_soul")
-            
-        world.add_agent(agent)
-        
-    # 3. Spawn Animals (Default count for now)
-    for i in range(20): world.animals.append(Animal(x=np.random.randint(0, 200), y=np.random.randint(0, 200), type='herbivore'))
-    for i in range(5): world.animals.append(Animal(x=np.random.randint(0, 200), y=np.random.randint(0, 200), type='carnivore'))
+    if isinstance(world, ShardedWorld):
+        world.close()
+    if config.shards > 1:
+        world = ShardedWorld(width=200, height=200, seed=config.seed, config=config.dict(), workers=config.shards)
+    else:
+        world = World(width=200, height=200, seed=config.seed, config=config.dict())
     
-    return {"message": "World Initialized", "config": config.dict()}
+    # 2. Spawn Agents (near the center) and the default animals
+    brain = "adam_soul_movement" if os.path.exists("adam_soul_movement.zip") else "adam_soul" if os.path.exists("adam_soul.zip") else None
+    populate(world, config.initial_agent_count, brain=brain)
 
 # Note: WebSocket endpoint for main simulation remains, but Socket.IO handles training updates.
 
 @app.get("/")
-def read_root():
+async def read_root():
+    await simulation.between_ticks()
     return {
         "message": "Project Adam Backend is running", 
         "agent_count": len(world.agents), 
         "animal_count": len(world.animals), 
         "generation": world.generation,
-        "speed": SIMULATION_SPEED
+        "speed": SIMULATION_SPEED,
+        "ticks": simulation.ticks,
+        "event_loop_latency": simulation.latency(),
+        "decisions": world.decision_metrics()
     }
 
 @app.post("/evolve")
-def evolve_world():
+async def evolve_world():
     # world.evolve_generation()
+    await simulation.between_ticks()
     return {"message": "Evolution is continuous. Agents reproduce biologically.", "generation": world.generation}
 
+@app.get("/agents/{agent_id}")
+async def inspect_agent(agent_id: str):
+    """Full agent record for the inspector (diary, opinions, brain, tribe...), cached per tick."""
+    if isinstance(world, ShardedWorld):
+        # A round trip to the owning shard's process: on the simulation thread, between ticks
+        details = sanitize_for_json(await simulation.call(world.inspect, agent_id))
+    else:
+        await simulation.between_ticks()
+        details = inspector.get(world, agent_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
+    return details
+
+@app.get("/decisions")
+async def decision_metrics():
+    """Decision scheduler counters with per-agent think/carry counts."""
+    await simulation.between_ticks()
+    return world.decision_metrics(per_agent=True)
+
+@app.get("/lod")
+async def lod_map():
+    """Level-of-detail settings and the per-region map (0 = full detail, 1 = low)."""
+    await simulation.between_ticks()
+    if isinstance(world, ShardedWorld):
+        raise HTTPException(status_code=409, detail="LOD maps are kept per shard")
+    return world.lod_metrics()
+
+@app.post("/lod")
+async def set_lod(interval: Optional[int] = None, force_full_detail: Optional[bool] = None):
+    def apply():
+        if interval is not None:
+            world.lod_interval = max(1, interval)
+        if force_full_detail is not None:
+            world.force_full_detail = force_full_detail
+        return {"interval": world.lod_interval, "forced_full": world.force_full_detail}
+    return await simulation.call(apply)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text format: rolling p50/p95/p99 per tick phase (when profiling) and a few gauges."""
+    await simulation.between_ticks()
+    lag = simulation.latency()
+    gauges = {
+        "time_step": ("Current simulation time step.", world.time_step),
+        "agents": ("Living agents.", len(world.agents)),
+        "animals": ("Living animals.", len(world.animals)),
+        "event_loop_lag_seconds": ("Last measured asyncio event loop lag.", lag["last_ms"] / 1000),
+    }
+    counters = {
+        "ticks_total": ("Ticks stepped by the simulation loop.", simulation.ticks),
+        "frames_total": ("Frames published to /ws subscribers.", simulation.frames),
+    }
+    return PlainTextResponse(world.profiler.prometheus(gauges, counters), media_type="text/plain; version=0.0.4")
+
+@app.post("/profiler")
+async def set_profiler(enabled: Optional[bool] = None, reset: bool = False):
+    """Turns phase timing on/off at runtime; reset drops the collected samples."""
+    def apply():
+        if enabled is not None:
+            world.profiler.enabled = enabled
+        if reset:
+            world.profiler.reset()
+        return {"enabled": world.profiler.enabled, "ticks": world.profiler.ticks, "phases": world.profiler.summary()}
+    return await simulation.call(apply)
+
 @app.post("/speed")
 def set_speed(speed: float):
     global SIMULATION_SPEED
     SIMULATION_SPEED = max(0.0001, min(2.0, speed))
+    simulation.tick_rate = 1.0 / SIMULATION_SPEED
     return {"message": "Speed updated", "speed": SIMULATION_SPEED}
 
-# --- JSON Encoder for Numpy ---
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        return super(NumpyEncoder, self).default(obj)
-
-def sanitize_for_json(obj):
-    """
-    Recursively replace NaN and Infinity with None to ensure valid JSON.
-    """
-    if isinstance(obj, float):
-        if np.isnan(obj) or np.isinf(obj):
-            return None
-        return obj
-    elif isinstance(obj, dict):
-        return {k: sanitize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [sanitize_for_json(v) for v in obj]
-    elif isinstance(obj, np.floating):
-         if np.isnan(obj) or np.isinf(obj):
-            return None
-         return float(obj)
-    elif isinstance(obj, np.integer): # Handle numpy ints here too for safety
-        return int(obj)
-    elif isinstance(obj, np.ndarray):
-        return sanitize_for_json(obj.tolist())
-    return obj
+def rl_policy(agent, world):
+    """Action from the loaded RL soul (PROJECT_ADAM_MODE=RL), overriding the agent's own choice."""
+    obs = compute_samsara_observation(agent, world)
+    # Deterministic is usually better for deployment, but stochastic adds life
+    action, _states = rl_model.predict(obs, deterministic=False)
+    return int(action)
+
+def run_tick(world):
+    """Advances the world by one step (called by the background simulation loop)."""
+    if isinstance(world, ShardedWorld):
+        world.step() # Every shard ticks in its own process (heuristic agents only)
+    else:
+        world.step(rl_policy if rl_model else None)
+
+# One loop steps the world for everyone; /ws clients subscribe to its frames
+simulation = SimulationLoop(lambda: world, run_tick, tick_rate=1.0 / SIMULATION_SPEED)
+
+@app.on_event("startup")
+async def start_simulation():
+    simulation.start()
+
+@app.on_event("shutdown")
+async def stop_simulation():
+    await simulation.stop()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     
-    # Task to handle incoming commands (Pause)
+    # Protocol: ws://.../ws?protocol=delta for snapshot + diffs (see api/stream.py)
+    # ws://.../ws?protocol=binary for packed binary frames
+    protocol = websocket.query_params.get("protocol")
+    stream = DeltaStream() if protocol == "delta" else BinaryStream() if protocol == "binary" else None
+    # What this client sees: viewport, detail and FPS cap ({"type": "subscribe", ...}, see api/stream.py)
+    view = View()
+    simulation.start()
+    subscription = simulation.subscribe()
+    
+    # Task to handle incoming commands (Pause, Resync, Subscribe)
     async def receive_commands():
+        nonlocal view
         try:
             while True:
                 data = await websocket.receive_text()
                 try:
                     command = json.loads(data)
                     if command.get("type") == "pause":
+                        await simulation.between_ticks()
                         world.paused = not getattr(world, 'paused', False)
-                except json.JSONDecodeError:
-                    pass
+                    elif command.get("type") == "resync" and stream:
+                        stream.resync()
+                    elif command.get("type") == "subscribe":
+                        view = View.from_message(command)
+                        subscription.viewport = view.viewport # Watched regions stay at full detail
+                        if stream:
+                            stream.set_view(view)
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                    print(f"WS: Ignoring bad command {data[:200]!r}: {e}")
         except Exception:
             pass # Disconnect handled in main loop
 
     receive_task = asyncio.create_task(receive_commands())
 
+    # A sharded world only has the merged full state (ShardedWorld.get_state)
+    noticed = set()
+    async def notice_sharded(ignored):
+        """Tells the client, once per connection, that `ignored` falls back to full JSON frames."""
+        if ignored in noticed:
+            return
+        noticed.add(ignored)
+        message = f"{ignored} is not supported while the world is sharded; sending full JSON frames"
+        print(f"WS: {message}")
+        await websocket.send_text(json.dumps({"type": "notice", "code": "sharded", "ignored": ignored, "message": message}))
+
     try:
         print("WS: Starting loop")
         while True:
-            paused = getattr(world, 'paused', False)
-            if not paused:
-                # Decouple Simulation Loop from Rendering
-                # If speed is very fast (low SIMULATION_SPEED), run multiple steps per frame
-                steps_per_frame = 1
-                if SIMULATION_SPEED < 0.005: steps_per_frame = 20
-                elif SIMULATION_SPEED < 0.01: steps_per_frame = 10
-                elif SIMULATION_SPEED < 0.05: steps_per_frame = 5
-                
-                try:
-                    for _ in range(steps_per_frame):
-                        # Run one simulation step
-                        # Agents
-                        agents = list(world.agents.values())
-                        for agent in agents:
-                            if agent.id not in world.agents: continue # Died during this step
-                            if agent.id not in world.agents: continue # Died during this step
-                            try:
-                                # Decision Logic: RL vs Heuristic
-                                action_override = None
-                                if rl_model:
-                                    # 1. Compute Obs
-                                    obs = compute_samsara_observation(agent, world)
-                                    # 2. Predict (Deterministic usually better for deployment, but stochastic adds life)
-                                    action, _states = rl_model.predict(obs, deterministic=False)
-                                    # 3. Convert numpy int to python int
-                                    action_override = int(action)
-                                
-                                agent.act(world.time_step, world, external_action=action_override)
-                            except TypeError as e:
-                                 # Fallback if signature mismatch during dev
-                                 print(f"WS: Error in agent.act: {e}")
-                                 agent.act(np.random.randint(0,6), world)
-                            except Exception as e:
-                                print(f"WS: Critical error in agent.act: {e}")
-                        
-                        # Animals
-                        for animal in world.animals:
-                            animal.act(world)
-                        
-                        # Respawn Resources
-                        world.respawn_resources()
-                        
-                        world.time_step += 1
-                except Exception as e:
-                    print(f"WS: Error in Simulation Step: {e}")
-            
-            # Send state to frontend (only once per frame)
+            frame = await subscription.next_frame()
+            # Send state to frontend (the simulation keeps ticking while we wait on the socket)
             try:
-                state = world.get_state()
-                state["paused"] = paused
-                
-                # OPTIMIZATION: Only sanitize dynamic entities where NaNs occur.
-                # Sanitizing the entire terrain (200x200) is too slow and unnecessary (ints).
-                state["agents"] = sanitize_for_json(state["agents"])
-                state["animals"] = sanitize_for_json(state["animals"])
-                
-                await websocket.send_text(json.dumps(state, cls=NumpyEncoder))
+                sharded = isinstance(frame.world, ShardedWorld)
+                # Notices go out first: nothing may await between between_ticks() and the encode
+                if sharded and stream:
+                    await notice_sharded(f"protocol={protocol}")
+                if sharded and not view.is_default:
+                    await notice_sharded("subscribe")
+                await simulation.between_ticks() # Encode while the simulation thread is not stepping
+                sent_at = time.perf_counter()
+                started = clock()
+                if stream and not sharded:
+                    data = stream.encode(frame.world, frame.paused)
+                elif view.is_default or sharded:
+                    data = frame.full_state() # Shared by every default client (times its own encoding)
+                    started = None
+                else:
+                    data = encode_full_state(frame.world, frame.paused, view)
+                if started is not None and frame.world.profiler.enabled:
+                    frame.world.profiler.record("serialize", clock() - started)
+                if isinstance(data, bytes):
+                    await websocket.send_bytes(data)
+                else:
+                    await websocket.send_text(data)
+                if view.max_fps:
+                    # Frames published meanwhile are dropped by the subscription
+                    await asyncio.sleep(max(0.0, sent_at + 1.0 / view.max_fps - time.perf_counter()))
             except RuntimeError as e:
                 # Catch "Cannot call 'send' once a close message has been sent"
                 if "close message" in str(e):
@@ -243,22 +311,20 @@ async def websocket_endpoint(websocket: WebSocket):
                     print(f"WS: RuntimeError sending state: {e}")
                     import traceback
                     traceback.print_exc()
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 print(f"WS: Error sending state: {e}")
                 import traceback
                 traceback.print_exc()
                 # Retry or break?
                 await asyncio.sleep(1)
-            
-            # Control simulation speed
-            # If fast forwarding, minimum sleep to yield to event loop
-            sleep_time = SIMULATION_SPEED if SIMULATION_SPEED >= 0.01 else 0.01
-            await asyncio.sleep(sleep_time) 
     except WebSocketDisconnect:
         print("Client disconnected")
-        receive_task.cancel()
     except Exception as e:
         print(f"WS: Fatal Error in loop: {e}")
+    finally:
+        simulation.unsubscribe(subscription)
         receive_task.cancel()
 
 # Wrap with Socket.IO (Must be done after all routes are defined)
@@ -7,6 +7,80 @@ from ..agents.agent import Agent
 # For training, we usually want a lightweight World. If TestWorld is heavy, we might need a distinct TrainingWorld.
 from ..env.test_world import TestWorld 
 
+def compute_samsara_observation(agent, world, vision_range=3):
+    """
+    Standalone function to compute the observation for a given agent.
+    Used by both the Training Env and the Live Inference Loop.
+    """
+    grid_size = (vision_range * 2) + 1 # 7
+    width = world.width
+    height = world.height
+    vision = np.zeros((4, grid_size, grid_size), dtype=np.uint8)
+    
+    cx, cy = agent.x, agent.y
+    occupancy = getattr(world, 'occupancy', None)
+    
+    for dy in range(-vision_range, vision_range + 1):
+        for dx in range(-vision_range, vision_range + 1):
+            # Grid Coordinates (0 to 6)
+            gx, gy = dx + vision_range, dy + vision_range
+            # World Coordinates
+            wx, wy = cx + dx, cy + dy
+            
+            # Check Bounds
+            if not (0 <= wx < width and 0 <= wy < height):
+                vision[0, gy, gx] = 1 # Wall/OOB
+                continue
+            
+            # Check Bounds
+            if not (0 <= wx < width and 0 <= wy < height):
+                vision[0, gy, gx] = 1 # Wall/OOB
+                continue
+            
+            # Check Items at (wx, wy)
+            if (wx, wy) in world.items_grid:
+                items = world.items_grid[(wx, wy)]
+                if items:
+                    first_item = items[0]
+                    
+                    # Channel 1: Food
+                    if "food" in first_item.tags or "Fruit" in first_item.name:
+                        vision[1, gy, gx] = 1
+                        
+                    # Channel 2: Resources (Wood/Stone)
+                    # Determine type from name or tags
+                    if "Wood" in first_item.name:
+                        vision[2, gy, gx] = 1 # Tree/Wood
+                    elif "Stone" in first_item.name:
+                        vision[2, gy, gx] = 2 # Rock/Stone
+                
+            # Channel 3: Agents (Not self)
+            # World keeps an occupancy index (O(1) per cell); TestWorld does not, so scan.
+            if occupancy is not None:
+                if any(other_id != agent.id for other_id in occupancy.ids_at(wx, wy)):
+                    vision[3, gy, gx] = 1 # Neutral (TODO: Friendship color)
+            else:
+                for other in world.agents.values():
+                    if other.id == agent.id: continue
+                    if other.x == wx and other.y == wy:
+                            vision[3, gy, gx] = 1 # Neutral (TODO: Friendship color)
+
+    # Internal State
+    # [Hunger, Energy, Health, Social, InventoryCount]
+    internal = np.array([
+        agent.nafs.hunger,
+        agent.nafs.energy,
+        agent.state.health,
+        agent.qalb.social,
+        len(agent.inventory) / 20.0 # Normalized
+    ], dtype=np.float32)
+    
+    return {
+        "vision": vision,
+        "internal": internal
+    }
+
+
 class SamsaraEnv(gym.Env):
     """
     The Samsara Environment.
@@ -123,7 +197,7 @@ class SamsaraEnv(gym.Env):
             tx = self.agent.x + move_dir[0]
             ty = self.agent.y + move_dir[1]
             if 0 <= tx < self.width and 0 <= ty < self.height:
-                 self.agent.x, self.agent.y = tx, ty
+                 self.agent.place(tx, ty)
                  
         if should_interact:
             # Try Eat
@@ -151,80 +225,6 @@ class SamsaraEnv(gym.Env):
         
         return self._get_obs(), reward, terminated, truncated, {}
 
-def compute_samsara_observation(agent, world, vision_range=3):
-    """
-    Standalone function to compute the observation for a given agent.
-    Used by both the Training Env and the Live Inference Loop.
-    """
-    grid_size = (vision_range * 2) + 1 # 7
-    width = world.width
-    height = world.height
-    vision = np.zeros((4, grid_size, grid_size), dtype=np.uint8)
-    
-    cx, cy = agent.x, agent.y
-    
-    for dy in range(-vision_range, vision_range + 1):
-        for dx in range(-vision_range, vision_range + 1):
-            # Grid Coordinates (0 to 6)
-            gx, gy = dx + vision_range, dy + vision_range
-            # World Coordinates
-            wx, wy = cx + dx, cy + dy
-            
-            # Check Bounds
-            if not (0 <= wx < width and 0 <= wy < height):
-                vision[0, gy, gx] = 1 # Wall/OOB
-                continue
-            
-            # Check Bounds
-            if not (0 <= wx < width and 0 <= wy < height):
-                vision[0, gy, gx] = 1 # Wall/OOB
-                continue
-            
-            # Check Items at (wx, wy)
-            if (wx, wy) in world.items_grid:
-                items = world.items_grid[(wx, wy)]
-                if items:
-                    first_item = items[0]
-                    
-                    # Channel 1: Food
-                    if "food" in first_item.tags or "Fruit" in first_item.name:
-                        vision[1, gy, gx] = 1
-                        
-                    # Channel 2: Resources (Wood/Stone)
-                    # Determine type from name or tags
-                    if "Wood" in first_item.name:
-                        vision[2, gy, gx] = 1 # Tree/Wood
-                    elif "Stone" in first_item.name:
-                        vision[2, gy, gx] = 2 # Rock/Stone
-                
-            # Channel 3: Agents (Not self)
-            # This is O(N), for training usually fine. For inference, optimize if needed.
-            # Using world.agents dict iteration might be slow if 100s of agents.
-            # But grid is small (7x7). Better to iterate spatial map if available?
-            # Current World doesn't have a spatial agent map. Iterate all.
-            for other in world.agents.values():
-                if other.id == agent.id: continue
-                if other.x == wx and other.y == wy:
-                        vision[3, gy, gx] = 1 # Neutral (TODO: Friendship color)
-
-    # Internal State
-    # [Hunger, Energy, Health, Social, InventoryCount]
-    internal = np.array([
-        agent.nafs.hunger,
-        agent.nafs.energy,
-        agent.state.health,
-        agent.qalb.social,
-        len(agent.inventory) / 20.0 # Normalized
-    ], dtype=np.float32)
-    
-    return {
-        "vision": vision,
-        "internal": internal
-    }
-
-class SamsaraEnv(gym.Env):
-    # ... (existing class methods) ...
-    
     def _get_obs(self):
         return compute_samsara_observation(self.agent, self.world, self.vision_range)
 
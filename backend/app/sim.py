@@ -0,0 +1,152 @@
+"""
+Headless runner: steps a World as fast as it goes, with no server, no
+frames and no per-tick I/O (agents' prints go to /dev/null). The tick and
+the starting population are the server's (World.step, env.world.populate).
+
+Every --report-every seconds it prints ticks/sec, population and how the
+tick time splits across phases, then the world profiler's rolling
+mean/p50/p95/p99 per phase (see env/profiler.py; --no-profile turns all
+timing off); with --out it also appends those reports to metrics.jsonl and
+writes full-state snapshots (the /ws JSON frame) every --snapshot-every ticks.
+
+Usage (from backend/):
+    python -m app.sim run --ticks 1e6 --agents 500 --seed 1
+    python -m app.sim run --ticks 5000 --agents 100 --out runs/a --snapshot-every 1000
+    python -m app.sim run --ticks 1e4 --set think_interval=5 --set lod_interval=4
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Dict
+
+from .env.world import World, populate
+from .env.profiler import clock
+from .api.stream import encode_full_state
+
+# Top-level phases of World.step, in order (the profiler also splits them further)
+PHASES = ("begin_tick", "agents", "animals", "respawn")
+
+
+def _config_value(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def _phase_seconds(profiler) -> Dict[str, float]:
+    """Seconds the profiler has recorded so far for each of PHASES (its all-time sums)."""
+    return {phase: profiler.totals[phase][0] / 1e9 if phase in profiler.totals else 0.0 for phase in PHASES}
+
+
+def _report(world, ticks: int, window_ticks: int, window_seconds: float, elapsed: float,
+            timings: Dict[str, float]) -> Dict:
+    report = {
+        "tick": world.time_step,
+        "elapsed": round(elapsed, 3),
+        "ticks_per_sec": round(window_ticks / window_seconds, 3) if window_seconds > 0 else None,
+        "mean_ticks_per_sec": round(ticks / elapsed, 3) if elapsed > 0 else None,
+        "agents": len(world.agents),
+        "animals": len(world.animals),
+        "tribes": len(world.tribes),
+        "generation": world.generation,
+    }
+    if world.profiler.enabled: # --no-profile: nothing was timed
+        report["phases_ms"] = {phase: round(timings.get(phase, 0.0) * 1000 / window_ticks, 3) if window_ticks else 0.0
+                               for phase in PHASES}
+        report["percentiles"] = {phase: {key: round(value, 4) for key, value in stats.items()}
+                                 for phase, stats in world.profiler.summary().items()}
+    return report
+
+
+def _print_report(report: Dict, out):
+    phases = "  ".join(f"{phase} {ms:.2f}" for phase, ms in report.get("phases_ms", {}).items())
+    print(f"tick {report['tick']:>9} | {report['ticks_per_sec'] or 0:>8.1f} ticks/s | "
+          f"agents {report['agents']:>5} | animals {report['animals']:>4}" + (f" | ms/tick: {phases}" if phases else ""),
+          file=out, flush=True)
+    percentiles = sorted(report.get("percentiles", {}).items(), key=lambda item: -item[1]["mean_ms"])
+    for phase, stats in percentiles:
+        print(f"    {phase:<24} mean {stats['mean_ms']:>8.3f}  p50 {stats['p50_ms']:>8.3f}  "
+              f"p95 {stats['p95_ms']:>8.3f}  p99 {stats['p99_ms']:>8.3f} ms", file=out, flush=True)
+
+
+def run(args) -> Dict:
+    out = sys.stdout
+    config = {key: _config_value(value) for key, value in (item.split("=", 1) for item in args.set)}
+    world = World(args.size, args.size, seed=args.seed, config=config or None)
+    world.profiler.enabled = not args.no_profile
+    metrics_file = None
+    if args.out:
+        os.makedirs(os.path.join(args.out, "snapshots"), exist_ok=True)
+        metrics_file = open(os.path.join(args.out, "metrics.jsonl"), "a")
+
+    print(f"World {args.size}x{args.size}, seed {args.seed}, {args.agents} agents, {args.ticks} ticks", file=out, flush=True)
+    window_totals = _phase_seconds(world.profiler)
+    done = window_ticks = 0
+    start = window_start = time.perf_counter()
+    report = None
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            populate(world, args.agents, args.herbivores, args.carnivores)
+            while done < args.ticks:
+                world.step()
+                done += 1
+                window_ticks += 1
+                if args.out and args.snapshot_every and world.time_step % args.snapshot_every == 0:
+                    started = clock()
+                    snapshot = encode_full_state(world, paused=False)
+                    if world.profiler.enabled:
+                        world.profiler.record("serialize", clock() - started)
+                    with open(os.path.join(args.out, "snapshots", f"tick_{world.time_step:09d}.json"), "w") as f:
+                        f.write(snapshot)
+                now = time.perf_counter()
+                extinct = not world.agents
+                if now - window_start >= args.report_every or done == args.ticks or extinct:
+                    totals = _phase_seconds(world.profiler)
+                    timings = {phase: totals[phase] - window_totals[phase] for phase in PHASES}
+                    report = _report(world, done, window_ticks, now - window_start, now - start, timings)
+                    _print_report(report, out)
+                    if metrics_file:
+                        metrics_file.write(json.dumps(report) + "\n")
+                        metrics_file.flush()
+                    window_totals, window_ticks, window_start = totals, 0, now
+                if extinct:
+                    print(f"Population extinct at tick {world.time_step}", file=out, flush=True)
+                    break
+    except KeyboardInterrupt:
+        print(f"Interrupted at tick {world.time_step}", file=out, flush=True)
+    finally:
+        if metrics_file:
+            metrics_file.close()
+    elapsed = time.perf_counter() - start
+    print(f"Ran {done} ticks in {elapsed:.1f}s ({done / elapsed if elapsed > 0 else 0:.1f} ticks/s), "
+          f"{len(world.agents)} agents left", file=out, flush=True)
+    return report or {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.sim", description="Headless Project Adam simulation")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Step a World as fast as possible")
+    run_parser.add_argument("--ticks", type=lambda v: int(float(v)), default=10000, help="Ticks to run (1e6 is fine)")
+    run_parser.add_argument("--agents", type=int, default=10)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--size", type=int, default=200, help="World is size x size")
+    run_parser.add_argument("--herbivores", type=int, default=20)
+    run_parser.add_argument("--carnivores", type=int, default=5)
+    run_parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                            help="World config entry, e.g. think_interval=5 (values parsed as JSON)")
+    run_parser.add_argument("--no-profile", action="store_true", help="Skip the per-phase timings")
+    run_parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between progress reports")
+    run_parser.add_argument("--out", help="Directory for metrics.jsonl and snapshots/")
+    run_parser.add_argument("--snapshot-every", type=int, default=0, help="Write a full-state snapshot every N ticks (needs --out)")
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
-import uuid
-import numpy as np
+import copy
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Optional, Set, Tuple
+from ..env.item import item_category
+from ..env.rng import legacy_stream, random_id
+
+TRACKED_RESOURCES = ("food", "wood", "stone")
 
 @dataclass
 class Tribe:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = None
     name: str = "Unnamed Tribe"
     leader_id: Optional[str] = None
-    members: List[str] = field(default_factory=list)
+    members: Set[str] = field(default_factory=set)
     color: str = "#ffffff"
     goal: str = "wander"
     goal: str = "wander"
@@ -16,24 +19,153 @@ class Tribe:
     resources: Dict[str, int] = field(default_factory=lambda: {"food": 0, "wood": 0, "stone": 0})
     
     def __post_init__(self):
-        # Assign random color
-        if self.color == "#ffffff":
-            self.color = f"#{np.random.randint(0, 0xFFFFFF):06x}"
+        # Id and random color: World.create_tribe passes both from the world's
+        # streams; anything else draws them from np.random's state (see env/rng.py)
+        if self.id is None or self.color == "#ffffff":
+            rng = legacy_stream()
+            if self.id is None:
+                self.id = random_id(rng)
+            if self.color == "#ffffff":
+                self.color = f"#{int(rng.integers(0, 0xFFFFFF)):06x}"
+
+        # Aggregates, kept current as members join/leave/move and as their
+        # opinion of the leader changes (see bind). Not dataclass fields.
+        self._agents = None # world.agents once bound
+        self._tracked = {} # member id -> Agent counted in the sums below
+        self.opinion_sum = 0.0 # Sum of members' opinion of the leader (leader excluded)
+        self.opinion_count = 0
+        self.sum_x = 0
+        self.sum_y = 0
+        self._totals = (None, None) # (time_step, resource totals)
+
+    # --- Aggregates ---
+
+    def bind(self, agents: Dict):
+        """Attaches the tribe to world.agents and builds the aggregates from scratch."""
+        for agent in self._tracked.values():
+            agent.qalb.opinions.unwatch(self)
+        self._agents = agents
+        self.rebuild()
+
+    def rebuild(self):
+        """Recounts everything (after positions or opinions were edited behind the tribe's back)."""
+        for agent in self._tracked.values():
+            agent.qalb.opinions.unwatch(self)
+        self._tracked = {}
+        self.opinion_sum = 0.0
+        self.opinion_count = 0
+        self.sum_x = self.sum_y = 0
+        for agent_id in self.members:
+            self._track(agent_id)
+
+    def _track(self, agent_id: str):
+        agent = self._agents.get(agent_id) if self._agents is not None else None
+        if agent is None or agent_id in self._tracked:
+            return
+        self._tracked[agent_id] = agent
+        self.sum_x += agent.x
+        self.sum_y += agent.y
+        if self.leader_id and agent_id != self.leader_id:
+            self.opinion_sum += agent.qalb.opinions.get(self.leader_id, 0)
+            self.opinion_count += 1
+            agent.qalb.opinions.watch(self.leader_id, self)
+
+    def _untrack(self, agent_id: str):
+        agent = self._tracked.pop(agent_id, None)
+        if agent is None:
+            return
+        self.sum_x -= agent.x
+        self.sum_y -= agent.y
+        if self.leader_id and agent_id != self.leader_id:
+            self.opinion_sum -= agent.qalb.opinions.get(self.leader_id, 0)
+            self.opinion_count -= 1
+            agent.qalb.opinions.unwatch(self)
+
+    def opinion_changed(self, old: float, new: float):
+        """A member's opinion of the leader changed (called by Opinions)."""
+        self.opinion_sum += new - old
+
+    def member_moved(self, agent_id: str, dx: int, dy: int):
+        if agent_id in self._tracked:
+            self.sum_x += dx
+            self.sum_y += dy
+
+    def member_arrived(self, agent_id: str):
+        """A member entered this World from another shard (see env/sharding.py): count it here."""
+        self.members.add(agent_id)
+        self._track(agent_id)
+
+    def member_left(self, agent_id: str):
+        """A member left this World for another shard; it stays a member, but is counted over there."""
+        self._untrack(agent_id)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+    @property
+    def centroid(self) -> Optional[Tuple[float, float]]:
+        if not self._tracked:
+            return None
+        return (self.sum_x / len(self._tracked), self.sum_y / len(self._tracked))
+
+    def resource_totals(self, world) -> Dict[str, int]:
+        """Food/wood/stone carried by members, counted once per tick."""
+        if self._totals[0] != world.time_step:
+            totals = dict.fromkeys(TRACKED_RESOURCES, 0)
+            for agent in self._tracked.values():
+                for entry in agent.inventory:
+                    category = item_category(entry.get('item', {}))
+                    if category in totals:
+                        totals[category] += entry.get('count', 1)
+            self._totals = (world.time_step, totals)
+        return self._totals[1]
+
+    def share(self, world) -> Dict:
+        """
+        This World's part of the aggregates (members standing here and their
+        sums), for ShardedWorld to add up across shards.
+        """
+        return {
+            "name": self.name,
+            "leader_id": self.leader_id,
+            "color": self.color,
+            "goal": self.goal,
+            "resources": dict(self.resources),
+            "members": list(self._tracked),
+            "sum_x": self.sum_x,
+            "sum_y": self.sum_y,
+            "opinion_sum": self.opinion_sum,
+            "opinion_count": self.opinion_count,
+            "holdings": dict(self.resource_totals(world)),
+        }
+
+    def record(self) -> Dict:
+        """The dataclass fields, enough to build a replica on another shard: Tribe(**record)."""
+        return {f.name: copy.deepcopy(getattr(self, f.name)) for f in fields(self)}
+
+    # --- Membership ---
 
     def set_leader(self, agent_id: str):
+        for member_id in list(self._tracked):
+            self._untrack(member_id)
         self.leader_id = agent_id
-        if agent_id not in self.members:
-            self.members.append(agent_id)
+        if agent_id is not None:
+            self.members.add(agent_id)
+        for member_id in self.members:
+            self._track(member_id)
 
     def add_member(self, agent_id: str):
         if agent_id not in self.members:
-            self.members.append(agent_id)
+            self.members.add(agent_id)
+            self._track(agent_id)
 
     def remove_member(self, agent_id: str):
         if agent_id in self.members:
-            self.members.remove(agent_id)
+            self._untrack(agent_id)
+            self.members.discard(agent_id)
         if self.leader_id == agent_id:
-            self.leader_id = None # Anarchy!
+            self.set_leader(None) # Anarchy!
 
     def set_goal(self, goal: str):
         self.goal = goal
@@ -62,33 +194,18 @@ class Tribe:
         
     def calculate_harmony(self, world) -> float:
         """
-        Calculates the average opinion members have of each other and the leader.
-        Returns a score between 0 and 100.
+        Average opinion members have of the leader, as a score between 0 and 100.
+        O(1): reads the running opinion sum.
         """
         if not self.members:
             return 100.0
-            
-        total_score = 0
-        count = 0
-        
-        # Check opinions between all members
-        for member_id in self.members:
-            agent = world.agents.get(member_id)
-            if not agent: continue
-            
-            # Opinion of Leader
-            if self.leader_id and self.leader_id != member_id:
-                op_leader = agent.qalb.opinions.get(self.leader_id, 0)
-                total_score += op_leader
-                count += 1
-            
-            # General cohesion (sample a few peers to save perf)
-            # just checks leader for now to keep it O(N) instead of O(N^2)
-        
-        if count == 0:
+        if self._agents is not world.agents:
+            self.bind(world.agents)
+
+        if self.opinion_count == 0:
             return 50.0 # Neutral
             
-        avg_opinion = total_score / count
+        avg_opinion = self.opinion_sum / self.opinion_count
         # Map opinion (-100 to 100) to Harmony (0 to 100)
         # 0 opinion -> 50 harmony
         harmony = (avg_opinion + 100) / 2
@@ -111,9 +228,12 @@ class Tribe:
             "id": self.id,
             "name": self.name,
             "leader_id": self.leader_id,
-            "member_count": len(self.members),
+            "member_count": self.member_count,
             "color": self.color,
             "goal": self.goal,
             "resources": self.resources,
-            "harmony": harmony
+            "harmony": harmony,
+            "centroid": self.centroid,
+            "holdings": self.resource_totals(world) if world else None
         }
+
@@ -0,0 +1,93 @@
+"""
+Desire scoring benchmark: per-agent Qalb.desires vs the batched desire engine.
+
+Reports how many decision phases per second each path sustains (every acting
+agent scores its desires once per tick), plus full ticks per second with
+--full.
+
+Usage (from backend/):
+    python -m benchmarks.bench_desire
+    python -m benchmarks.bench_desire --agents 100 1000 --full
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World
+from app.agents.agent import Agent
+from app.agents.desire import propose_actions
+from app.agents.perception import perceive
+
+
+def build_world(size, agents, seed, engine):
+    """
+    `agents` spread over all the land (add_agent's spawn circle would pack 10k
+    agents a few per cell), with one perception pass so they have seen each other.
+    """
+    np.random.seed(seed)
+    world = World(size, size, seed=seed, config={"desire_engine": engine})
+    land_y, land_x = np.nonzero(world.terrain_grid != 0)
+    cells = np.random.choice(len(land_x), size=agents, replace=len(land_x) < agents)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, cell in enumerate(cells):
+            agent = Agent(0, 0, gender="male" if i % 2 == 0 else "female")
+            world.add_agent(agent)
+            agent.place(int(land_x[cell]), int(land_y[cell]))
+    world.rebuild_spatial_index()
+    perceive(world, list(world.agents.values()))
+    return world
+
+
+def legacy_phase(world, agents):
+    for agent in agents:
+        desires, _, _ = agent.qalb.desires(world)
+        max(desires, key=desires.get)
+
+
+def batched_phase(world, agents):
+    propose_actions(world, agents)
+
+
+def rate(fn, seconds):
+    """Calls per second of fn(), run for at least `seconds` (and at least twice)."""
+    calls, start = 0, time.perf_counter()
+    while calls < 2 or time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark desire scoring")
+    parser.add_argument("--size", type=int, default=400, help="World is size x size")
+    parser.add_argument("--agents", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=2.0, help="Minimum time per measurement")
+    parser.add_argument("--full", action="store_true", help="Also time whole ticks with each engine")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'agents':>7} | {'phase':<14} | {'legacy (/s)':>11} | {'batched (/s)':>12} | {'speedup':>7}")
+    for n in args.agents:
+        world = build_world(args.size, n, args.seed, "legacy")
+        agents = list(world.agents.values())
+        legacy = rate(lambda: legacy_phase(world, agents), args.seconds)
+        batched = rate(lambda: batched_phase(world, agents), args.seconds)
+        print(f"{n:>7} | {'desires':<14} | {legacy:>11.2f} | {batched:>12.2f} | {batched / legacy:>6.1f}x")
+        if args.full:
+            ticks = {}
+            for engine in ("legacy", "batched"):
+                world = build_world(args.size, n, args.seed, engine)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ticks[engine] = rate(world.step, args.seconds)
+            print(f"{n:>7} | {'full tick':<14} | {ticks['legacy']:>11.2f} | {ticks['batched']:>12.2f} | "
+                  f"{ticks['batched'] / ticks['legacy']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
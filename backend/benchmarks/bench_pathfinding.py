@@ -0,0 +1,119 @@
+"""
+Pathfinding benchmark on the generated map: the old navigate_to BFS (list
+queue, path copies, depth cap 25) vs heap-based A* (World.find_path), plus
+a walk with the per-agent path cache, and the shared food flow field
+(one build, then a lookup per agent) vs one A* search per agent.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pathfinding
+    python -m benchmarks.bench_pathfinding --size 200 --queries 200 --max-dist 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World
+from app.agents.agent import Agent
+
+
+def bfs_legacy(world, sx, sy, tx, ty, max_depth=25):
+    # The old navigate_to search, minus the move
+    queue = [(sx, sy, [])]
+    visited = {(sx, sy)}
+    while queue:
+        cx, cy, path = queue.pop(0)
+        if len(path) > max_depth: continue
+        for nx, ny in [(cx+1, cy), (cx-1, cy), (cx, cy+1), (cx, cy-1)]:
+            if 0 <= nx < world.width and 0 <= ny < world.height and (nx, ny) not in visited:
+                if world.terrain_grid[ny][nx] != 0:
+                    visited.add((nx, ny))
+                    new_path = list(path)
+                    new_path.append((nx, ny))
+                    queue.append((nx, ny, new_path))
+                    if (nx - tx)**2 + (ny - ty)**2 <= 2:
+                        return new_path
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pathfinding")
+    parser.add_argument("--size", type=int, default=200, help="World is size x size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--max-dist", type=int, default=60, help="Max Chebyshev distance between start and goal")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    world = World(args.size, args.size, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    land = np.argwhere(world.terrain_grid != 0)
+    pairs = []
+    while len(pairs) < args.queries:
+        (sy, sx), (ty, tx) = land[rng.choice(len(land), size=2)]
+        if max(abs(int(sx) - int(tx)), abs(int(sy) - int(ty))) <= args.max_dist:
+            pairs.append((int(sx), int(sy), int(tx), int(ty)))
+    print(f"World {args.size}x{args.size}, {args.queries} land-to-land queries within {args.max_dist} tiles")
+
+    start = time.perf_counter()
+    found_bfs = sum(bfs_legacy(world, sx, sy, tx, ty) is not None for sx, sy, tx, ty in pairs)
+    t_bfs = time.perf_counter() - start
+    start = time.perf_counter()
+    found_astar = sum(world.find_path((sx, sy), (tx, ty)) is not None for sx, sy, tx, ty in pairs)
+    t_astar = time.perf_counter() - start
+
+    print(f"{'search':<22} | {'ms/query':>9} | {'found':>6}")
+    print(f"{'BFS (depth 25)':<22} | {t_bfs / len(pairs) * 1000:>9.2f} | {found_bfs:>6}")
+    print(f"{'A*':<22} | {t_astar / len(pairs) * 1000:>9.2f} | {found_astar:>6}")
+
+    # Walking: navigate_to until arrival, counting searches with the path cache
+    searches = [0]
+    find_path = world.find_path
+    def counting_find_path(*a, **kw):
+        searches[0] += 1
+        return find_path(*a, **kw)
+    world.find_path = counting_find_path
+    agent = Agent(0, 0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        world.add_agent(agent)
+    steps = 0
+    start = time.perf_counter()
+    for sx, sy, tx, ty in pairs:
+        world.occupancy.move(agent.id, sx, sy)
+        agent.x, agent.y = sx, sy
+        world.agent_grid.update(agent)
+        agent._path = None
+        for _ in range(4 * args.max_dist):
+            if (agent.x - tx)**2 + (agent.y - ty)**2 <= 2: break
+            agent.navigate_to(tx, ty, world)
+            steps += 1
+    t_walk = time.perf_counter() - start
+    print(f"navigate_to walks: {steps} steps, {searches[0]} A* searches, {t_walk / steps * 1e6:.1f} us/step")
+    world.find_path = find_path
+
+    # Everyone heading for food: one flow field vs an A* search each
+    food = [cell for cell, category in world.resources.categories.items() if category == 'food']
+    start = time.perf_counter()
+    world.flow_fields.clear()
+    world.flow_field('food')
+    t_build = time.perf_counter() - start
+    start = time.perf_counter()
+    for sx, sy, _, _ in pairs:
+        world.flow_step('food', sx, sy)
+    t_lookup = time.perf_counter() - start
+    start = time.perf_counter()
+    for sx, sy, _, _ in pairs:
+        goal = min(food, key=lambda c: (c[0] - sx)**2 + (c[1] - sy)**2)
+        world.find_path((sx, sy), goal)
+    t_each = time.perf_counter() - start
+    print(f"food flow field ({len(food)} goals): build {t_build * 1000:.1f} ms, "
+          f"{t_lookup / len(pairs) * 1e6:.1f} us/lookup; A* to nearest food {t_each / len(pairs) * 1000:.2f} ms/agent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Perception benchmark: per-agent scan_surroundings (legacy engine) vs the
+batched NumPy pass in app.agents.perception.
+
+Usage (from backend/):
+    python -m benchmarks.bench_perception
+    python -m benchmarks.bench_perception --size 500 --agents 50 200 1000 --ticks 5
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World
+from app.agents.agent import Agent
+from app.agents.perception import perceive
+
+
+def build_world(size, agents, seed):
+    np.random.seed(seed)
+    world = World(size, size, seed=seed)
+    world.time_step = 0
+    world.respawn_resources()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(agents):
+            world.add_agent(Agent(0, 0, gender="male" if i % 2 == 0 else "female"))
+    return world
+
+
+def run(world, engine, ticks):
+    agents = list(world.agents.values())
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if engine == "batched":
+            perceive(world, agents)
+        else:
+            for agent in agents:
+                agent.scan_surroundings(world)
+        world.time_step += 1
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the perception pass")
+    parser.add_argument("--size", type=int, default=200, help="World is size x size")
+    parser.add_argument("--agents", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'agents':>7} | {'legacy (ms/tick)':>16} | {'batched (ms/tick)':>17} | {'speedup':>8}")
+    for n in args.agents:
+        # Separate worlds so both engines start from empty memories
+        t_legacy = run(build_world(args.size, n, args.seed), "legacy", args.ticks)
+        t_batched = run(build_world(args.size, n, args.seed), "batched", args.ticks)
+        print(f"{n:>7} | {t_legacy * 1000:>16.1f} | {t_batched * 1000:>17.1f} | {t_legacy / t_batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
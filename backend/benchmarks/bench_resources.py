@@ -0,0 +1,97 @@
+"""
+Resource lookup benchmark: walking World.items_grid (old scan_surroundings)
+vs the typed ResourceIndex.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resources
+    python -m benchmarks.bench_resources --size 500 --agents 200 --radius 40 --nearest 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World
+from app.env.item import item_category
+from app.agents.agent import VISION_RANGE, RESOURCE_CATEGORIES
+
+
+def nearest_food_scan(world, x, y, r, n):
+    found = []
+    for pos, items in world.items_grid.items():
+        dist = np.sqrt((x - pos[0])**2 + (y - pos[1])**2)
+        if dist < r and item_category(items[0]) == 'food':
+            found.append((dist, pos))
+    found.sort()
+    return found[:n]
+
+
+def perception_scan(world, x, y):
+    # The old per-agent item pass: one sqrt and one RNG call per items_grid entry
+    seen = 0
+    for pos, items in world.items_grid.items():
+        dist = np.sqrt((x - pos[0])**2 + (y - pos[1])**2)
+        prob = 1.0
+        if dist > 20: prob = 1.0 / (1.0 + (dist - 20) * 0.05)
+        if np.random.random() < prob:
+            seen += 1
+    return seen
+
+
+def perception_indexed(world, x, y):
+    seen = 0
+    for category in RESOURCE_CATEGORIES:
+        for dist, pos in world.query_resources(x, y, VISION_RANGE, category=category):
+            prob = 1.0
+            if dist > 20: prob = 1.0 / (1.0 + (dist - 20) * 0.05)
+            if np.random.random() < prob:
+                seen += 1
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resource lookups")
+    parser.add_argument("--size", type=int, default=500, help="World is size x size")
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=40.0)
+    parser.add_argument("--nearest", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    world = World(args.size, args.size, seed=args.seed)
+    world.time_step = 0
+    world.respawn_resources()
+    rng = np.random.default_rng(args.seed)
+    land = np.argwhere(world.terrain_grid != 0)
+    probes = land[rng.choice(len(land), size=args.agents)]
+    print(f"World {args.size}x{args.size}: {len(world.items_grid)} item cells, "
+          f"{world.resources.count('food')} food cells, {args.agents} agents")
+
+    rows = []
+    start = time.perf_counter()
+    for y, x in probes: nearest_food_scan(world, x, y, args.radius, args.nearest)
+    t_scan = time.perf_counter() - start
+    start = time.perf_counter()
+    for y, x in probes: world.query_resources(x, y, args.radius, category='food', n=args.nearest)
+    t_index = time.perf_counter() - start
+    rows.append((f"nearest {args.nearest} food within {args.radius:g}", t_scan, t_index))
+
+    start = time.perf_counter()
+    for y, x in probes: perception_scan(world, x, y)
+    t_scan = time.perf_counter() - start
+    start = time.perf_counter()
+    for y, x in probes: perception_indexed(world, x, y)
+    t_index = time.perf_counter() - start
+    rows.append((f"perception item pass (r={VISION_RANGE})", t_scan, t_index))
+
+    print(f"{'query (all agents)':<36} | {'items_grid (s)':>14} | {'index (s)':>10} | {'speedup':>8}")
+    for name, t_scan, t_index in rows:
+        print(f"{name:<36} | {t_scan:>14.3f} | {t_index:>10.3f} | {t_scan / t_index:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
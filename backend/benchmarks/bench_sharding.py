@@ -0,0 +1,88 @@
+"""
+Sharded World scaling benchmark: ticks per second of one plain World vs a
+ShardedWorld with 1/2/4/8 worker processes (see app/env/sharding.py).
+
+Agents are spread over all the land, so every tile gets its share of the
+population. Each worker holds a whole World (terrain included), so building
+the 8-worker setup takes a while; the first --warmup ticks (including the
+step-0 resource/animal respawn) are not timed. Speedups need as many free
+cores as workers: with fewer, the shards just take turns.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sharding
+    python -m benchmarks.bench_sharding --size 2000 --agents 2000 --workers 1 2 4 8 --ticks 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World
+from app.env.sharding import ShardedWorld
+from app.agents.agent import Agent
+
+
+def spread(world, terrain, agents, seed):
+    """Puts `agents` new agents on random land cells of `terrain` via world.adopt_agent."""
+    np.random.seed(seed)
+    land_y, land_x = np.nonzero(terrain != 0)
+    cells = np.random.choice(len(land_x), size=agents, replace=len(land_x) < agents)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, cell in enumerate(cells):
+            agent = Agent(0, 0, gender="male" if i % 2 == 0 else "female")
+            agent.place(int(land_x[cell]), int(land_y[cell]))
+            world.adopt_agent(agent)
+
+
+def rate(tick, ticks, warmup):
+    for _ in range(warmup):
+        tick()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick()
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded World scaling")
+    parser.add_argument("--size", type=int, default=2000, help="World is size x size")
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ticks", type=int, default=20, help="Timed ticks per setup")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--no-local", action="store_true", help="Skip the single in-process World baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.agents} agents on {args.size}x{args.size}, {os.cpu_count()} CPUs")
+    print(f"{'setup':>10} | {'build (s)':>9} | {'ticks/s':>8} | {'speedup':>7}")
+    baseline = None
+    if not args.no_local:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            world = World(args.size, args.size, seed=args.seed)
+        spread(world, world.terrain_grid, args.agents, args.seed)
+        built = time.perf_counter() - start
+        with contextlib.redirect_stdout(io.StringIO()):
+            baseline = rate(world.step, args.ticks, args.warmup)
+        print(f"{'local':>10} | {built:>9.1f} | {baseline:>8.2f} | {1.0:>6.1f}x")
+        del world
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        with ShardedWorld(args.size, args.size, seed=args.seed, workers=workers, quiet=True) as world:
+            spread(world, world.template.terrain_grid, args.agents, args.seed)
+            built = time.perf_counter() - start
+            ticks = rate(world.step, args.ticks, args.warmup)
+        baseline = baseline or ticks
+        print(f"{f'{workers} worker' + ('s' if workers > 1 else ''):>10} | {built:>9.1f} | {ticks:>8.2f} | "
+              f"{ticks / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
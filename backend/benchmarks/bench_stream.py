@@ -0,0 +1,80 @@
+"""
+/ws frame benchmark: encode time and bytes per frame for each stream protocol.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream
+    python -m benchmarks.bench_stream --size 200 --agents 10 100 --frames 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World
+from app.agents.agent import Agent
+from app.env.animals import Animal
+from app.api.stream import BinaryStream, DeltaStream, View, encode_full_state
+
+
+def build_world(size, agents, seed):
+    np.random.seed(seed)
+    world = World(size, size, seed=seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(agents):
+            world.add_agent(Agent(0, 0, gender="male" if i % 2 == 0 else "female"))
+        for _ in range(25):
+            world.add_animal(Animal(x=np.random.randint(0, size), y=np.random.randint(0, size), type='herbivore'))
+    return world
+
+
+def encoders():
+    """name -> (setup, encode(state, world)); state is whatever setup returned."""
+    return {
+        "json full": (lambda: None, lambda state, world: encode_full_state(world, False)),
+        "json delta": (DeltaStream, lambda stream, world: stream.encode(world, False)),
+        "binary": (BinaryStream, lambda stream, world: stream.encode(world, False)),
+        # A client looking at a 50x50 corner, map detail only
+        "delta viewport": (_viewport_stream, lambda stream, world: stream.encode(world, False)),
+    }
+
+
+def _viewport_stream():
+    stream = DeltaStream()
+    stream.set_view(View(viewport=(0, 0, 50, 50), detail="positions"))
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /ws frame encoding")
+    parser.add_argument("--size", type=int, default=200, help="World is size x size")
+    parser.add_argument("--agents", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'agents':>7} | {'protocol':<14} | {'encode (ms/frame)':>17} | {'bytes/frame':>12}")
+    for n in args.agents:
+        world = build_world(args.size, n, args.seed)
+        streams = {name: setup() for name, (setup, _) in encoders().items()}
+        totals = {name: [0.0, 0] for name in streams}
+        for frame in range(args.frames + 1):
+            with contextlib.redirect_stdout(io.StringIO()):
+                world.step()
+            for name, (_, encode) in encoders().items():
+                start = time.perf_counter()
+                data = encode(streams[name], world)
+                elapsed = time.perf_counter() - start
+                if frame > 0: # Frame 0 is the snapshot for delta streams
+                    totals[name][0] += elapsed
+                    totals[name][1] += len(data)
+        for name, (seconds, size) in totals.items():
+            print(f"{n:>7} | {name:<14} | {seconds / args.frames * 1000:>17.2f} | {size // args.frames:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Simulation core benchmark suite: fixed-seed cases for terrain generation,
+whole ticks at 10/100/1000 agents, scan_surroundings, navigate_to,
+get_state + JSON encoding, compute_samsara_observation and SamsaraEnv.step.
+
+Each case builds its input once (untimed), then times `repeat` runs of
+`number` calls each with the garbage collector off, like timeit. Results
+(min/median/mean/stdev per call, plus the commit and machine) go to a JSON
+file, by default benchmarks/results/<commit>.json, so two commits can be
+diffed with --compare. Tick cases advance one world, so every repeat is the
+next tick of the same seeded run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --only tick --repeat 20 --out /tmp/new.json
+    python -m benchmarks.bench_suite --compare benchmarks/results/abc1234.json /tmp/new.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.world import World, populate
+from app.env.terrain import generate_terrain
+from app.api.stream import encode_full_state
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# name -> (setup(seed) returning the function to time, number of calls per repeat, default repeat)
+CASES: Dict[str, Tuple[Callable, int, int]] = {}
+
+
+def case(name: str, number: int = 1, repeat: int = 10):
+    def register(setup):
+        CASES[name] = (setup, number, repeat)
+        return setup
+    return register
+
+
+def build_world(size: int, agents: int, seed: int, warmup: int = 3) -> World:
+    """A seeded size x size world with `agents` agents and the default animals, stepped `warmup` ticks."""
+    world = World(size, size, seed=seed)
+    populate(world, agents)
+    for _ in range(warmup): # Includes the step-0 resource/animal respawn
+        world.step()
+    return world
+
+
+@case("terrain.generate[200]", repeat=5)
+def _terrain_200(seed):
+    return lambda: generate_terrain(200, 200, seed)
+
+
+@case("terrain.generate[1000]", repeat=3)
+def _terrain_1000(seed):
+    return lambda: generate_terrain(1000, 1000, seed)
+
+
+def _tick_case(agents):
+    def setup(seed):
+        world = build_world(200, agents, seed)
+        return world.step
+    return setup
+
+
+case("tick[10]", repeat=50)(_tick_case(10))
+case("tick[100]", repeat=20)(_tick_case(100))
+case("tick[1000]", repeat=5)(_tick_case(1000))
+
+
+@case("agent.scan_surroundings[100]", number=100)
+def _scan(seed):
+    world = build_world(200, 100, seed)
+    agents = iter(())
+
+    def scan():
+        nonlocal agents
+        agent = next(agents, None)
+        if agent is None:
+            agents = iter(list(world.agents.values()))
+            agent = next(agents)
+        agent.scan_surroundings(world)
+    return scan
+
+
+@case("agent.navigate_to[100]", number=100)
+def _navigate(seed):
+    """Cold path caches towards seeded land targets 20-60 cells away (A* whenever the straight step is blocked)."""
+    world = build_world(200, 100, seed)
+    rng = np.random.default_rng(seed)
+    land_y, land_x = np.nonzero(world.terrain_grid != 0)
+    trips = []
+    for agent in world.agents.values():
+        near = np.nonzero((np.abs(land_x - agent.x) + np.abs(land_y - agent.y) >= 20)
+                          & (np.abs(land_x - agent.x) + np.abs(land_y - agent.y) <= 60))[0]
+        if len(near):
+            i = int(rng.choice(near))
+            trips.append((agent, agent.x, agent.y, int(land_x[i]), int(land_y[i])))
+    cursor = iter(())
+
+    def navigate():
+        nonlocal cursor
+        trip = next(cursor, None)
+        if trip is None:
+            cursor = iter(trips)
+            trip = next(cursor)
+        agent, x, y, tx, ty = trip
+        if (agent.x, agent.y) != (x, y):
+            world.move_agent(agent.id, x - agent.x, y - agent.y) # Back to the start
+        agent._path = None
+        agent.navigate_to(tx, ty, world)
+    return navigate
+
+
+@case("state.get_state[100]", repeat=20)
+def _get_state(seed):
+    world = build_world(200, 100, seed)
+    return world.get_state
+
+
+@case("state.encode_full_state[100]", repeat=20)
+def _encode(seed):
+    world = build_world(200, 100, seed)
+    return lambda: encode_full_state(world, False)
+
+
+@case("rl.compute_samsara_observation[100]", number=100)
+def _observation(seed):
+    from app.rl.envs import compute_samsara_observation
+    world = build_world(200, 100, seed)
+    agents = list(world.agents.values())
+    cursor = iter(())
+
+    def observe():
+        nonlocal cursor
+        agent = next(cursor, None)
+        if agent is None:
+            cursor = iter(agents)
+            agent = next(cursor)
+        compute_samsara_observation(agent, world)
+    return observe
+
+
+@case("rl.SamsaraEnv.step", number=200)
+def _env_step(seed):
+    from app.rl.envs import SamsaraEnv
+    np.random.seed(seed) # TestWorld and the scenario draw from np.random
+    env = SamsaraEnv()
+    env.reset(seed=seed)
+    actions = np.random.default_rng(seed)
+
+    def step():
+        _, _, terminated, truncated, _ = env.step(int(actions.integers(0, 7)))
+        if terminated or truncated:
+            env.reset(seed=seed)
+    return step
+
+
+def measure(fn: Callable, number: int, repeat: int) -> List[float]:
+    """Seconds per call for each of `repeat` runs of `number` calls."""
+    times = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return times
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              check=True).stdout.strip() # <hash>-dirty with uncommitted changes
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: List[str], seed: int, repeat: Optional[int]) -> Dict:
+    meta = {
+        "commit": _commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": seed,
+    }
+    results = {}
+    print(f"{'case':<38} | {'min':>10} | {'median':>10} | {'stdev':>9} | runs")
+    for name in names:
+        setup, number, default_repeat = CASES[name]
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull): # Agents log to stdout
+                np.random.seed(seed)
+                fn = setup(seed)
+                times = measure(fn, number, repeat or default_repeat)
+        except ImportError as e: # Optional dependencies (gymnasium for the RL cases)
+            results[name] = {"skipped": str(e)}
+            print(f"{name:<38} | skipped: {e}")
+            continue
+        results[name] = {
+            "min_ms": min(times) * 1000,
+            "median_ms": statistics.median(times) * 1000,
+            "mean_ms": statistics.fmean(times) * 1000,
+            "stdev_ms": statistics.stdev(times) * 1000 if len(times) > 1 else 0.0,
+            "repeat": len(times),
+            "number": number,
+        }
+        r = results[name]
+        print(f"{name:<38} | {_ms(r['min_ms'])} | {_ms(r['median_ms'])} | {_ms(r['stdev_ms'], 9)} | "
+              f"{len(times)}x{number}")
+    return {"meta": meta, "results": results}
+
+
+def _ms(value: float, width: int = 10) -> str:
+    return f"{value:>{width - 3}.3f} ms" if value >= 0.1 else f"{value * 1000:>{width - 3}.1f} us"
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> bool:
+    """Prints the median change per case; returns whether any case got slower by more than `threshold`."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"base {base['meta'].get('commit')} ({base_path}) -> new {new['meta'].get('commit')} ({new_path})")
+    print(f"{'case':<38} | {'base':>10} | {'new':>10} | {'change':>8}")
+    regressed = False
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        old, cur = base["results"].get(name, {}), new["results"].get(name, {})
+        if "median_ms" not in old or "median_ms" not in cur:
+            print(f"{name:<38} | {'-':>10} | {'-':>10} | {'n/a':>8}")
+            continue
+        ratio = cur["median_ms"] / old["median_ms"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressed = "  SLOWER", True
+        elif ratio < 1 / (1 + threshold):
+            flag = "  faster"
+        print(f"{name:<38} | {_ms(old['median_ms'])} | {_ms(cur['median_ms'])} | {ratio - 1:>+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation core")
+    parser.add_argument("--only", nargs="+", help="Run cases whose name contains any of these")
+    parser.add_argument("--repeat", type=int, help="Override every case's repeat count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Diff two results files and exit")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Median slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    names = [name for name in CASES if not args.only or any(part in name for part in args.only)]
+    report = run(names, args.seed, args.repeat)
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
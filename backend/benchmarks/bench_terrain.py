@@ -0,0 +1,49 @@
+"""
+Terrain generation benchmark: batched NumPy generator vs the legacy per-cell loop.
+
+Usage (from backend/):
+    python -m benchmarks.bench_terrain
+    python -m benchmarks.bench_terrain --sizes 200 1000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.env.terrain import generate_terrain, generate_terrain_legacy
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark terrain generation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 4000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-legacy", action="store_true", help="Only time the batched generator")
+    args = parser.parse_args()
+
+    print(f"{'size':>10} | {'batched (s)':>12} | {'legacy (s)':>12} | {'speedup':>8} | {'biome match':>11}")
+    for n in args.sizes:
+        t_new, new = _time(lambda: generate_terrain(n, n, args.seed), args.repeat)
+        if args.no_legacy:
+            print(f"{n:>5}x{n:<4} | {t_new:>12.3f} | {'-':>12} | {'-':>8} | {'-':>11}")
+            continue
+        t_old, old = _time(lambda: generate_terrain_legacy(n, n, args.seed), args.repeat)
+        match = float(np.mean(new["terrain"] == old["terrain"]))
+        print(f"{n:>5}x{n:<4} | {t_new:>12.3f} | {t_old:>12.3f} | {t_old / t_new:>7.1f}x | {match:>10.4%}")
+
+
+if __name__ == "__main__":
+    main()
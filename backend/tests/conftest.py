@@ -0,0 +1,26 @@
+import sys
+import os
+import io
+import contextlib
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World, populate
+
+def quiet():
+    """Swallows what agents print while they spawn, think and talk."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def make_world(size, seed, agents=0, config=None, herbivores=0, carnivores=0):
+    """
+    A seeded size x size World (np.random seeded too, for the tests that still
+    draw from it) with `agents` agents and the given animals, spawned through
+    populate like /init_world and the headless runner do.
+    """
+    np.random.seed(seed)
+    world = World(size, size, seed=seed, config=config)
+    with quiet():
+        populate(world, agents, herbivores=herbivores, carnivores=carnivores)
+    return world
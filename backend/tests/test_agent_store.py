@@ -0,0 +1,122 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import populate
+from app.agents.agent import PERSONALITY_TRAITS
+from app.agents.store import AgentStore
+from conftest import make_world, quiet
+
+def _populate(world, n):
+    """Adds `n` agents to `world` and returns them."""
+    with quiet():
+        populate(world, n, herbivores=0, carnivores=0)
+    return list(world.agents.values())[-n:]
+
+def test_views_read_and_write_store_columns():
+    world = make_world(40, 1, agents=5)
+    agents = list(world.agents.values())
+    store = world.agent_store
+    assert len(store) == 5
+    for agent in agents:
+        assert agent._store is store
+        slot = agent._slot
+        # Defaults came across
+        assert agent.nafs.hunger == 0.0 and agent.nafs.energy == 1.0
+        assert agent.state.health == 1.0 and agent.state.happiness == 0.5
+        assert agent.qalb.social == 1.0 and agent.qalb.fun == 1.0
+        # Writes through the view land in the column and vice versa
+        agent.nafs.hunger = 0.25
+        agent.qalb.fun -= 0.5
+        assert store.hunger[slot] == 0.25 and store.fun[slot] == 0.5
+        store.health[slot] = 0.75
+        assert agent.state.health == 0.75
+        assert isinstance(agent.state.health, float)
+        # Position and personality mirror the agent
+        assert (store.x[slot], store.y[slot]) == (agent.x, agent.y)
+        p = agent.attributes.personality_vector
+        assert list(store.personality[slot]) == [p[t] for t in PERSONALITY_TRAITS]
+
+    # One vectorized op updates every agent
+    slots = store.active_slots()
+    store.energy[slots] -= 0.5
+    assert all(agent.nafs.energy == 0.5 for agent in agents)
+
+    # Moves go through the world and stay mirrored
+    agent = agents[0]
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        if world.move_agent(agent.id, dx, dy):
+            break
+    assert (store.x[agent._slot], store.y[agent._slot]) == (agent.x, agent.y)
+
+def test_indexes_agree_after_moves():
+    world = make_world(40, 4, agents=6)
+    agents = list(world.agents.values())
+    moved = 0
+    for step in range(50):
+        agent = agents[step % len(agents)]
+        dx, dy = ((1, 0), (0, 1), (-1, 0), (0, -1))[step % 4]
+        moved += world.move_agent(agent.id, dx, dy)
+    assert moved
+    world.agent_store.validate(world.agents)
+    world.occupancy.validate(world.agents)
+    world.agent_grid.validate(world.agents.values())
+
+    # Staging a position directly: place() keeps the store, then the world re-syncs its indexes
+    land_y, land_x = np.nonzero(world.terrain_grid != 0)
+    agents[0].place(int(land_x[0]), int(land_y[0]))
+    world.rebuild_spatial_index()
+    world.agent_store.validate(world.agents)
+    world.occupancy.validate(world.agents)
+    world.agent_grid.validate(world.agents.values())
+    assert world.occupancy.get(agents[0].x, agents[0].y) is not None
+
+def test_attach_detach_and_growth_keep_values():
+    world = make_world(60, 2)
+    world.agent_store = AgentStore(capacity=2) # Force a few capacity doublings
+    agents = _populate(world, 9)
+    assert world.agent_store.capacity >= 9
+    for i, agent in enumerate(agents):
+        agent.nafs.hunger = i / 10
+    assert [agent.nafs.hunger for agent in agents] == [i / 10 for i in range(9)]
+
+    dead = agents[3]
+    dead_slot = dead._slot
+    dead.state.health = 0.1
+    world.remove_agent(dead.id)
+    assert dead._store is not world.agent_store
+    assert dead.nafs.hunger == 0.3 and dead.state.health == 0.1
+    assert len(world.agent_store) == 8
+
+    # The freed slot is reused with fresh defaults
+    newcomer = _populate(world, 1)[0]
+    assert newcomer._slot == dead_slot
+    assert newcomer.nafs.hunger == 0.0 and newcomer.state.health == 1.0
+    assert world.agent_store.owners[newcomer._slot] is newcomer
+
+    # Serialization still carries the store-backed fields
+    data = agents[5].to_dict(world)
+    assert data["nafs"]["hunger"] == 0.5 and data["state"]["health"] == 1.0
+    assert "agent" not in data["state"] and "social" in data["qalb"]
+
+def test_child_personality_row_matches_genes():
+    world = make_world(60, 3, agents=2)
+    p1, p2 = world.agents.values()
+    with quiet():
+        world.spawn_child(p1, p2)
+    children = [a for a in world.agents.values() if a.attributes.parents]
+    assert children
+    child = children[0]
+    assert child._store is world.agent_store
+    p = child.attributes.personality_vector
+    assert list(world.agent_store.personality[child._slot]) == [p[t] for t in PERSONALITY_TRAITS]
+
+if __name__ == "__main__":
+    test_views_read_and_write_store_columns()
+    test_indexes_agree_after_moves()
+    test_attach_detach_and_growth_keep_values()
+    test_child_personality_row_matches_genes()
+    print("Agent store tests passed.")
@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.api.stream import BinaryStream, decode_binary_frame, encode_full_state, FLAG_TERRAIN, FLAG_ITEMS, BINARY_HEADER
+from conftest import make_world, quiet
+
+def _world():
+    return make_world(50, 5, agents=5, herbivores=1, carnivores=1)
+
+def test_binary_frame_round_trip():
+    world = _world()
+    stream = BinaryStream()
+    with quiet():
+        for step in range(8):
+            world.step()
+            if step == 3:
+                world.set_terrain(7, 7, 0)
+            data = stream.encode(world, False)
+            frame = decode_binary_frame(data)
+            expected = json.loads(encode_full_state(world, False))
+
+            for key in ("time_step", "generation", "width", "height", "is_day", "logs", "harmony"):
+                assert frame[key] == expected[key], key
+            agents = {a["id"]: a for a in expected["agents"]}
+            assert len(frame["agents"]) == len(agents)
+            for agent in frame["agents"]:
+                want = agents[agent["id"]]
+                assert (agent["x"], agent["y"]) == (want["x"], want["y"])
+                assert agent["needs"] == {k: (None if v is None else float(np.float32(v))) for k, v in want["needs"].items()}
+                assert agent["attributes"] == want["attributes"]
+            assert sorted((a["id"], a["x"], a["y"], a["type"]) for a in frame["animals"]) == \
+                sorted((a["id"], a["x"], a["y"], a["type"]) for a in expected["animals"])
+            if "terrain" in frame:
+                assert frame["terrain"] == expected["terrain"]
+            if "items" in frame:
+                assert sorted((i["x"], i["y"], i["name"]) for i in frame["items"]) == \
+                    sorted((i["x"], i["y"], i["name"]) for i in expected["items"])
+
+    # Terrain only goes out again after an edit, and again after a resync
+    flags = lambda data: BINARY_HEADER.unpack_from(data, 0)[1]
+    assert not flags(stream.encode(world, False)) & FLAG_TERRAIN
+    world.set_terrain(8, 8, 0)
+    assert flags(stream.encode(world, False)) & FLAG_TERRAIN
+    stream.resync()
+    assert flags(stream.encode(world, False)) & (FLAG_TERRAIN | FLAG_ITEMS) == FLAG_TERRAIN | FLAG_ITEMS
+
+def test_non_finite_needs_become_nan():
+    world = _world()
+    agent = next(iter(world.agents.values()))
+    agent.nafs.hunger = float('inf')
+    agent.qalb.fun = float('nan')
+    frame = decode_binary_frame(BinaryStream().encode(world, True))
+    assert frame["paused"]
+    needs = next(a for a in frame["agents"] if a["id"] == agent.id)["needs"]
+    assert needs["hunger"] is None and needs["fun"] is None
+    assert needs["energy"] is not None
+
+if __name__ == "__main__":
+    test_binary_frame_round_trip()
+    test_non_finite_needs_become_nan()
+    print("All binary frame tests passed")
@@ -0,0 +1,78 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.agents.biology import BATCH_BIOLOGY_THRESHOLD
+from conftest import make_world, quiet
+
+VITALS = ("hunger", "energy", "pain", "lust", "health", "happiness", "social", "fun")
+
+def _world(n, seed, config=None):
+    """A world whose agents have vitals spread over every branch of the Nafs/Qalb rules."""
+    world = make_world(80, seed, agents=n, config=config)
+    rng = np.random.default_rng(seed)
+    for agent in world.agents.values():
+        agent.nafs.hunger = rng.choice([rng.uniform(0, 0.3), rng.uniform(0.3, 1.0), 0.999, 1.0])
+        agent.nafs.energy = rng.uniform(0.3, 1.0)
+        agent.nafs.lust = rng.uniform(0, 1)
+        agent.state.health = rng.choice([rng.uniform(0.5, 0.8), rng.uniform(0.8, 1.0), 0.999])
+        agent.state.happiness = rng.choice([0.1, 0.2, 0.3, 0.5, 0.7, 0.75, 0.8, 0.9])
+        agent.qalb.social = rng.uniform(0, 0.5)
+        agent.qalb.fun = rng.uniform(0, 1)
+    return world
+
+def _snapshot(world):
+    agents = list(world.agents.values())
+    vitals = {column: np.array([getattr(world.agent_store, column)[a._slot] for a in agents]) for column in VITALS}
+    return vitals, [a.qalb.emotional_state for a in agents], [list(a.diary) for a in agents]
+
+def test_batched_biology_matches_per_agent_updates():
+    legacy, batched = _world(150, 7), _world(150, 7)
+    np.random.seed(99)
+    for step in range(60):
+        for agent in legacy.agents.values():
+            agent.nafs.update(legacy)
+            agent.qalb.update(legacy)
+    np.random.seed(99)
+    for step in range(60):
+        batched.update_biology(list(batched.agents.values()))
+
+    (v1, moods1, diaries1), (v2, moods2, diaries2) = _snapshot(legacy), _snapshot(batched)
+    for column in VITALS:
+        assert np.array_equal(v1[column], v2[column]), column # Bit-identical, not just close
+    assert moods1 == moods2
+    assert diaries1 == diaries2
+    assert any(diaries1) # Starvation rolls were exercised
+
+def test_auto_engine_batches_above_threshold_only():
+    small = _world(BATCH_BIOLOGY_THRESHOLD - 1, 3)
+    small.begin_tick()
+    assert all(a.biology_step == -1 for a in small.agents.values())
+
+    large = _world(BATCH_BIOLOGY_THRESHOLD, 3)
+    large.begin_tick()
+    assert all(a.biology_step == large.time_step for a in large.agents.values())
+
+    legacy = _world(BATCH_BIOLOGY_THRESHOLD, 3, config={"biology_engine": "legacy"})
+    legacy.begin_tick()
+    assert all(a.biology_step == -1 for a in legacy.agents.values())
+
+def test_act_does_not_repeat_batched_update():
+    world = _world(5, 11, config={"biology_engine": "batched", "hunger_rate": 0.002})
+    agent = next(iter(world.agents.values()))
+    agent.nafs.hunger = 0.5
+    agent.inventory = []
+    world.begin_tick()
+    assert agent.nafs.hunger == 0.502
+    agent.nafs.update = lambda w: (_ for _ in ()).throw(AssertionError("Nafs.update ran twice"))
+    with quiet():
+        agent.act(world.time_step, world)
+
+if __name__ == "__main__":
+    test_batched_biology_matches_per_agent_updates()
+    test_auto_engine_batches_above_threshold_only()
+    test_act_does_not_repeat_batched_update()
+    print("Biology tests passed.")
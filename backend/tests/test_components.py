@@ -0,0 +1,99 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.env.item import Item, item_category
+from app.env.pathfinding import label_components
+from app.agents.agent import Agent
+
+def _flood_labels(walkable):
+    """Reference 8-connected flood fill."""
+    h, w = walkable.shape
+    labels = np.zeros((h, w), dtype=int)
+    count = 0
+    for y in range(h):
+        for x in range(w):
+            if walkable[y, x] and not labels[y, x]:
+                count += 1
+                labels[y, x] = count
+                stack = [(x, y)]
+                while stack:
+                    cx, cy = stack.pop()
+                    for dy in (-1, 0, 1):
+                        for dx in (-1, 0, 1):
+                            nx, ny = cx + dx, cy + dy
+                            if 0 <= nx < w and 0 <= ny < h and walkable[ny, nx] and not labels[ny, nx]:
+                                labels[ny, nx] = count
+                                stack.append((nx, ny))
+    return labels, count
+
+def _same_partition(a, b):
+    land = b > 0
+    return ((a > 0) == land).all() and len(set(zip(a[land].tolist(), b[land].tolist()))) == len(np.unique(b[land]))
+
+def test_labels_match_flood_fill():
+    rng = np.random.default_rng(0)
+    for p in (0.3, 0.5, 0.7):
+        walkable = rng.random((50, 60)) < p
+        labels, count = label_components(walkable)
+        expected, expected_count = _flood_labels(walkable)
+        assert count == expected_count
+        assert _same_partition(labels, expected)
+
+    world = World(120, 120, seed=4)
+    expected, _ = _flood_labels(world.terrain_grid != 0)
+    assert _same_partition(world.components, expected)
+
+def test_component_updates_and_reachability():
+    world = World(30, 30, seed=1)
+    world.terrain_grid[:, :] = 2
+    world.terrain_grid[0, :] = world.terrain_grid[-1, :] = world.terrain_grid[:, 0] = world.terrain_grid[:, -1] = 0
+    world.terrain_grid[:, 15] = 0 # Two islands
+    world.components, world.component_count = label_components(world.terrain_grid != 0)
+    assert not world.reachable(5, 5, 25, 5)
+    assert world.reachable(5, 5, 14, 28)
+    assert world.reachable(5, 5, 15, 5) # Water cell on our shore
+    assert not world.reachable(25, 5, 13, 5) # Two tiles past the channel
+
+    # A land bridge merges the islands, flooding it splits them again
+    world.set_terrain(15, 10, 2)
+    assert world.reachable(5, 5, 25, 5)
+    world.set_terrain(15, 10, 0)
+    assert not world.reachable(5, 5, 25, 5)
+    # Forest -> Grass leaves the labels alone
+    labels = world.components.copy()
+    world.set_terrain(5, 5, 3)
+    assert (world.components == labels).all()
+
+def test_find_resource_skips_unreachable_food():
+    np.random.seed(0)
+    world = World(30, 30, seed=1)
+    world.terrain_grid[:, :] = 2
+    world.terrain_grid[:, 15] = 0
+    world.components, world.component_count = label_components(world.terrain_grid != 0)
+    world.items_grid = {}
+    world.resources.rebuild(world.items_grid, item_category)
+    agent = Agent(0, 0, name="Forager")
+    world.add_agent(agent)
+    agent.place(13, 5)
+    world.rebuild_spatial_index()
+    # Nearest known food is across the channel; the reachable one is further
+    agent.spatial_memory['food'] = [(17, 5), (5, 5)]
+    for pos in [(17, 5), (5, 5)]:
+        world._add_item(*pos, Item(f"apple_{pos}", "Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable"]))
+    plan = {'action': 'find_resource', 'resource': 'food'}
+    for _ in range(20):
+        agent.execute_action(plan, world)
+        if agent.x <= 6: break
+    assert agent.x < 13 # Walked away from the unreachable fruit
+    assert (17, 5) in agent.spatial_memory['food'] # ...but still remembers it
+
+if __name__ == "__main__":
+    test_labels_match_flood_fill()
+    test_component_updates_and_reachability()
+    test_find_resource_skips_unreachable_food()
+    print("All component tests passed")
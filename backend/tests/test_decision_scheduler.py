@@ -0,0 +1,105 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.animals import Animal
+from app.agents.biology import BATCH_BIOLOGY_THRESHOLD
+from conftest import make_world, quiet
+
+def _run(world, ticks):
+    with quiet():
+        for _ in range(ticks):
+            world.step()
+
+def _world(n, think_interval, seed=5):
+    return make_world(80, seed, agents=n, config={"think_interval": think_interval})
+
+def test_interval_one_thinks_every_step():
+    world = _world(10, 1)
+    _run(world, 30)
+    metrics = world.decision_metrics(per_agent=True)
+    assert metrics["carried"] == 0 and metrics["thinks"] > 0
+    assert all(counts["carried"] == 0 for counts in metrics["agents"].values())
+
+def test_longer_interval_carries_plans_forward():
+    world = _world(30, 8)
+    _run(world, 80)
+    metrics = world.decision_metrics(per_agent=True)
+    assert metrics["carried"] > metrics["thinks"] * 0.5
+    for agent in world.agents.values():
+        counts = metrics["agents"][agent.id]
+        assert counts == {"thinks": agent.think_count, "carried": agent.carry_count, "low_detail": 0}
+        # Never more than think_interval - 1 carried steps in a row
+        assert agent.think_count >= (agent.think_count + agent.carry_count) // 8
+
+def test_salient_events_force_a_think():
+    world = _world(2, 50)
+    agent, other = world.agents.values()
+    agent.nafs.hunger = 0.1
+
+    def decided(plan):
+        agent.plan, agent.plan_step, agent.plan_done, agent.plan_hunger = plan, world.time_step, False, agent.nafs.hunger
+        world.time_step += 1
+
+    decided({'action': 'find_resource', 'resource': 'food'})
+    assert not agent.should_think(world)
+
+    # Memoized for the step, then re-evaluated
+    agent.nafs.hunger = 0.45 # Crossed 0.4
+    assert not agent.should_think(world)
+    world.time_step += 1
+    assert agent.should_think(world)
+
+    decided({'action': 'find_resource', 'resource': 'food'})
+    agent.plan_done = True # Gathered
+    assert agent.should_think(world)
+
+    decided({'action': 'wander'})
+    assert not agent.should_think(world)
+    world.time_step += 49 # Interval elapsed
+    assert agent.should_think(world)
+
+    decided({'action': 'socialize'}) # Not carried
+    assert agent.should_think(world)
+
+    # A predator shows up; once fleeing, it going away is the event
+    decided({'action': 'wander'})
+    wolf = Animal(x=agent.x + 3, y=agent.y, type='carnivore')
+    world.add_animal(wolf)
+    assert agent.should_think(world)
+    decided({'action': 'flee', 'target': wolf})
+    assert not agent.should_think(world)
+    world.remove_animal(wolf)
+    world.time_step += 1
+    assert agent.should_think(world) # Threat gone / target vanished
+
+    # Chasing someone who left the world
+    decided({'action': 'flee', 'target': other})
+    world.add_animal(wolf)
+    assert not agent.should_think(world)
+    world.remove_agent(other.id)
+    world.time_step += 1
+    assert agent.should_think(world)
+
+def test_hunger_crossed_during_act_forces_a_think():
+    """Legacy biology: hunger rises in act(), after begin_tick, and the crossing still re-plans that step."""
+    world = _world(2, 50)
+    assert len(world.agents) < BATCH_BIOLOGY_THRESHOLD # "auto" biology stays in act()
+    world.time_step = 1 # Past the step-0 animal respawn
+    agent = next(iter(world.agents.values()))
+    agent.inventory = []
+    agent.nafs.hunger = agent.plan_hunger = 0.3995
+    agent.plan, agent.plan_step, agent.plan_done = {'action': 'wander'}, world.time_step, False
+    thinks = agent.think_count
+    _run(world, 1)
+    assert agent.nafs.hunger >= 0.4 # Crossed 0.4 inside act()
+    assert agent.think_count == thinks + 1
+
+if __name__ == "__main__":
+    test_interval_one_thinks_every_step()
+    test_longer_interval_carries_plans_forward()
+    test_salient_events_force_a_think()
+    test_hunger_crossed_during_act_forces_a_think()
+    print("Decision scheduler tests passed.")
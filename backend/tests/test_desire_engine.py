@@ -0,0 +1,89 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.agents import desire
+from app.agents.desire import DESIRES, desire_matrix, propose_actions
+from conftest import make_world, quiet
+
+LEGACY = {"perception_engine": "batched", "biology_engine": "legacy", "desire_engine": "legacy"}
+
+def _stack(name, count):
+    return {'item': {'name': name, 'properties': []}, 'count': count}
+
+def _world(n, seed):
+    """Agents in every situation the desire rules distinguish: tribes with goals and wars, rivals, friends, packs."""
+    rng = np.random.default_rng(seed)
+    world = make_world(100, seed, agents=n, config=dict(LEGACY))
+    agents = list(world.agents.values())
+    with quiet():
+        tribes = [world.create_tribe(f"T{i}", agents[i].id) for i in range(4)]
+    for tribe, goal in zip(tribes, ("gather_food", "gather_wood", "build_home", "gather_stone")):
+        tribe.goal = goal
+    tribes[0].enemies.append(tribes[1].id)
+    for agent in agents:
+        agent.nafs.hunger = rng.uniform(0, 1)
+        agent.nafs.lust = rng.uniform(0, 0.6)
+        agent.qalb.social = rng.uniform(0, 1)
+        agent.qalb.fun = rng.uniform(0, 1)
+        agent.state.health = rng.uniform(0.3, 1)
+        if rng.random() < 0.5:
+            world.join_tribe(agent.id, tribes[rng.integers(0, 4)].id)
+        agent.inventory = [_stack(name, int(rng.integers(1, 12))) for name in ("Stone", "Stone Block", "Wood", "Fruit")
+                           if rng.random() < 0.4]
+        for other in rng.choice(agents, size=int(rng.integers(0, 8)), replace=False):
+            if other is not agent:
+                agent.qalb.opinions[other.id] = float(rng.choice([-80, -20, 0, 30, 60]))
+        if rng.random() < 0.1:
+            agent.state.social_lock_target, agent.state.social_lock_steps = agents[0].id, 3
+    return world
+
+def test_desire_matrix_matches_per_agent_desires():
+    for seed in (1, 2, 3):
+        world = _world(120, seed)
+        world.begin_tick() # Fills visible_agents_state
+        agents = [a for a in world.agents.values()]
+        m, unknown_nearby, rivals = desire_matrix(world, agents)
+        # Crowds count neighbors from prefix sums instead of a distance matrix
+        dense_pairs, desire.DENSE_PAIRS = desire.DENSE_PAIRS, 0
+        try:
+            m_grid, unknown_grid, _ = desire_matrix(world, agents)
+        finally:
+            desire.DENSE_PAIRS = dense_pairs
+        assert np.array_equal(m, m_grid) and np.array_equal(unknown_nearby, unknown_grid)
+        fired = set()
+        for row, agent in enumerate(agents):
+            desires, stranger, rival = agent.qalb.desires(world)
+            assert tuple(desires) == DESIRES
+            assert list(m[row]) == list(desires.values()), (seed, agent.id)
+            assert bool(unknown_nearby[row]) == stranger
+            assert rivals[row] is rival
+            fired.add(max(desires, key=desires.get))
+        assert len(fired) >= 5 # The fixture exercises several winners
+
+def test_batched_plans_match_per_agent_plans():
+    world = _world(120, 4)
+    world.begin_tick()
+    agents = list(world.agents.values())
+    with quiet():
+        expected = [agent.qalb.propose_action(world) for agent in agents]
+        propose_actions(world, agents)
+        assert all(agent.qalb.batched_desire[0] == world.time_step for agent in agents)
+        batched = [agent.qalb.propose_action(world) for agent in agents]
+    assert batched == expected
+
+def test_auto_engine_scores_in_begin_tick():
+    world = _world(80, 5)
+    world.desire_engine = "auto"
+    world.begin_tick()
+    assert all(a.qalb.batched_desire and a.qalb.batched_desire[0] == world.time_step
+               for a in world.agents.values() if a.state.busy_until <= world.time_step)
+
+if __name__ == "__main__":
+    test_desire_matrix_matches_per_agent_desires()
+    test_batched_plans_match_per_agent_plans()
+    test_auto_engine_scores_in_begin_tick()
+    print("Desire engine tests passed.")
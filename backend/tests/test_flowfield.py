@@ -0,0 +1,94 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World, FLOW_REFRESH_STEPS
+from app.env.item import Item, item_category
+from app.env.pathfinding import label_components
+from app.env.flowfield import distance_field, UNREACHABLE
+from app.agents.agent import Agent
+
+def _fruit(i):
+    return Item(f"apple_{i}", "Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable"])
+
+def _lake_world():
+    """40x40 grass world, water wall at x=20 with a gap at y=35, one fruit at (25, 5)."""
+    world = World(40, 40, seed=1)
+    world.terrain_grid[:, :] = 2
+    world.terrain_grid[:, 20] = 0
+    world.terrain_grid[35, 20] = 2
+    world.components, world.component_count = label_components(world.terrain_grid != 0)
+    world.items_grid = {}
+    world.resources.rebuild(world.items_grid, item_category)
+    world._add_item(25, 5, _fruit(0))
+    return world
+
+def test_distance_field_matches_astar():
+    world = _lake_world()
+    dist = distance_field(world.terrain_grid != 0, [25], [5])
+    assert dist[5, 25] == 0
+    assert dist[0, 20] == UNREACHABLE # Water
+    for x, y in [(19, 5), (10, 30), (30, 38), (21, 35)]:
+        path = world.find_path((x, y), (25, 5))
+        # find_path stops next to the goal, the field counts the last step too
+        assert dist[y, x] == len(path) + 1, f"({x}, {y}): field {dist[y, x]}, A* {len(path) + 1}"
+
+def test_flow_field_is_shared_and_invalidated():
+    world = _lake_world()
+    field = world.flow_field('food')
+    assert world.flow_field('food') is field
+    assert world.flow_distance('food', 25, 5) == 0
+
+    # Descending the field from across the lake reaches the fruit
+    x, y = 19, 5
+    for _ in range(200):
+        step = world.flow_step('food', x, y)
+        if step is None: break
+        assert world.flow_distance('food', x + step[0], y + step[1]) == world.flow_distance('food', x, y) - 1
+        x, y = x + step[0], y + step[1]
+    assert (x, y) == (25, 5)
+
+    # Forest -> Grass keeps the field; closing the gap rebuilds it right away
+    world.set_terrain(10, 10, 3)
+    assert world.flow_field('food') is field
+    world.set_terrain(20, 35, 0)
+    assert world.flow_field('food') is not field
+    assert world.flow_distance('food', 19, 5) is None
+
+    # Moved goals are picked up after FLOW_REFRESH_STEPS
+    field = world.flow_field('food')
+    world._add_item(5, 5, _fruit(1))
+    assert world.flow_field('food') is field
+    world.time_step += FLOW_REFRESH_STEPS
+    assert world.flow_distance('food', 5, 5) == 0
+
+    # Leader fields follow the leader and vanish with them
+    leader = Agent(0, 0, name="Leader")
+    world.add_agent(leader)
+    assert world.flow_distance(f"leader:{leader.id}", leader.x, leader.y) == 0
+    world.remove_agent(leader.id)
+    assert world.flow_field(f"leader:{leader.id}") is None
+
+def test_navigate_to_follows_flow_field():
+    np.random.seed(0)
+    world = _lake_world()
+    agent = Agent(0, 0, name="Forager")
+    world.add_agent(agent)
+    agent.place(19, 5)
+    world.rebuild_spatial_index()
+    searches = []
+    world.find_path = lambda *a, **kw: searches.append(a)
+    for _ in range(100):
+        if (agent.x, agent.y) == (25, 5): break
+        agent.navigate_to(25, 5, world, flow='food')
+    assert (agent.x, agent.y) == (25, 5)
+    assert not searches
+
+if __name__ == "__main__":
+    test_distance_field_matches_astar()
+    test_flow_field_is_shared_and_invalidated()
+    test_navigate_to_follows_flow_field()
+    print("All flow field tests passed")
@@ -0,0 +1,57 @@
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.api.stream import InspectorCache, View, encode_full_state
+from conftest import make_world
+
+def _world():
+    return make_world(40, 2, agents=4)
+
+def test_frames_carry_summaries_only():
+    world = _world()
+    state = json.loads(encode_full_state(world, False))
+    for agent in state["agents"]:
+        assert set(agent) == {"id", "x", "y", "attributes", "state", "needs", "generation"}
+        assert "diary" not in agent and "brain" not in agent
+    full = json.loads(encode_full_state(world, False, View(detail="full")))
+    assert len(json.dumps(state["agents"])) * 5 < len(json.dumps(full["agents"]))
+
+def test_inspector_is_cached_per_tick():
+    world = _world()
+    agent = next(iter(world.agents.values()))
+    calls = []
+    to_dict = agent.to_dict
+    agent.to_dict = lambda w=None: calls.append(1) or to_dict(w)
+
+    cache = InspectorCache()
+    first = cache.get(world, agent.id)
+    assert "diary" in first and "brain" in first
+    assert cache.get(world, agent.id) is first
+    assert len(calls) == 1
+    world.time_step += 1
+    assert cache.get(world, agent.id) is not first
+    assert len(calls) == 2
+    assert cache.get(world, "nobody") is None
+
+    # Cached entries are copies: later changes don't leak into an old tick's record
+    agent.diary.append("Something new happened")
+    assert "Something new happened" not in first["diary"]
+
+def test_world_harmony():
+    world = _world()
+    assert world.harmony() == 50.0
+    a, b = list(world.agents.values())[:2]
+    a.qalb.opinions[b.id] = 40
+    b.qalb.opinions[a.id] = -20
+    world.time_step += 1
+    assert world.harmony() == ((40 - 20) / 2 + 100) / 2
+
+if __name__ == "__main__":
+    test_frames_carry_summaries_only()
+    test_inspector_is_cached_per_tick()
+    test_world_harmony()
+    print("All inspector tests passed")
@@ -0,0 +1,73 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import LOD_REGION, LOD_FULL, LOD_LOW
+from app.agents.agent import Agent
+from app.env.animals import Animal
+from conftest import make_world, quiet
+
+def _run(world, ticks):
+    with quiet():
+        for _ in range(ticks):
+            world.step()
+
+def _place(world, agent, x, y):
+    """Puts `agent` on the nearest land cell to (x, y)."""
+    land_y, land_x = np.nonzero(world.terrain_grid != 0)
+    i = int(np.argmin((land_x - x) ** 2 + (land_y - y) ** 2))
+    world.add_agent(agent)
+    agent.place(int(land_x[i]), int(land_y[i]))
+    world.rebuild_spatial_index()
+    return agent
+
+def _world(lod_interval, **config):
+    world = make_world(256, 8, config={"lod_interval": lod_interval, **config})
+    with quiet():
+        loner = _place(world, Agent(0, 0, gender="male"), 20, 20)
+        pair = [_place(world, Agent(0, 0, gender=g), 200, 200) for g in ("male", "female")]
+    return world, loner, pair
+
+def test_lod_map_marks_company_threats_and_viewports():
+    world, loner, pair = _world(4)
+    world.update_lod()
+    region = lambda agent: world.lod_map[agent.y // LOD_REGION, agent.x // LOD_REGION]
+    assert region(loner) == LOD_LOW
+    assert all(region(agent) == LOD_FULL for agent in pair)
+
+    world.viewports = [(loner.x - 5, loner.y - 5, loner.x + 5, loner.y + 5)]
+    world.update_lod()
+    assert region(loner) == LOD_FULL
+
+    world.viewports = []
+    world.add_animal(Animal(x=loner.x + 40, y=loner.y, type='carnivore')) # In a neighboring region
+    world.update_lod()
+    assert region(loner) == LOD_FULL
+
+    metrics = world.lod_metrics()
+    assert metrics["regions_low"] + metrics["regions_full"] == len(metrics["map"]) * len(metrics["map"][0])
+
+def test_lone_agents_take_cheap_steps_with_periodic_full_steps():
+    world, loner, pair = _world(4)
+    _run(world, 40)
+    assert loner.lod_count > 0
+    # One full step in every lod_interval (thinks happen only on full steps)
+    assert loner.think_count >= 40 // 4 - 1
+    assert loner.lod_count + loner.think_count + loner.carry_count == loner.state.age_steps
+    assert all(agent.lod_count == 0 for agent in pair)
+    assert world.decision_metrics()["low_detail"] == loner.lod_count
+
+def test_force_full_detail_disables_lod():
+    world, loner, _ = _world(4, force_full_detail=True)
+    _run(world, 20)
+    assert world.lod_map is None
+    assert sum(agent.lod_count for agent in world.agents.values()) == 0
+
+if __name__ == "__main__":
+    test_lod_map_marks_company_threats_and_viewports()
+    test_lone_agents_take_cheap_steps_with_periodic_full_steps()
+    test_force_full_detail_disables_lod()
+    print("LOD tests passed.")
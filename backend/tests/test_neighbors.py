@@ -0,0 +1,45 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.animals import Animal
+from conftest import make_world
+
+def brute_force(world, x, y, r, entities, exclude_id=None):
+    return sorted(e.id for e in entities if e.id != exclude_id and np.sqrt((e.x - x)**2 + (e.y - y)**2) < r)
+
+def test_query_radius_matches_full_scan():
+    world = make_world(120, 4, agents=40)
+    for i in range(30):
+        world.add_animal(Animal(x=np.random.randint(1, 119), y=np.random.randint(1, 119), type='herbivore' if i % 3 else 'carnivore'))
+
+    for _ in range(30):
+        for agent in list(world.agents.values()):
+            world.move_agent(agent.id, np.random.randint(-1, 2), np.random.randint(-1, 2))
+        for animal in world.animals:
+            world.move_animal(animal.id, np.random.randint(-1, 2), np.random.randint(-1, 2))
+
+    world.agent_grid.validate(world.agents.values())
+    world.animal_grid.validate(world.animals)
+
+    probe = next(iter(world.agents.values()))
+    for r in [1.5, 5.0, 15, 40, 200]:
+        got = world.query_radius(probe.x, probe.y, r, kind='agent', exclude_id=probe.id)
+        assert sorted(a.id for _, a in got) == brute_force(world, probe.x, probe.y, r, world.agents.values(), probe.id)
+        assert [d for d, _ in got] == sorted(d for d, _ in got) # Nearest first
+
+        got = world.query_radius(probe.x, probe.y, r, kind='animal')
+        assert sorted(a.id for _, a in got) == brute_force(world, probe.x, probe.y, r, world.animals)
+
+    # Removal
+    world.remove_agent(probe.id)
+    world.remove_animal(world.animals[0])
+    world.agent_grid.validate(world.agents.values())
+    world.animal_grid.validate(world.animals)
+
+if __name__ == "__main__":
+    test_query_radius_matches_full_scan()
+    print("PASS: Neighbor queries")
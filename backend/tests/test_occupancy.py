@@ -0,0 +1,50 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.agents.agent import Agent
+
+def test_occupancy_tracks_moves_births_and_deaths():
+    np.random.seed(1)
+    world = World(60, 60, seed=1)
+    world.check_occupancy = True # Every lookup is cross-checked against a full scan
+
+    alice = Agent(0, 0, name="Alice", gender="female")
+    bob = Agent(0, 0, name="Bob", gender="male")
+    world.add_agent(alice)
+    world.add_agent(bob)
+    world.occupancy.validate(world.agents)
+    assert world._get_agent_at(alice.x, alice.y) in (alice.id, bob.id)
+
+    # Movement
+    for _ in range(20):
+        for agent in list(world.agents.values()):
+            world.move_agent(agent.id, np.random.randint(-1, 2), np.random.randint(-1, 2))
+    world.occupancy.validate(world.agents)
+
+    # Birth (spiral search must never pick an occupied cell)
+    world.spawn_child(alice, bob)
+    world.spawn_child(alice, bob)
+    world.occupancy.validate(world.agents)
+    cells = [(a.x, a.y) for a in world.agents.values()]
+    children = [a for a in world.agents.values() if a.id not in (alice.id, bob.id)]
+    assert len(children) == 2
+    for child in children:
+        assert cells.count((child.x, child.y)) == 1
+
+    # Death
+    bob.die(world, "old age")
+    world.occupancy.validate(world.agents)
+    assert bob.id not in world.occupancy.positions
+
+    # A full tick keeps the index consistent
+    world.step()
+    world.occupancy.validate(world.agents)
+
+if __name__ == "__main__":
+    test_occupancy_tracks_moves_births_and_deaths()
+    print("PASS: Occupancy index")
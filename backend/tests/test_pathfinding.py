@@ -0,0 +1,89 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.env.pathfinding import astar, label_components
+from app.agents.agent import Agent
+
+def _lake_world():
+    """40x40 grass world with a water wall at x=20 that has a single gap at y=35."""
+    world = World(40, 40, seed=1)
+    world.terrain_grid[:, :] = 2
+    world.terrain_grid[:, 20] = 0
+    world.terrain_grid[35, 20] = 2
+    world.components, world.component_count = label_components(world.terrain_grid != 0)
+    world.items_grid = {}
+    return world
+
+def test_astar_routes_around_water():
+    walkable = bytes([1, 1, 1, 1, 1,
+                      0, 0, 0, 0, 1,
+                      1, 1, 1, 1, 1,
+                      1, 0, 0, 0, 0,
+                      1, 1, 1, 1, 1])
+    path = astar(walkable, 5, 5, (0, 0), (0, 4), reach_sq=0)
+    assert path[-1] == (0, 4)
+    assert all(walkable[y * 5 + x] for x, y in path)
+    # Consecutive cells are one (possibly diagonal) step apart
+    prev = (0, 0)
+    for cell in path:
+        assert max(abs(cell[0] - prev[0]), abs(cell[1] - prev[1])) == 1
+        prev = cell
+    assert len(path) == 9 # Optimal with diagonal moves
+
+    # Walled off
+    assert astar(bytes([1, 0, 1] * 3), 3, 3, (0, 0), (2, 0), reach_sq=0) is None
+    # Already there
+    assert astar(walkable, 5, 5, (0, 0), (1, 0)) == []
+
+def test_navigate_to_caches_path_until_invalidated():
+    np.random.seed(0)
+    world = _lake_world()
+    agent = Agent(0, 0, name="Walker")
+    world.add_agent(agent)
+    agent.place(15, 5)
+    world.rebuild_spatial_index()
+
+    searches = []
+    find_path = world.find_path
+    def counting_find_path(*args, **kwargs):
+        searches.append(args)
+        return find_path(*args, **kwargs)
+    world.find_path = counting_find_path
+
+    target = (25, 5)
+    for _ in range(100):
+        if (agent.x - target[0])**2 + (agent.y - target[1])**2 <= 2:
+            break
+        agent.navigate_to(*target, world)
+        assert world.terrain_grid[agent.y][agent.x] != 0
+    assert (agent.x - target[0])**2 + (agent.y - target[1])**2 <= 2
+    assert len(searches) == 1, f"Expected one search for a static target, got {len(searches)}"
+
+    # Terrain edits along the cached path force a new plan; edits elsewhere don't
+    agent.place(19, 5) # Right at the wall, so the straight step is blocked
+    world.rebuild_spatial_index()
+    agent._path = None
+    agent.navigate_to(*target, world)
+    assert len(searches) == 2
+    world.set_terrain(2, 2, 3) # Off the path
+    agent.navigate_to(*target, world)
+    assert len(searches) == 2
+    remaining = agent._path['steps']
+    x, y = remaining[len(remaining) // 2]
+    world.set_terrain(x, y, 3) # Grass -> Forest on the path (still walkable)
+    agent.navigate_to(*target, world)
+    assert len(searches) == 3
+
+    # Moving the target away from the path's end forces a new plan too
+    agent.navigate_to(25, 30, world)
+    assert len(searches) == 4
+
+if __name__ == "__main__":
+    test_astar_routes_around_water()
+    test_navigate_to_caches_path_until_invalidated()
+    print("All pathfinding tests passed")
@@ -0,0 +1,141 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.env.item import Item, item_category
+from app.agents.agent import Agent, VISION_RANGE
+from app.agents.perception import perceive, sighting_probability
+
+TRIALS = 3000
+DISTANCES = [10, 40, 79, 85] # always / 50% / ~25% / out of range
+
+def _staged_world():
+    """Empty world with one observer at (100, 100) and a fruit + a stranger at each distance."""
+    world = World(200, 200, seed=3)
+    world.items_grid = {}
+    world.resources.rebuild(world.items_grid, item_category)
+    observer = Agent(100, 100, name="Observer")
+    world.add_agent(observer)
+    observer.place(100, 100) # add_agent picks a random spawn point
+    for d in DISTANCES:
+        world._add_item(100 + d, 100, Item(f"apple_{d}", "Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable"]))
+        stranger = Agent(100, 100 + d, name=f"Stranger{d}")
+        world.add_agent(stranger)
+        stranger.place(100, 100 + d)
+    world.rebuild_spatial_index()
+    return world, observer
+
+def _sighting_rates(engine):
+    np.random.seed(5)
+    world, observer = _staged_world()
+    food = {d: 0 for d in DISTANCES}
+    agents = {d: 0 for d in DISTANCES}
+    for _ in range(TRIALS):
+        observer.spatial_memory = {'food': [], 'wood': [], 'stone': [], 'agent': []}
+        if engine == "batched":
+            perceive(world, [observer])
+        else:
+            observer.scan_surroundings(world)
+        for x, y in observer.spatial_memory['food']:
+            food[x - 100] += 1
+        for m in observer.spatial_memory['agent']:
+            agents[m['pos'][1] - 100] += 1
+    return {d: food[d] / TRIALS for d in DISTANCES}, {d: agents[d] / TRIALS for d in DISTANCES}
+
+def test_batched_vision_matches_legacy_statistics():
+    expected = {d: (float(sighting_probability(np.array(d, dtype=float))) if d < 80 else 0.0) for d in DISTANCES}
+    for engine in ("legacy", "batched"):
+        food, agents = _sighting_rates(engine)
+        for d in DISTANCES:
+            assert abs(food[d] - expected[d]) < 0.04, f"{engine}: food at {d} seen {food[d]:.3f}, expected {expected[d]:.3f}"
+            assert abs(agents[d] - expected[d]) < 0.04, f"{engine}: agent at {d} seen {agents[d]:.3f}, expected {expected[d]:.3f}"
+
+def test_vision_stops_at_vision_range():
+    # Old scans had no cutoff: targets at these distances were seen with the
+    # falloff's odds (~23% / ~12%). Both engines now skip them entirely.
+    for d in (VISION_RANGE, 150):
+        assert sighting_probability(np.array(d, dtype=float)) > 0.1
+    np.random.seed(2)
+    world = World(300, 300, seed=3)
+    world.items_grid = {}
+    world.resources.rebuild(world.items_grid, item_category)
+    observer = Agent(100, 100, name="Observer")
+    world.add_agent(observer)
+    observer.place(100, 100)
+    for d in (VISION_RANGE - 1, VISION_RANGE, 150):
+        world._add_item(100 + d, 100, Item(f"apple_{d}", "Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable"]))
+        stranger = Agent(100, 100 + d, name=f"Stranger{d}")
+        world.add_agent(stranger)
+        stranger.place(100, 100 + d)
+    world.rebuild_spatial_index()
+    for engine in ("legacy", "batched"):
+        seen = set()
+        for _ in range(200):
+            observer.spatial_memory = {'food': [], 'wood': [], 'stone': [], 'agent': []}
+            if engine == "batched":
+                perceive(world, [observer])
+            else:
+                observer.scan_surroundings(world)
+            seen.update(x - 100 for x, y in observer.spatial_memory['food'])
+            seen.update(m['pos'][1] - 100 for m in observer.spatial_memory['agent'])
+        assert seen == {VISION_RANGE - 1}, f"{engine}: saw targets at {sorted(seen)}"
+
+def test_materials_and_other_items_are_remembered_as_items():
+    np.random.seed(4)
+    world, observer = _staged_world()
+    leather = Item("leather", "Leather", weight=0.2, hardness=0.3, durability=0.5, tags=["material", "craftable"])
+    trinket = Item("trinket", "Trinket", weight=0.1, hardness=0.5, durability=0.5, tags=[])
+    world._add_item(95, 100, leather)
+    world._add_item(100, 95, trinket)
+    assert item_category(leather) == 'material' and item_category(trinket) == 'item'
+    for engine in ("legacy", "batched"):
+        observer.spatial_memory = {'food': [], 'wood': [], 'stone': [], 'agent': []}
+        if engine == "batched":
+            perceive(world, [observer])
+        else:
+            observer.scan_surroundings(world)
+        assert sorted(observer.spatial_memory.get('item', [])) == [(95, 100), (100, 95)], engine
+        assert 'material' not in observer.spatial_memory
+
+def test_batched_pass_replaces_scan_in_act():
+    np.random.seed(1)
+    world = World(100, 100, seed=1)
+    agents = [Agent(0, 0, name=f"A{i}") for i in range(20)]
+    for agent in agents:
+        world.add_agent(agent)
+    world.begin_tick()
+    for agent in agents:
+        assert agent.perceived_step == world.time_step
+        # Everything within 20 tiles is always seen
+        for dist, pos in world.query_resources(agent.x, agent.y, 20, category='food'):
+            assert pos in agent.spatial_memory['food']
+        for dist, other in world.query_radius(agent.x, agent.y, 20, exclude_id=agent.id):
+            assert other.id in agent.visible_agents_state
+        assert agent.id not in agent.visible_agents_state
+
+    # Memory stays a duplicate-free list across passes, even after other code pops from it
+    world.time_step += 1
+    world.begin_tick()
+    for agent in agents:
+        for category in ('food', 'wood', 'stone'):
+            places = agent.spatial_memory[category]
+            assert len(places) == len(set(places))
+            if places:
+                places.pop(0)
+    world.time_step += 1
+    world.begin_tick()
+    for agent in agents:
+        for category in ('food', 'wood', 'stone'):
+            places = agent.spatial_memory[category]
+            assert len(places) == len(set(places))
+
+if __name__ == "__main__":
+    test_batched_vision_matches_legacy_statistics()
+    test_vision_stops_at_vision_range()
+    test_materials_and_other_items_are_remembered_as_items()
+    test_batched_pass_replaces_scan_in_act()
+    print("All perception tests passed")
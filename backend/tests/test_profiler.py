@@ -0,0 +1,58 @@
+import sys
+import os
+import re
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World, populate
+from app.env.profiler import Profiler, clock
+from conftest import quiet
+
+def test_rolling_percentiles_and_prometheus_text():
+    profiler = Profiler(enabled=True, window=100)
+    for ms in range(1, 201):
+        with profiler.tick():
+            if ms % 2 == 0:
+                profiler.lap("even", clock() - ms * 1_000_000)
+    summary = profiler.summary()
+    assert profiler.ticks == 200 and summary["even"]["samples"] == 100 # Rolling window
+    # Last 100 ticks: 0 ms on odd ones (skipped), 102..200 ms on even ones
+    assert abs(summary["even"]["p50_ms"] - 51) < 0.5 and abs(summary["even"]["mean_ms"] - 75.5) < 0.5
+    assert 198 <= summary["even"]["p99_ms"] <= 201
+
+    text = profiler.prometheus({"agents": ("Living agents.", 3)}, {"ticks_total": ("Ticks stepped.", 200)})
+    assert "# TYPE adam_phase_seconds summary" in text
+    assert 'adam_phase_seconds{phase="even",quantile="0.5"} 0.051' in text
+    assert 'adam_phase_seconds_count{phase="even"} 199' in text # All-time, from the first tick it ran
+    assert "# HELP adam_agents Living agents.\n# TYPE adam_agents gauge\nadam_agents 3\n" in text
+    assert "# HELP adam_ticks_total Ticks stepped.\n# TYPE adam_ticks_total counter\nadam_ticks_total 200\n" in text
+    # Every metric family is documented and typed
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name = re.sub(r"_(sum|count)$", "", line.split()[0].split("{")[0])
+            assert f"# HELP {name} " in text and f"# TYPE {name} " in text, name
+
+    profiler.reset()
+    assert profiler.summary() == {} and profiler.ticks == 0
+
+def test_world_phases_are_timed_only_when_enabled():
+    world = World(60, 60, seed=5)
+    with quiet():
+        populate(world, 8)
+        for _ in range(3):
+            world.step()
+        assert world.profiler.summary() == {} # Off by default
+        world.profiler.enabled = True
+        for _ in range(5):
+            world.step()
+    summary = world.profiler.summary()
+    assert {"tick", "begin_tick", "begin_tick.perception", "agents", "act.biology", "animals", "respawn"} <= set(summary)
+    assert summary["tick"]["samples"] == summary["agents"]["samples"] == 5
+    assert summary["agents"]["mean_ms"] >= summary["act.biology"]["mean_ms"]
+    assert World(20, 20, config={"profile": True}).profiler.enabled
+
+if __name__ == "__main__":
+    test_rolling_percentiles_and_prometheus_text()
+    test_world_phases_are_timed_only_when_enabled()
+    print("Profiler tests passed.")
@@ -0,0 +1,58 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.env.item import Item, item_category
+from app.agents.agent import Agent
+
+def test_resource_index_tracks_items_grid():
+    np.random.seed(2)
+    world = World(80, 80, seed=2)
+    world.resources.validate(world.items_grid, item_category)
+
+    # Stacking: the cell keeps the category of its top item
+    fruit = Item("apple", "Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable"])
+    stone = Item("rock", "Stone", weight=2.0, hardness=0.9, durability=1.0, tags=["heavy", "material"])
+    world._add_item(5, 5, fruit)
+    world._add_item(5, 5, stone)
+    assert world.resources.categories[(5, 5)] == 'food'
+    world.remove_item(5, 5, fruit)
+    assert world.resources.categories[(5, 5)] == 'stone'
+    world.remove_item(5, 5, stone)
+    assert (5, 5) not in world.resources.categories
+
+    # Gathering goes through the index too
+    alice = Agent(0, 0, name="Alice")
+    world.add_agent(alice)
+    world._add_item(alice.x, alice.y, Item("pear", "Fruit", weight=0.1, hardness=0.1, durability=0.1, tags=["food", "consumable"]))
+    alice.gather(world)
+    world.resources.validate(world.items_grid, item_category)
+
+    # Respawning
+    world.time_step = 0
+    world.respawn_resources()
+    world.resources.validate(world.items_grid, item_category)
+
+def test_nearest_food_matches_full_scan():
+    np.random.seed(3)
+    world = World(100, 100, seed=3)
+    world.time_step = 0
+    world.respawn_resources() # Plenty of fruit
+    for (x, y, r, n) in [(50, 50, 30, 5), (10, 90, 200, 3), (50, 50, 4, None)]:
+        got = world.query_resources(x, y, r, category='food', n=n)
+        expected = sorted(
+            (np.sqrt((px - x)**2 + (py - y)**2), (px, py))
+            for (px, py), items in world.items_grid.items()
+            if item_category(items[0]) == 'food' and np.sqrt((px - x)**2 + (py - y)**2) < r
+        )
+        if n is not None: expected = expected[:n]
+        assert [pos for _, pos in got] == [pos for _, pos in expected]
+
+if __name__ == "__main__":
+    test_resource_index_tracks_items_grid()
+    test_nearest_food_matches_full_scan()
+    print("PASS: Resource index")
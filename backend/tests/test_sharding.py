@@ -0,0 +1,177 @@
+import sys
+import os
+import json
+import pickle
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World, populate
+from app.env.sharding import HALO, Shard, ShardedWorld, Tiling, _empty_mail, _merge_tribes
+from app.agents import agent as agent_module
+from app.agents.agent import Agent
+from app.env.animals import Animal
+from app.api.stream import encode_full_state
+from conftest import quiet
+
+def _land_near(world, x, y):
+    land_y, land_x = np.nonzero(world.terrain_grid != 0)
+    i = int(np.argmin((land_x - x) ** 2 + (land_y - y) ** 2))
+    return int(land_x[i]), int(land_y[i])
+
+def _adopt(shard, x, y):
+    """An agent standing on land near (x, y), owned by `shard` whatever its tile."""
+    with quiet():
+        agent = Agent(0, 0, gender="male")
+    agent.place(*_land_near(shard.world, x, y))
+    shard.world.adopt_agent(agent)
+    return agent
+
+def _step(shard, mail=None):
+    with quiet():
+        return shard.step(mail or _empty_mail())
+
+def test_tiling_covers_the_map_once():
+    for count, shape in ((1, (1, 1)), (2, (1, 2)), (4, (2, 2)), (8, (2, 4))):
+        tiling = Tiling(101, 77, count)
+        assert (tiling.rows, tiling.cols) == shape and len(tiling) == count
+        for index, (x0, y0, x1, y1) in enumerate(tiling.tiles):
+            assert all(tiling.tile_of(x, y) == index for x in (x0, x1 - 1) for y in (y0, y1 - 1))
+        assert sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in tiling.tiles) == 101 * 77
+
+    tiling = Tiling(200, 200, 4)
+    assert tiling.halo_of(50, 50, 0) == []
+    assert tiling.halo_of(100 - HALO, 50, 0) == [1]
+    assert sorted(tiling.halo_of(99, 99, 0)) == [1, 2, 3]
+
+def test_agents_migrate_with_their_state():
+    tiling = Tiling(120, 120, 2)
+    left, right = Shard(0, tiling, 4, None), Shard(1, tiling, 4, None)
+    agent = _adopt(left, 90, 60) # Stands in the right tile
+    agent.nafs.hunger = 0.37
+    agent.qalb.opinions["someone"] = 42.0
+
+    outbox, part = _step(left)
+    assert agent.id not in left.world.agents
+    assert [s["id"] for s in part["agents"]] == [agent.id] # Drawn where it stood before leaving
+    assert len(outbox[1]["agents"]) == 1 and not outbox[0]["agents"]
+
+    _step(right, outbox[1])
+    migrant = right.world.agents[agent.id]
+    assert migrant._store is right.world.agent_store
+    assert migrant.qalb.opinions["someone"] == 42.0
+    assert migrant.state.age_steps == agent.state.age_steps + 1 # Acted on arrival
+    assert right.world.occupancy.positions[agent.id] == (migrant.x, migrant.y)
+
+def test_rl_brain_survives_migration():
+    soul = object() # Stands in for a loaded PPO model
+    agent_module._BRAINS["test_soul"] = soul
+    try:
+        tiling = Tiling(120, 120, 2)
+        left, right = Shard(0, tiling, 4, None), Shard(1, tiling, 4, None)
+        agent = _adopt(left, 90, 60)
+        with quiet():
+            agent.load_brain("test_soul")
+        outbox, _ = _step(left)
+        _step(right, outbox[1])
+        migrant = right.world.agents[agent.id]
+        assert migrant.qalb.brain is soul and migrant.qalb.brain_path == "test_soul"
+    finally:
+        del agent_module._BRAINS["test_soul"]
+
+def test_split_tribe_is_replicated_and_merged():
+    tiling = Tiling(120, 120, 2)
+    left, right = Shard(0, tiling, 4, None), Shard(1, tiling, 4, None)
+    chief = _adopt(left, 30, 60)
+    member = _adopt(left, 90, 60) # Stands in the right tile
+    for agent in (chief, member):
+        agent.state.busy_until = 10 ** 9 # Stay put
+    tribe = left.world.create_tribe("Clan", chief.id)
+    for agent in (chief, member):
+        agent.attributes.tribe_id = tribe.id
+    tribe.add_member(member.id)
+    member.qalb.opinions[chief.id] = 60.0
+
+    outbox, _ = _step(left)
+    assert outbox[1]["tribes"][tribe.id]["members"] == {chief.id, member.id}
+    assert tribe.member_count == 2 and tribe.centroid == (chief.x, chief.y) # Still a member, counted elsewhere
+    _, right_part = _step(right, outbox[1])
+    replica = right.world.tribes[tribe.id]
+    assert replica is not tribe and replica.name == "Clan"
+    assert replica.centroid == (member.x, member.y) and replica.calculate_harmony(right.world) == 80.0
+
+    merged = _merge_tribes([left.frame_part(), right_part])[tribe.id]
+    assert merged["member_count"] == 2 and merged["leader_id"] == chief.id
+    assert merged["centroid"] == ((chief.x + member.x) / 2, (chief.y + member.y) / 2)
+    assert merged["harmony"] == 80.0
+    assert set(merged) == set(tribe.to_dict(left.world))
+
+def test_border_agents_are_mirrored_as_read_only_ghosts():
+    tiling = Tiling(120, 120, 2)
+    left, right = Shard(0, tiling, 4, None), Shard(1, tiling, 4, None)
+    agent = _adopt(left, 60 - HALO // 2, 60)
+    agent.state.busy_until = 10 ** 9 # Stays put
+    outbox, _ = _step(left)
+    assert len(outbox[1]["ghosts"]) == 1
+
+    _, part = _step(right, outbox[1])
+    ghost = right.world.agents[agent.id]
+    assert agent.id in right.world.ghosts
+    assert ghost.diary == [] and ghost.attributes.name == agent.attributes.name
+    assert not part["agents"] # Not drawn twice
+    assert right.world.query_radius(ghost.x + 1, ghost.y, 3) # Visible to neighbor queries
+
+    # Replaced by the next copies, or dropped when none come
+    _step(right)
+    assert agent.id not in right.world.agents and not right.world.ghosts
+
+def test_shard_flow_fields_cover_only_their_tile():
+    tiling = Tiling(120, 120, 2)
+    shard = Shard(0, tiling, 4, None)
+    field = shard.world.flow_field('food')
+    assert field.dist.shape == (120, 60 + HALO) and field.origin == (0, 0)
+    assert field.distance(119, 60) is None and field.step(119, 60) is None
+    xs, ys, _ = shard.world.resources.arrays('food')
+    assert xs.max() < 60 and field.distance(int(xs[0]), int(ys[0])) == 0
+
+def test_sharded_world_merges_frames():
+    np.random.seed(2)
+    world = ShardedWorld(120, 120, seed=6, workers=4, processes=False, quiet=True)
+    populate(world, 24, herbivores=0, carnivores=0)
+    world.add_animal(Animal(x=10, y=10, type='herbivore'))
+    for _ in range(15):
+        world.step()
+    state = world.get_state()
+    assert set(state) == set(World(20, 20).get_state())
+    assert state["time_step"] == 15
+    # Every agent is drawn exactly once: by its shard, or by the one it is migrating from
+    owned = [a.id for shard in world.shards for a in shard.world.agents.values() if a.id not in shard.world.ghosts]
+    in_flight = [pickle.loads(blob).id for mail in world._mail for blob in mail["agents"]]
+    assert sorted(agent["id"] for agent in state["agents"]) == sorted(owned + in_flight)
+    assert len(state["agents"]) >= 20
+    assert {(item["x"], item["y"]) for item in state["items"]} <= {
+        cell for shard in world.shards for cell in shard.world.items_grid}
+    json.loads(encode_full_state(world, paused=False))
+    some_id = state["agents"][0]["id"]
+    assert world.inspect(some_id)["id"] == some_id
+
+def test_worker_processes():
+    np.random.seed(3)
+    with ShardedWorld(80, 80, seed=6, workers=2, quiet=True) as world:
+        for _ in range(6):
+            world.add_agent(Agent(0, 0))
+        for _ in range(5):
+            world.step()
+        assert world.time_step == 5 and len(world.get_state()["agents"]) > 0
+
+if __name__ == "__main__":
+    test_tiling_covers_the_map_once()
+    test_agents_migrate_with_their_state()
+    test_rl_brain_survives_migration()
+    test_split_tribe_is_replicated_and_merged()
+    test_border_agents_are_mirrored_as_read_only_ghosts()
+    test_shard_flow_fields_cover_only_their_tile()
+    test_sharded_world_merges_frames()
+    test_worker_processes()
+    print("Sharding tests passed.")
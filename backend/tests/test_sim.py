@@ -0,0 +1,56 @@
+import sys
+import os
+import io
+import json
+import tempfile
+import contextlib
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.sim import PHASES, main
+from app.env.world import World, populate
+from conftest import quiet
+
+def test_headless_run_writes_metrics_and_snapshots():
+    with tempfile.TemporaryDirectory() as out:
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            main(["run", "--ticks", "2e1", "--agents", "6", "--size", "60", "--seed", "3",
+                  "--out", out, "--snapshot-every", "10", "--set", "think_interval=2"])
+        with open(os.path.join(out, "metrics.jsonl")) as f:
+            reports = [json.loads(line) for line in f]
+        assert reports[-1]["tick"] == 20 and reports[-1]["agents"] > 0
+        assert set(reports[-1]["phases_ms"]) == set(PHASES)
+        assert sum(reports[-1]["phases_ms"].values()) > 0
+        assert set(PHASES) | {"tick", "act.decide"} <= set(reports[-1]["percentiles"])
+        assert reports[-1]["percentiles"]["tick"]["samples"] == 20
+        assert sorted(os.listdir(os.path.join(out, "snapshots"))) == ["tick_000000010.json", "tick_000000020.json"]
+        with open(os.path.join(out, "snapshots", "tick_000000020.json")) as f:
+            assert json.load(f)["time_step"] == 20
+        assert "Ran 20 ticks" in printed.getvalue()
+
+def test_step_applies_policy_and_survives_failing_agents():
+    world = World(60, 60, seed=4)
+    with quiet():
+        populate(world, 4, herbivores=2, carnivores=1)
+    assert len(world.agents) == 4 and len(world.animals) == 3
+    broken = next(iter(world.agents.values()))
+    def fail(*args, **kwargs):
+        raise RuntimeError("broken agent")
+    broken.act = fail
+    asked = []
+    def policy(agent, world):
+        asked.append(agent.id)
+        return 0
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        world.step(policy)
+    assert world.time_step == 1
+    assert sorted(asked) == sorted(world.agents)
+    assert "Critical error in agent.act: broken agent" in printed.getvalue()
+
+if __name__ == "__main__":
+    test_headless_run_writes_metrics_and_snapshots()
+    test_step_applies_policy_and_survives_failing_agents()
+    print("Headless runner tests passed.")
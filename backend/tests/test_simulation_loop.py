@@ -0,0 +1,133 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.api.simulation import SimulationLoop
+
+class _World:
+    def __init__(self):
+        self.time_step = 0
+        self.paused = False
+
+def _tick(world):
+    world.time_step += 1
+
+async def _run_for(loop, seconds, clients=()):
+    loop.start()
+    tasks = [asyncio.create_task(client) for client in clients]
+    await asyncio.sleep(seconds)
+    for task in tasks:
+        task.cancel()
+    await loop.stop()
+
+def test_ticks_run_without_clients_and_are_not_multiplied_by_them():
+    world = _World()
+    loop = SimulationLoop(lambda: world, _tick, tick_rate=100)
+    asyncio.run(_run_for(loop, 0.3))
+    alone = world.time_step
+    assert 15 <= alone <= 40, alone
+
+    world = _World()
+    loop = SimulationLoop(lambda: world, _tick, tick_rate=100)
+    async def reader(subscription):
+        while True:
+            await subscription.next_frame()
+    async def main():
+        subs = [loop.subscribe() for _ in range(3)]
+        await _run_for(loop, 0.3, [reader(s) for s in subs])
+    asyncio.run(main())
+    assert abs(world.time_step - alone) <= 10, (world.time_step, alone)
+
+def test_slow_client_drops_frames_without_stalling_ticks():
+    world = _World()
+    loop = SimulationLoop(lambda: world, _tick, tick_rate=200, max_fps=50)
+    seen = []
+    async def slow(subscription):
+        while True:
+            frame = await subscription.next_frame()
+            seen.append(frame.time_step)
+            await asyncio.sleep(0.1) # A client stuck on a slow socket
+    async def main():
+        subscription = loop.subscribe()
+        await _run_for(loop, 0.5, [slow(subscription)])
+        return subscription
+    subscription = asyncio.run(main())
+    assert world.time_step >= 50
+    assert len(seen) <= 7
+    assert subscription.dropped > 0
+    # Whatever it does get is the newest frame, not a backlog
+    assert seen == sorted(seen) and seen[-1] >= world.time_step - 40
+
+def test_paused_world_does_not_tick():
+    world = _World()
+    world.paused = True
+    loop = SimulationLoop(lambda: world, _tick, tick_rate=100)
+    asyncio.run(_run_for(loop, 0.1))
+    assert world.time_step == 0
+
+def _busy_tick(world):
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end: pass # Pure Python work, like an agent loop
+    world.time_step += 1
+
+def test_threaded_stepping_keeps_event_loop_responsive():
+    lags = {}
+    for threaded in (False, True):
+        world = _World()
+        loop = SimulationLoop(lambda: world, _busy_tick, tick_rate=20, threaded=threaded)
+        asyncio.run(_run_for(loop, 0.8))
+        assert world.time_step >= 5
+        lags[threaded] = loop.latency()["max_ms"]
+    # Inline, a 50 ms tick starves the loop; on the executor thread it doesn't
+    assert lags[False] > 30, lags
+    assert lags[True] < lags[False] / 2, lags
+
+class _SlowWorld(_World):
+    """Flags itself while a step is in progress, so readers can tell a torn read."""
+    def __init__(self):
+        super().__init__()
+        self.stepping = False
+
+def _flagged_tick(world):
+    world.stepping = True
+    end = time.perf_counter() + 0.003
+    while time.perf_counter() < end: pass
+    world.time_step += 1
+    world.stepping = False
+
+def test_readers_and_calls_never_overlap_a_tick():
+    world = _SlowWorld()
+    loop = SimulationLoop(lambda: world, _flagged_tick, tick_rate=200)
+    reads, torn, calls = [0], [], []
+    async def reader():
+        while True:
+            await loop.between_ticks()
+            if world.stepping:
+                torn.append(world.time_step)
+            reads[0] += 1
+            await asyncio.sleep(0.001)
+    def command(value):
+        calls.append((threading.current_thread().name, world.stepping))
+        world.paused = False
+        return value * 2
+    async def writer():
+        while True:
+            assert await loop.call(command, 21) == 42
+            await asyncio.sleep(0.005)
+    asyncio.run(_run_for(loop, 0.4, [reader(), writer()]))
+    assert world.time_step >= 20 and reads[0] >= 20 and len(calls) >= 10
+    assert not torn, f"Read the world mid-step at ticks {torn[:5]}"
+    assert all(name.startswith("simulation") and not stepping for name, stepping in calls), calls[:5]
+
+if __name__ == "__main__":
+    test_ticks_run_without_clients_and_are_not_multiplied_by_them()
+    test_slow_client_drops_frames_without_stalling_ticks()
+    test_paused_world_does_not_tick()
+    test_threaded_stepping_keeps_event_loop_responsive()
+    test_readers_and_calls_never_overlap_a_tick()
+    print("All simulation loop tests passed")
@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.api.stream import DeltaStream, encode_full_state
+from conftest import make_world, quiet
+
+def _apply(state, frame):
+    """Python twin of frontend/src/stream.js applyFrame."""
+    if frame["type"] != "delta":
+        return frame
+    assert state["seq"] == frame["seq"] - 1
+    state = dict(state, seq=frame["seq"], time_step=frame["time_step"], paused=frame["paused"])
+    for kind in ("agents", "animals"):
+        by_id = {e["id"]: e for e in state[kind] if e["id"] not in set(frame[f"{kind}_removed"])}
+        for entity_id, fields in frame[kind].items():
+            by_id[entity_id] = {**by_id.get(entity_id, {}), **fields}
+        state[kind] = list(by_id.values())
+    touched = {(c["x"], c["y"]) for c in frame["item_cells"]}
+    items = [i for i in state["items"] if (i["x"], i["y"]) not in touched]
+    for cell in frame["item_cells"]:
+        items += [{**i, "x": cell["x"], "y": cell["y"]} for i in cell["items"]]
+    state["items"] = items
+    terrain = [row[:] for row in state["terrain"]]
+    for x, y, t in frame["terrain"]:
+        terrain[y][x] = t
+    state["terrain"] = terrain
+    state["logs"] = (state["logs"] + frame["logs"])[-50:]
+    return state
+
+def _normalized(state):
+    return {
+        "agents": sorted((json.dumps(a, sort_keys=True) for a in state["agents"])),
+        "animals": sorted((json.dumps(a, sort_keys=True) for a in state["animals"])),
+        "items": sorted((json.dumps(i, sort_keys=True) for i in state["items"])),
+        "terrain": state["terrain"],
+        "logs": state["logs"],
+        "time_step": state["time_step"],
+    }
+
+def test_deltas_rebuild_full_state():
+    world = make_world(60, 3, agents=6, herbivores=3)
+    with quiet():
+        stream = DeltaStream()
+        client = json.loads(stream.encode(world, False))
+        assert client["type"] == "snapshot"
+        full_bytes = delta_bytes = 0
+        for step in range(15):
+            world.step()
+            if step == 5:
+                world.set_terrain(10, 10, 0)
+                world.log_event("Flood at 10,10")
+            frame = stream.encode(world, False)
+            delta_bytes += len(frame)
+            full_bytes += len(encode_full_state(world, False))
+            client = _apply(client, json.loads(frame))
+            expected = json.loads(encode_full_state(world, False))
+            assert _normalized(client) == _normalized(expected), f"Diverged at step {step}"
+
+    # Deltas are much smaller than full frames
+    assert delta_bytes * 5 < full_bytes
+
+    # A resync (or a new world) brings a fresh snapshot
+    stream.resync()
+    assert json.loads(stream.encode(world, False))["type"] == "snapshot"
+    assert json.loads(stream.encode(world, False))["type"] == "delta"
+    assert json.loads(stream.encode(World(20, 20, seed=1), False))["type"] == "snapshot"
+
+if __name__ == "__main__":
+    test_deltas_rebuild_full_state()
+    print("All stream tests passed")
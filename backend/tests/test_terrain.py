@@ -0,0 +1,98 @@
+import sys
+import os
+import math
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.terrain import LEGACY_PARITY, _PERM, generate_terrain, generate_terrain_legacy, pnoise2_grid
+from app.env.world import World
+
+def test_noise_matches_pnoise2():
+    import noise
+    xs = np.arange(60) / 20.0
+    ys = np.arange(40) / 20.0
+    grid = pnoise2_grid(xs, ys, octaves=4, repeatx=60, repeaty=40, base=7)
+    for y, x in [(0, 0), (5, 17), (39, 59), (21, 3)]:
+        expected = noise.pnoise2(xs[x], ys[y], octaves=4, repeatx=60, repeaty=40, base=7)
+        assert abs(grid[y, x] - expected) < 1e-6
+
+def _parity_tolerance(seed):
+    for last_seed, tolerance in LEGACY_PARITY:
+        if seed <= last_seed:
+            return tolerance
+    return None
+
+def test_batched_biomes_match_legacy():
+    # Exact for small seeds, a documented drift up to LEGACY_PARITY's last seed
+    for (width, height), seed in [((100, 80), 0), ((150, 90), 5), ((120, 120), 11), ((100, 80), 42),
+                                  ((150, 90), 100), ((120, 120), 128)]:
+        new = generate_terrain(width, height, seed=seed)
+        old = generate_terrain_legacy(width, height, seed=seed)
+        mismatch = float(np.mean(new["terrain"] != old["terrain"]))
+        assert mismatch <= _parity_tolerance(seed), (seed, mismatch)
+        # Items only ever sit on their biome
+        assert not (new["stone"] & (new["terrain"] != 4)).any()
+        assert not (new["fruit"] & (new["terrain"] != 2)).any()
+        assert not (new["wood"] & (new["terrain"] != 3)).any()
+
+def _wrapped_pnoise2(x, y, octaves, repeatx, repeaty, base):
+    """Scalar noise.pnoise2 (C noise2 + fractal loop) with every table index wrapped to 256."""
+    def perm(k):
+        return int(_PERM[k & 255])
+
+    def grad(h, dx, dy):
+        gx, gy = ((1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0), (1, 0), (-1, 0),
+                  (0, 1), (0, -1), (0, 1), (0, -1), (1, 0), (-1, 0), (0, -1), (0, 1))[h & 15]
+        return dx * gx + dy * gy
+
+    def noise2(x, y, rx, ry):
+        i, j = int(math.floor(math.fmod(x, rx))), int(math.floor(math.fmod(y, ry)))
+        ii, jj = int(math.fmod(i + 1, rx)), int(math.fmod(j + 1, ry))
+        i, j, ii, jj = (i & 255) + base, (j & 255) + base, (ii & 255) + base, (jj & 255) + base
+        x, y = x - math.floor(x), y - math.floor(y)
+        fx, fy = x ** 3 * (x * (x * 6 - 15) + 10), y ** 3 * (y * (y * 6 - 15) + 10)
+        a, b = perm(i), perm(ii)
+        lo = grad(perm(perm(a + j)), x, y) + fx * (grad(perm(perm(b + j)), x - 1, y) - grad(perm(perm(a + j)), x, y))
+        hi = grad(perm(perm(a + jj)), x, y - 1) + fx * (grad(perm(perm(b + jj)), x - 1, y - 1) - grad(perm(perm(a + jj)), x, y - 1))
+        return lo + fy * (hi - lo)
+
+    total, amp, freq, max_amp = 0.0, 1.0, 1.0, 0.0
+    for _ in range(octaves):
+        total += noise2(x * freq, y * freq, repeatx * freq, repeaty * freq) * amp
+        max_amp += amp
+        freq *= 2.0
+        amp *= 0.5
+    return total / max_amp
+
+def test_large_seeds_follow_the_wrapped_table():
+    # Past LEGACY_PARITY the legacy loop reads beyond the C table; the batched
+    # maps are defined by the wrapped table, checked here cell by cell
+    import noise
+    assert _parity_tolerance(256) is None
+    # While the C code stays inside its table (base <= 1) the reference is noise.pnoise2
+    for x, y in [(6.3, 2.85), (0.15, 4.4)]:
+        assert abs(_wrapped_pnoise2(x, y, 6, 150, 90, 1) - noise.pnoise2(x, y, octaves=6, repeatx=150, repeaty=90, base=1)) < 1e-6
+    rng = np.random.default_rng(0)
+    for (width, height), seed in [((150, 90), 256), ((90, 150), 1000)]:
+        maps = generate_terrain(width, height, seed=seed)
+        for _ in range(40):
+            x, y = int(rng.integers(1, width - 1)), int(rng.integers(1, height - 1))
+            h = _wrapped_pnoise2(x / 20.0, y / 20.0, 6, width, height, seed)
+            m = _wrapped_pnoise2(x / 20.0, y / 20.0, 4, width, height, seed + 100)
+            assert abs(maps["height"][y, x] - h) < 1e-5 and abs(maps["moisture"][y, x] - m) < 1e-5, (seed, x, y)
+
+def test_world_generation_is_seeded():
+    a = World(60, 60, seed=3)
+    b = World(60, 60, seed=3)
+    assert np.array_equal(a.terrain_grid, b.terrain_grid)
+    assert sorted(a.items_grid.keys()) == sorted(b.items_grid.keys())
+    assert (a.terrain_grid[0, :] == 0).all() and (a.terrain_grid[:, -1] == 0).all()
+
+if __name__ == "__main__":
+    test_noise_matches_pnoise2()
+    test_batched_biomes_match_legacy()
+    test_large_seeds_follow_the_wrapped_table()
+    test_world_generation_is_seeded()
+    print("PASS: Terrain generation")
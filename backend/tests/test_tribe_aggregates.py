@@ -0,0 +1,80 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.env.world import World
+from app.agents.agent import Agent
+from conftest import make_world, quiet
+
+def _brute_force(tribe, world):
+    """The aggregates computed the old way, by walking every member."""
+    total, count, xs, ys = 0.0, 0, [], []
+    for member_id in tribe.members:
+        agent = world.agents.get(member_id)
+        if not agent: continue
+        xs.append(agent.x); ys.append(agent.y)
+        if tribe.leader_id and tribe.leader_id != member_id:
+            total += agent.qalb.opinions.get(tribe.leader_id, 0)
+            count += 1
+    harmony = 50.0 if count == 0 else max(0.0, min(100.0, ((total / count) + 100) / 2))
+    if not tribe.members: harmony = 100.0
+    centroid = (sum(xs) / len(xs), sum(ys) / len(ys)) if xs else None
+    return harmony, centroid
+
+def test_aggregates_track_membership_opinions_and_moves():
+    rng = np.random.default_rng(4)
+    world = make_world(60, 4, agents=12)
+    agents = list(world.agents.values())
+    with quiet():
+        tribes = [world.create_tribe("North", agents[0].id), world.create_tribe("South", agents[1].id)]
+
+        for step in range(400):
+            op = rng.integers(0, 6)
+            agent = agents[rng.integers(0, len(agents))]
+            tribe = tribes[rng.integers(0, 2)]
+            if op == 0:
+                world.join_tribe(agent.id, tribe.id)
+            elif op == 1:
+                tribe.remove_member(agent.id)
+            elif op == 2 and tribe.members:
+                tribe.set_leader(sorted(tribe.members)[rng.integers(0, len(tribe.members))])
+            elif op == 3 and tribe.leader_id:
+                agent.qalb.opinions[tribe.leader_id] = agent.qalb.opinions.get(tribe.leader_id, 0) + rng.uniform(-20, 20)
+            elif op == 4:
+                world.move_agent(agent.id, int(rng.integers(-1, 2)), int(rng.integers(-1, 2)))
+            elif op == 5 and tribe.leader_id and tribe.leader_id in agent.qalb.opinions:
+                del agent.qalb.opinions[tribe.leader_id]
+
+            for t in tribes:
+                harmony, centroid = _brute_force(t, world)
+                assert abs(t.calculate_harmony(world) - harmony) < 1e-9, f"Harmony drifted at step {step}"
+                assert t.member_count == len(t.members)
+                if centroid is None:
+                    assert t.centroid is None
+                else:
+                    assert np.allclose(t.centroid, centroid), f"Centroid drifted at step {step}"
+
+def test_members_is_a_set_and_totals_count_inventories():
+    world = World(30, 30, seed=1)
+    with quiet():
+        chief, member = Agent(0, 0), Agent(0, 0)
+        world.add_agent(chief)
+        world.add_agent(member)
+        tribe = world.create_tribe("Clan", chief.id)
+        world.join_tribe(member.id, tribe.id)
+        world.join_tribe(member.id, tribe.id)
+    assert isinstance(tribe.members, set) and tribe.members == {chief.id, member.id}
+    member.inventory.append({'item': {'name': 'Fruit', 'tags': ['food', 'consumable']}, 'count': 3})
+    chief.inventory.append({'item': {'name': 'Wood', 'tags': ['material']}, 'count': 2})
+    world.time_step += 1
+    assert tribe.resource_totals(world) == {"food": 3, "wood": 2, "stone": 0}
+    summary = tribe.to_dict(world)
+    assert summary["member_count"] == 2 and summary["holdings"]["food"] == 3
+
+if __name__ == "__main__":
+    test_aggregates_track_membership_opinions_and_moves()
+    test_members_is_a_set_and_totals_count_inventories()
+    print("All tribe aggregate tests passed")
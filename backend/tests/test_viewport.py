@@ -0,0 +1,91 @@
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from app.api.stream import View, DeltaStream, BinaryStream, encode_full_state, decode_binary_frame
+from conftest import make_world, quiet
+
+def _world():
+    return make_world(80, 11, agents=20, herbivores=10)
+
+def test_rect_queries_match_a_scan():
+    world = _world()
+    for rect in [(0, 0, 80, 80), (10, 5, 43, 37), (16, 16, 32, 32), (79, 79, 80, 80), (-5, -5, 3, 3)]:
+        x0, y0, x1, y1 = rect
+        inside = lambda x, y: x0 <= x < x1 and y0 <= y < y1
+        assert {a.id for a in world.query_rect(*rect)} == {a.id for a in world.agents.values() if inside(a.x, a.y)}
+        assert {a.id for a in world.query_rect(*rect, kind='animal')} == {a.id for a in world.animals if inside(a.x, a.y)}
+        assert sorted(world.resources.cells_in_rect(*rect)) == sorted(c for c, items in world.items_grid.items() if items and inside(*c))
+
+def test_subscribe_message_parsing():
+    view = View.from_message({"type": "subscribe", "viewport": {"x": 10, "y": 20, "width": 30, "height": 5},
+                              "max_fps": 12, "detail": "positions", "inspect": "abc"})
+    assert view.viewport == (10, 20, 40, 25) and view.max_fps == 12 and view.detail == "positions" and view.inspect == "abc"
+    assert View.from_message({"type": "subscribe"}).is_default
+    for bad in [{"detail": "everything"}, {"max_fps": 0}, {"viewport": {"x": 0, "y": 0, "width": 0, "height": 3}}, {"viewport": {"x": 0}}]:
+        try:
+            View.from_message(bad)
+        except (ValueError, KeyError):
+            continue
+        raise AssertionError(f"Accepted {bad}")
+
+def test_view_limits_what_is_serialized():
+    world = _world()
+    inspected = next(a for a in world.agents.values() if not (20 <= a.x < 50 and 20 <= a.y < 50))
+    view = View(viewport=(20, 20, 50, 50), detail="positions", inspect=inspected.id)
+
+    state = json.loads(encode_full_state(world, False, view))
+    full = json.loads(encode_full_state(world, False))
+    assert len(state["items"]) < len(full["items"])
+    for item in state["items"]:
+        assert view.contains(item["x"], item["y"])
+    ids = set()
+    for agent in state["agents"]:
+        ids.add(agent["id"])
+        if agent["id"] == inspected.id:
+            assert "diary" in agent # The inspector gets everything, even off-screen
+        else:
+            assert view.contains(agent["x"], agent["y"])
+            assert set(agent) == {"id", "x", "y", "attributes"}
+    assert ids == {a.id for a in world.query_rect(20, 20, 50, 50)} | {inspected.id}
+    assert len(encode_full_state(world, False, view)) * 3 < len(encode_full_state(world, False, View(detail="full")))
+
+def test_streams_follow_the_view():
+    world = _world()
+    view = View(viewport=(0, 0, 40, 40), detail="positions")
+    delta, binary = DeltaStream(), BinaryStream()
+    delta.set_view(view)
+    binary.set_view(view)
+    with quiet():
+        for _ in range(5):
+            world.step()
+            frame = json.loads(delta.encode(world, False))
+            visible = {a.id for a in world.query_rect(0, 0, 40, 40)}
+            assert set(delta.agents) == visible
+            agents = frame["agents"].values() if frame["type"] == "delta" else frame["agents"]
+            for fields in agents:
+                assert "diary" not in fields
+            for cell in frame.get("item_cells", []):
+                assert view.contains(cell["x"], cell["y"])
+            decoded = decode_binary_frame(binary.encode(world, False))
+            assert {a["id"] for a in decoded["agents"]} == visible
+            for item in decoded.get("items", []):
+                assert view.contains(item["x"], item["y"])
+
+    # Moving the viewport brings a snapshot with the newly visible items
+    delta.set_view(View(viewport=(40, 40, 80, 80)))
+    frame = json.loads(delta.encode(world, False))
+    assert frame["type"] == "snapshot"
+    assert frame["items"] and all(40 <= i["x"] < 80 and 40 <= i["y"] < 80 for i in frame["items"])
+    binary.set_view(View(viewport=(40, 40, 80, 80)))
+    assert "items" in decode_binary_frame(binary.encode(world, False))
+
+if __name__ == "__main__":
+    test_rect_queries_match_a_scan()
+    test_subscribe_message_parsing()
+    test_view_limits_what_is_serialized()
+    test_streams_follow_the_view()
+    print("All viewport tests passed")
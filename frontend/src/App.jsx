@@ -1,8 +1,17 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import MapCanvas from './components/MapCanvas';
 import Dashboard from './components/Dashboard';
 import TrainingCenter from './components/Training/TrainingCenter';
 import ConfigMenu from './components/ConfigMenu';
+import { applyFrame } from './stream';
+import { decodeFrame } from './binaryFrame';
+
+// 'delta' (JSON snapshot + diffs) or 'binary' (packed frames, see binaryFrame.js)
+const STREAM_PROTOCOL = 'delta';
+// Only stream what the map shows (positions only, full detail for the selected agent)
+const VIEWPORT_STREAMING = false;
+const VIEWPORT_MARGIN = 8; // Tiles streamed around the visible area so panning doesn't pop
+const INSPECTOR_REFRESH_MS = 500; // Frames only carry summaries; the character sheet polls GET /agents/{id}
 
 function App() {
   const [view, setView] = useState('menu'); // Default to menu
@@ -11,11 +20,16 @@ function App() {
   const [selectedAgentId, setSelectedAgentId] = useState(null);
   const [mapMode, setMapMode] = useState('TERRAIN');
   const [ws, setWs] = useState(null);
+  const [viewport, setViewport] = useState(null);
+  const [inspectedAgent, setInspectedAgent] = useState(null);
 
   useEffect(() => {
     // Reconnection logic could be added here
     const connect = () => {
-      const socket = new WebSocket('ws://localhost:8000/ws');
+      const socket = new WebSocket(`ws://localhost:8000/ws?protocol=${STREAM_PROTOCOL}`);
+      socket.binaryType = 'arraybuffer';
+      let current = null;
+      let resyncing = false;
       setWs(socket);
 
       socket.onopen = () => {
@@ -24,8 +38,25 @@ function App() {
       };
 
       socket.onmessage = (event) => {
-        const data = JSON.parse(event.data);
-        setGameState(data);
+        const message = event.data instanceof ArrayBuffer ? null : JSON.parse(event.data);
+        if (message && message.type === 'notice') {
+          // Not a frame, e.g. a sharded server falling back to full JSON frames
+          console.warn(`Server notice (${message.code}): ${message.message}`);
+          return;
+        }
+        const next = message === null
+          ? decodeFrame(event.data, current)
+          : applyFrame(current, message);
+        if (next === null) {
+          // Missed a frame: ask (once) for a fresh snapshot, keep showing the last state
+          current = null;
+          if (!resyncing) socket.send(JSON.stringify({ type: 'resync' }));
+          resyncing = true;
+          return;
+        }
+        resyncing = false;
+        current = next;
+        setGameState(next);
       };
 
       socket.onclose = () => {
@@ -39,6 +70,47 @@ function App() {
     return () => socket.close();
   }, []);
 
+  // Tell the server what this client shows (see backend/app/api/stream.py View)
+  useEffect(() => {
+    if (!VIEWPORT_STREAMING || !viewport || !ws || ws.readyState !== WebSocket.OPEN) return;
+    ws.send(JSON.stringify({
+      type: 'subscribe',
+      viewport: {
+        x: viewport.x - VIEWPORT_MARGIN,
+        y: viewport.y - VIEWPORT_MARGIN,
+        width: viewport.width + 2 * VIEWPORT_MARGIN,
+        height: viewport.height + 2 * VIEWPORT_MARGIN,
+      },
+      detail: 'positions',
+      inspect: selectedAgentId,
+    }));
+  }, [ws, connected, viewport, selectedAgentId]);
+
+  // Full record of the selected agent for the character sheet
+  useEffect(() => {
+    if (!selectedAgentId) {
+      setInspectedAgent(null);
+      return;
+    }
+    let cancelled = false;
+    const load = () => fetch(`http://localhost:8000/agents/${selectedAgentId}`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((agent) => { if (!cancelled) setInspectedAgent(agent); })
+      .catch(() => {});
+    load();
+    const timer = setInterval(load, INSPECTOR_REFRESH_MS);
+    return () => {
+      cancelled = true;
+      clearInterval(timer);
+    };
+  }, [selectedAgentId]);
+
+  const handleViewportChange = useCallback((next) => {
+    // Only resubscribe once the view moved by a few tiles
+    setViewport((prev) => (prev && Math.abs(prev.x - next.x) < VIEWPORT_MARGIN / 2 && Math.abs(prev.y - next.y) < VIEWPORT_MARGIN / 2
+      && prev.width === next.width && prev.height === next.height ? prev : next));
+  }, []);
+
   const togglePause = () => {
     if (ws && ws.readyState === WebSocket.OPEN) {
       ws.send(JSON.stringify({ type: 'pause' }));
@@ -62,6 +134,8 @@ function App() {
               selectedAgentId={selectedAgentId}
               onSelectAgent={setSelectedAgentId}
               mapMode={mapMode}
+              onViewportChange={handleViewportChange}
+              inspectedAgent={inspectedAgent}
             />
           </div>
 
@@ -70,6 +144,7 @@ function App() {
             <Dashboard
               gameState={gameState}
               selectedAgentId={selectedAgentId}
+              inspectedAgent={inspectedAgent}
               onSelectAgent={setSelectedAgentId}
               onTogglePause={togglePause}
               mapMode={mapMode}
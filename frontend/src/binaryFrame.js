@@ -0,0 +1,103 @@
+// Reference decoder for the /ws binary protocol (layout: backend/app/api/stream.py).
+// decodeFrame(buffer, state) returns the new game state; terrain and items are
+// only in the frame when they changed, otherwise they carry over from `state`.
+
+const MAGIC = 'ADM1';
+const HEADER_BYTES = 40;
+const FLAG_PAUSED = 1, FLAG_DAY = 2, FLAG_TERRAIN = 4, FLAG_ITEMS = 8;
+const NEEDS = ['hunger', 'energy', 'social', 'fun'];
+const ascii = new TextDecoder('ascii');
+const utf8 = new TextDecoder('utf-8');
+
+const align4 = (offset) => (offset + 3) & ~3;
+const num = (v) => (Number.isNaN(v) ? null : v);
+
+const readIds = (buffer, offset, count, width) => {
+  const bytes = new Uint8Array(buffer, offset, count * width);
+  const ids = new Array(count);
+  for (let i = 0; i < count; i++) {
+    const raw = bytes.subarray(i * width, (i + 1) * width);
+    const end = raw.indexOf(0);
+    ids[i] = ascii.decode(end === -1 ? raw : raw.subarray(0, end));
+  }
+  return ids;
+};
+
+export const decodeFrame = (buffer, state) => {
+  const view = new DataView(buffer);
+  if (ascii.decode(new Uint8Array(buffer, 0, 4)) !== MAGIC) throw new Error('Not an ADM1 frame');
+  const flags = view.getUint32(4, true);
+  const width = view.getUint16(16, true);
+  const height = view.getUint16(18, true);
+  const nAgents = view.getUint32(20, true);
+  const nAnimals = view.getUint32(24, true);
+  const nItems = view.getUint32(28, true);
+  const agentIdWidth = view.getUint16(32, true);
+  const animalIdWidth = view.getUint16(34, true);
+  const jsonLength = view.getUint32(36, true);
+  let offset = HEADER_BYTES;
+
+  let terrain = state ? state.terrain : [];
+  if (flags & FLAG_TERRAIN) {
+    const cells = new Uint8Array(buffer, offset, width * height);
+    terrain = new Array(height);
+    for (let y = 0; y < height; y++) terrain[y] = Array.from(cells.subarray(y * width, (y + 1) * width));
+    offset = align4(offset + width * height);
+  }
+
+  const agentIds = readIds(buffer, offset, nAgents, agentIdWidth);
+  offset = align4(offset + nAgents * agentIdWidth);
+  const agentXY = new Int16Array(buffer, offset, nAgents * 2);
+  offset += nAgents * 4;
+  const needs = new Float32Array(buffer, offset, nAgents * NEEDS.length);
+  offset += needs.byteLength;
+
+  const animalIds = readIds(buffer, offset, nAnimals, animalIdWidth);
+  offset = align4(offset + nAnimals * animalIdWidth);
+  const animalXY = new Int16Array(buffer, offset, nAnimals * 2);
+  offset += nAnimals * 4;
+  const animalEnergy = new Float32Array(buffer, offset, nAnimals);
+  offset += nAnimals * 4;
+  const animalType = new Uint8Array(buffer, offset, nAnimals);
+  offset = align4(offset + nAnimals);
+
+  let itemXY = null, itemKind = null;
+  if (flags & FLAG_ITEMS) {
+    itemXY = new Int16Array(buffer, offset, nItems * 2);
+    offset += nItems * 4;
+    itemKind = new Uint16Array(buffer, offset, nItems);
+    offset = align4(offset + nItems * 2);
+  }
+
+  const trailer = JSON.parse(utf8.decode(new Uint8Array(buffer, offset, jsonLength)));
+
+  const agents = trailer.agent_details.map((details, i) => {
+    const agentNeeds = {};
+    NEEDS.forEach((name, k) => { agentNeeds[name] = num(needs[i * NEEDS.length + k]); });
+    return { ...details, id: agentIds[i], x: agentXY[2 * i], y: agentXY[2 * i + 1], needs: agentNeeds };
+  });
+
+  const animals = animalIds.map((id, i) => ({
+    id, x: animalXY[2 * i], y: animalXY[2 * i + 1],
+    type: trailer.animal_types[animalType[i]], energy: num(animalEnergy[i]),
+  }));
+
+  let items = state ? state.items : [];
+  if (itemXY) {
+    items = new Array(nItems);
+    for (let i = 0; i < nItems; i++) {
+      items[i] = { ...trailer.item_kinds[itemKind[i]], x: itemXY[2 * i], y: itemXY[2 * i + 1] };
+    }
+  }
+
+  return {
+    width, height,
+    time_step: view.getUint32(8, true),
+    generation: view.getUint32(12, true),
+    paused: Boolean(flags & FLAG_PAUSED),
+    is_day: Boolean(flags & FLAG_DAY),
+    terrain, items, agents, animals,
+    logs: trailer.logs,
+    harmony: trailer.harmony,
+  };
+};
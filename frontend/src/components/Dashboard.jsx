@@ -19,8 +19,12 @@ const TopBar = React.memo(({ gameState, onTogglePause }) => {
                 <ResourceItem label="Population" value={gameState.agents.length} icon="👥" color="text-blue-400" />
                 <ResourceItem label="Generations" value={gameState.generation} icon="🧬" color="text-purple-400" />
                 <ResourceItem label="Prophets" value={gameState.agents.filter(a => a.attributes.is_prophet).length} icon="🔮" color="text-pink-400" />
-                {/* Global Harmony Calculation */}
+                {/* Global Harmony (computed server-side; older servers sent every opinion) */}
                 {(() => {
+                    if (gameState.harmony !== undefined) {
+                        const harmony = gameState.harmony;
+                        return <ResourceItem label="Harmony" value={`${harmony.toFixed(0)}%`} icon="⚖️" color={harmony < 50 ? "text-red-400" : "text-green-400"} />;
+                    }
                     let total = 0, count = 0;
                     gameState.agents.forEach(a => {
                         if (a.qalb && a.qalb.opinions) {
@@ -550,7 +554,7 @@ const NotificationContainer = ({ notifications }) => (
 
 // --- MAIN DASHBOARD ---
 
-const Dashboard = ({ gameState, onSelectAgent, selectedAgentId, onTogglePause, mapMode, setMapMode }) => {
+const Dashboard = ({ gameState, onSelectAgent, selectedAgentId, inspectedAgent, onTogglePause, mapMode, setMapMode }) => {
 
     // Notifications State
     const [notifications, setNotifications] = useState([]);
@@ -597,8 +601,12 @@ const Dashboard = ({ gameState, onSelectAgent, selectedAgentId, onTogglePause, m
 
     const selectedAgent = useMemo(() => {
         if (!selectedAgentId || !gameState.agents) return null;
-        return gameState.agents.find(a => a.id === selectedAgentId);
-    }, [gameState, selectedAgentId]);
+        const live = gameState.agents.find(a => a.id === selectedAgentId);
+        if (live && live.qalb) return live; // Streamed in full
+        // Frames carry summaries: the sheet uses the inspector record, kept in place by the live frame
+        if (!inspectedAgent || inspectedAgent.id !== selectedAgentId) return null;
+        return live ? { ...inspectedAgent, x: live.x, y: live.y, needs: live.needs } : inspectedAgent;
+    }, [gameState, selectedAgentId, inspectedAgent]);
 
     const agentMap = useMemo(() => {
         if (!gameState.agents) return {};
@@ -1,6 +1,6 @@
 import React, { useRef, useEffect, useState } from 'react';
 
-const MapCanvas = ({ gameState, selectedAgentId, onSelectAgent, mapMode = 'TERRAIN' }) => {
+const MapCanvas = ({ gameState, selectedAgentId, onSelectAgent, mapMode = 'TERRAIN', onViewportChange, inspectedAgent }) => {
   const canvasRef = useRef(null);
   const [offset, setOffset] = useState({ x: 0, y: 0 });
   const [scale, setScale] = useState(1.5); // Start slightly zoomed in
@@ -27,6 +27,20 @@ const MapCanvas = ({ gameState, selectedAgentId, onSelectAgent, mapMode = 'TERRA
     }
   }, [selectedAgentId]);
 
+  // Report the visible tile rectangle (for viewport-filtered streaming)
+  useEffect(() => {
+    const canvas = canvasRef.current;
+    if (!onViewportChange || !canvas) return;
+    const tile = TILE_SIZE * scale;
+    const x = Math.floor(-offset.x / tile);
+    const y = Math.floor(-offset.y / tile);
+    onViewportChange({
+      x, y,
+      width: Math.ceil(canvas.clientWidth / tile) + 1,
+      height: Math.ceil(canvas.clientHeight / tile) + 1,
+    });
+  }, [offset, scale, onViewportChange]);
+
   // Terrain & Map Colors
   const COLORS = {
     WATER: '#1e3a8a', // Deep Blue
@@ -220,12 +234,14 @@ const MapCanvas = ({ gameState, selectedAgentId, onSelectAgent, mapMode = 'TERRA
 
     // 5. CONNECTIONS (Selected Agent)
     const selectedAgent = gameState.agents.find(a => a.id === selectedAgentId);
-    if (selectedAgent && selectedAgent.qalb && selectedAgent.qalb.opinions) {
+    // Frames carry summaries; opinions come from the inspector record (unless streamed in full)
+    const selectedDetails = selectedAgent && selectedAgent.qalb ? selectedAgent : inspectedAgent;
+    if (selectedAgent && selectedDetails && selectedDetails.id === selectedAgentId && selectedDetails.qalb && selectedDetails.qalb.opinions) {
       const agentMap = new Map(gameState.agents.map(a => [a.id, a]));
       const sx = (selectedAgent.x + 0.5) * TILE_SIZE;
       const sy = (selectedAgent.y + 0.5) * TILE_SIZE;
 
-      Object.entries(selectedAgent.qalb.opinions).forEach(([tid, val]) => {
+      Object.entries(selectedDetails.qalb.opinions).forEach(([tid, val]) => {
         const target = agentMap.get(tid);
         if (target && Math.abs(val) > 5) { // Only strong opinions
           ctx.beginPath();
@@ -264,7 +280,7 @@ const MapCanvas = ({ gameState, selectedAgentId, onSelectAgent, mapMode = 'TERRA
     }
 
 
-  }, [gameState, offset, scale, selectedAgentId, mapMode]);
+  }, [gameState, offset, scale, selectedAgentId, mapMode, inspectedAgent]);
 
   // --- CONTROLS ---
 
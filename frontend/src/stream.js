@@ -0,0 +1,58 @@
+// Client side of the /ws delta protocol (see backend/app/api/stream.py).
+// applyFrame(state, frame) returns the new game state, or null when a frame
+// was missed and the client must send { type: 'resync' }.
+
+const mergeEntities = (list, changes, removed) => {
+  const gone = new Set(removed || []);
+  const byId = new Map();
+  for (const entity of list) {
+    if (!gone.has(entity.id)) byId.set(entity.id, entity);
+  }
+  for (const [id, fields] of Object.entries(changes || {})) {
+    byId.set(id, { ...(byId.get(id) || {}), ...fields });
+  }
+  return Array.from(byId.values());
+};
+
+export const applyFrame = (state, frame) => {
+  if (frame.type !== 'delta') {
+    // Full frames: snapshot, or the legacy protocol (no type)
+    return { ...frame, seq: frame.seq };
+  }
+  if (!state || state.seq !== frame.seq - 1) return null;
+
+  const next = {
+    ...state,
+    seq: frame.seq,
+    time_step: frame.time_step,
+    is_day: frame.is_day,
+    paused: frame.paused,
+    generation: frame.generation,
+    harmony: frame.harmony,
+    agents: mergeEntities(state.agents, frame.agents, frame.agents_removed),
+    animals: mergeEntities(state.animals, frame.animals, frame.animals_removed),
+  };
+
+  if (frame.item_cells && frame.item_cells.length) {
+    const touched = new Set(frame.item_cells.map((c) => `${c.x},${c.y}`));
+    const items = state.items.filter((item) => !touched.has(`${item.x},${item.y}`));
+    for (const cell of frame.item_cells) {
+      for (const item of cell.items) items.push({ ...item, x: cell.x, y: cell.y });
+    }
+    next.items = items;
+  }
+
+  if (frame.terrain && frame.terrain.length) {
+    const terrain = state.terrain.slice();
+    for (const [x, y, t] of frame.terrain) {
+      terrain[y] = terrain[y].slice();
+      terrain[y][x] = t;
+    }
+    next.terrain = terrain;
+  }
+
+  if (frame.logs && frame.logs.length) {
+    next.logs = [...(state.logs || []), ...frame.logs].slice(-50);
+  }
+  return next;
+};